@@ -1,7 +1,13 @@
 from datetime import datetime, timedelta
+from pathlib import Path
 from typing import Tuple
 import sys
 
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "quantura_site" / "functions"))
+from trading_calendar import add_sessions, is_session  # noqa: E402
+
 
 def is_weekday_date(date: datetime) -> Tuple[bool, str, str]:
     """
@@ -46,6 +52,54 @@ def is_prediction_on_weekday(start_date: str, prediction_length: int) -> Tuple[b
     return is_weekday_date(prediction_date)
 
 
+def is_trading_day(date: datetime) -> Tuple[bool, str, str]:
+    """
+    Check if a given date is an NYSE trading session (weekday and not an exchange holiday).
+
+    Args:
+        date: datetime object
+
+    Returns:
+        Tuple of (is_session: bool, day_name: str, date_str: str)
+    """
+    return bool(is_session(date.date())), date.strftime('%A'), date.strftime('%Y-%m-%d')
+
+
+def prediction_end_session(start_date: str, trading_days: int) -> str:
+    """
+    Date that lies `trading_days` NYSE sessions after `start_date`.
+
+    Args:
+        start_date: Start date as string in format 'YYYY-MM-DD'
+        trading_days: Number of trading sessions to move forward
+
+    Returns:
+        End date as string in format 'YYYY-MM-DD'
+    """
+    return str(add_sessions(start_date, trading_days))
+
+
+def check_predictions(start_dates, prediction_lengths) -> dict:
+    """
+    Vectorized form of is_prediction_on_weekday for whole arrays of predictions.
+
+    Args:
+        start_dates: Sequence of 'YYYY-MM-DD' strings (or datetime64 values)
+        prediction_lengths: Calendar days to add, one per start date (or a single int)
+
+    Returns:
+        Dict of numpy arrays: end_date, is_weekday, is_session and next_session
+        (the end date rolled forward to the next trading session when it is not one)
+    """
+    end_dates = np.asarray(start_dates, dtype='datetime64[D]') + np.asarray(prediction_lengths, dtype='timedelta64[D]')
+    return {
+        'end_date': end_dates,
+        'is_weekday': np.is_busday(end_dates),
+        'is_session': is_session(end_dates),
+        'next_session': add_sessions(end_dates, 0),
+    }
+
+
 if __name__ == "__main__":
     if len(sys.argv) == 2:
         # Check today or yesterday
@@ -57,12 +111,14 @@ if __name__ == "__main__":
             print(f"Date: {date_str} (today)")
             print(f"Day: {day_name}")
             print(f"Is weekday: {is_weekday}")
+            print(f"Is trading day: {is_trading_day(date_to_check)[0]}")
         elif arg == "yesterday":
             date_to_check = datetime.now() - timedelta(days=1)
             is_weekday, day_name, date_str = is_weekday_date(date_to_check)
             print(f"Date: {date_str} (yesterday)")
             print(f"Day: {day_name}")
             print(f"Is weekday: {is_weekday}")
+            print(f"Is trading day: {is_trading_day(date_to_check)[0]}")
         else:
             print(f"Usage: python check_weekday.py [today|yesterday] or")
             print(f"       python check_weekday.py START_DATE DAYS")
@@ -79,6 +135,8 @@ if __name__ == "__main__":
         print(f"End date: {end_date}")
         print(f"Day: {day_name}")
         print(f"Is weekday: {is_weekday}")
+        print(f"Is trading day: {bool(is_session(end_date))}")
+        print(f"End date ({prediction_length} trading days): {prediction_end_session(start_date, prediction_length)}")
     else:
         # Example usage
         start = "2024-01-08"
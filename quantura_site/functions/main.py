@@ -1,38 +1,86 @@
 from __future__ import annotations
 
+import atexit
 import base64
+import contextlib
+import contextvars
+import copy
+import csv
+import functools
 import hashlib
+import importlib
+import importlib.util
+import itertools
 import json
 import math
 import os
+import random
 import re
+import sys
+import threading
 import time
+from bisect import bisect_left, bisect_right
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait as wait_futures
+from email.utils import parsedate_to_datetime
 from html import unescape
 from datetime import date, datetime, timedelta, timezone
-from io import BytesIO, StringIO
+from io import BytesIO, StringIO, TextIOWrapper
 from statistics import NormalDist
 from typing import Any
 from urllib.parse import parse_qs, quote_plus, unquote, urlparse
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 try:
     from zoneinfo import ZoneInfo
 except Exception:  # pragma: no cover - Python < 3.9 fallback
     ZoneInfo = None  # type: ignore
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None  # type: ignore
 
 import firebase_admin
-from firebase_admin import credentials, firestore, messaging as admin_messaging, storage as admin_storage
-from firebase_functions import https_fn, scheduler_fn
+from firebase_admin import credentials
+from firebase_functions import firestore_fn, https_fn, scheduler_fn
 from firebase_functions.options import MemoryOption, set_global_options
 
-try:
-    from firebase_admin import remote_config as admin_remote_config  # type: ignore
-except Exception:  # pragma: no cover - optional dependency until firebase-admin>=7.x
-    admin_remote_config = None
+
+def _lazy_module(name: str) -> Any | None:
+    """Returns `name` as a module whose body only executes on first attribute access.
+
+    Keeps google-cloud-firestore/storage and the FCM client out of the import path of
+    endpoints that never touch them. Returns None when the module is not installed.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    try:
+        spec = importlib.util.find_spec(name)
+    except (ImportError, ValueError):
+        return None
+    if spec is None or spec.loader is None:
+        return None
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+firestore = _lazy_module("firebase_admin.firestore")
+admin_messaging = _lazy_module("firebase_admin.messaging")
+admin_storage = _lazy_module("firebase_admin.storage")
+# Optional until firebase-admin>=7.x; import errors surface inside _get_remote_config_template's try.
+admin_remote_config = _lazy_module("firebase_admin.remote_config")
 
 # Bind high-sensitivity API keys via Secret Manager instead of committing them.
 # Firebase will inject secret values into env vars for deployed functions.
-set_global_options(max_instances=10, secrets=["OPENAI_API_KEY"])
+# Instance caps, memory and concurrency are set per endpoint through DEPLOYMENT_PROFILES.
+set_global_options(secrets=["OPENAI_API_KEY"])
 
 SERVICE_ACCOUNT_PATH = os.environ.get(
     "SERVICE_ACCOUNT_PATH",
@@ -50,14 +98,97 @@ ALLOWED_STATUSES = {"pending", "in_progress", "fulfilled", "cancelled"}
 CONTACT_REQUIRED_FIELDS = {"name", "email", "message"}
 FORECAST_SERVICES = {"prophet", "ibm_timemixer"}
 BACKTEST_SOURCE_FORMATS = {"python", "tradingview", "metatrader5", "tradelocker"}
+BACKTEST_ENGINES = {"vectorized", "event"}
+# Full forecast rows live outside forecast_requests in content-addressed documents.
+FORECAST_ROWS_COLLECTION = "forecast_rows"
+FORECAST_ROWS_ENCODING = "columnar-v1"
+# Shared forecast results, keyed by request parameters plus the last bar the model saw.
+FORECAST_RESULTS_COLLECTION = "forecast_results"
+# Server-side parse of each prediction upload, keyed by upload ID and tied to the blob generation.
+PREDICTION_SUMMARIES_COLLECTION = "prediction_upload_summaries"
 FEATURE_VOTE_KEYS = {"uploads", "autopilot"}
 FEATURE_VOTE_CHOICES = {"yes", "no"}
+AUDIT_BUFFER_MAX_EVENTS = max(100, min(int(os.environ.get("AUDIT_BUFFER_MAX_EVENTS", "5000") or 5000), 50000))
+ENTITLEMENT_CACHE_TTL_SECONDS = max(5, min(int(os.environ.get("ENTITLEMENT_CACHE_TTL_SECONDS", "60") or 60), 900))
+# Usage counters are split across this many shard docs so parallel calls never write the same doc.
+USAGE_COUNTER_SHARDS = max(1, min(int(os.environ.get("USAGE_COUNTER_SHARDS", "8") or 8), 64))
+# Per-instance token bucket in front of the usage counters: burst size and refill rate per user.
+USAGE_BUCKET_BURST = max(1, min(int(os.environ.get("USAGE_BUCKET_BURST", "10") or 10), 200))
+USAGE_BUCKET_REFILL_PER_SECOND = max(
+    0.1,
+    min(float(os.environ.get("USAGE_BUCKET_REFILL_PER_SECOND", "2") or 2), 50.0),
+)
 REPORT_AGENT_BATCH_SIZE = max(1, min(int(os.environ.get("REPORT_AGENT_BATCH_SIZE", "8") or 8), 40))
+CORPORATE_EVENTS_CACHE_TTL_SECONDS = max(
+    60,
+    min(int(os.environ.get("CORPORATE_EVENTS_CACHE_TTL_SECONDS", "21600") or 21600), 86400),
+)
+CORPORATE_EVENTS_FETCH_WORKERS = max(1, min(int(os.environ.get("CORPORATE_EVENTS_FETCH_WORKERS", "8") or 8), 16))
+TICKER_NEWS_CACHE_TTL_SECONDS = max(30, min(int(os.environ.get("TICKER_NEWS_CACHE_TTL_SECONDS", "300") or 300), 3600))
+# Responses stay as long as the old first-source-wins lookup; the merge fills them in source order.
+TICKER_NEWS_MAX_ITEMS = 12
+TICKER_NEWS_DEADLINE_SECONDS = max(1.0, min(float(os.environ.get("TICKER_NEWS_DEADLINE_SECONDS", "6") or 6), 20.0))
+# How long Yahoo search gets on its own before the fallback sources are started alongside it.
+TICKER_NEWS_HEDGE_SECONDS = max(0.1, min(float(os.environ.get("TICKER_NEWS_HEDGE_SECONDS", "1.5") or 1.5), 10.0))
+HTTP_POOL_MAXSIZE = max(2, min(int(os.environ.get("HTTP_POOL_MAXSIZE", "16") or 16), 64))
+HTTP_RETRY_TOTAL = max(0, min(int(os.environ.get("HTTP_RETRY_TOTAL", "2") or 2), 5))
+# Individual spans kept per invocation on top of the per-phase totals.
+TRACE_MAX_SPANS = max(0, min(int(os.environ.get("TRACE_MAX_SPANS", "200") or 200), 2000))
+# Local JSONL file that receives every finished invocation trace (emulator and load tests).
+SPAN_EXPORT_PATH = str(os.environ.get("SPAN_EXPORT_PATH") or "").strip()
+MARKET_HEADLINES_CACHE_TTL_SECONDS = max(
+    60,
+    min(int(os.environ.get("MARKET_HEADLINES_CACHE_TTL_SECONDS", "900") or 900), 3600),
+)
+MARKET_HEADLINES_PREWARM_WORKERS = max(1, min(int(os.environ.get("MARKET_HEADLINES_PREWARM_WORKERS", "4") or 4), 10))
+BACKTEST_HISTORY_CACHE_TTL_SECONDS = max(
+    60,
+    min(int(os.environ.get("BACKTEST_HISTORY_CACHE_TTL_SECONDS", "900") or 900), 21600),
+)
+FORECAST_HISTORY_CACHE_TTL_SECONDS = max(
+    30,
+    min(int(os.environ.get("FORECAST_HISTORY_CACHE_TTL_SECONDS", "300") or 300), 3600),
+)
+# How long a claimed forecast result may stay "computing" before another instance takes over.
+FORECAST_RESULT_LEASE_SECONDS = max(30, min(int(os.environ.get("FORECAST_RESULT_LEASE_SECONDS", "240") or 240), 900))
+# How long a request waits on another instance's computation before running the model itself.
+FORECAST_RESULT_WAIT_SECONDS = max(0, min(int(os.environ.get("FORECAST_RESULT_WAIT_SECONDS", "60") or 60), 150))
+FORECAST_RESULT_RETENTION_DAYS = max(1, min(int(os.environ.get("FORECAST_RESULT_RETENTION_DAYS", "7") or 7), 90))
+PRICE_EXPORT_PREFIX = "exports/prices"
+# Exports whose range reaches today are rebuilt after this long; closed ranges are kept longer
+# because adjusted closes only move on splits and dividends.
+PRICE_EXPORT_CACHE_TTL_SECONDS = max(60, min(int(os.environ.get("PRICE_EXPORT_CACHE_TTL_SECONDS", "3600") or 3600), 86400))
+PRICE_EXPORT_CLOSED_RANGE_TTL_SECONDS = max(
+    3600,
+    min(int(os.environ.get("PRICE_EXPORT_CLOSED_RANGE_TTL_SECONDS", "604800") or 604800), 2592000),
+)
+PRICE_EXPORT_URL_TTL_SECONDS = max(300, min(int(os.environ.get("PRICE_EXPORT_URL_TTL_SECONDS", "3600") or 3600), 604800))
+# Resumable upload chunk; must be a multiple of 256 KiB.
+PRICE_EXPORT_UPLOAD_CHUNK_BYTES = 4 * 256 * 1024
+# Prediction CSV paging: one index checkpoint every N rows. The index is stored under a
+# prefix storage.rules keeps server-only, since predictions/{uid}/ is user-writable.
+PREDICTION_CSV_INDEX_STRIDE = 1000
+PREDICTION_CSV_INDEX_PREFIX = "prediction_indexes"
+PREDICTION_CSV_READ_CHUNK_BYTES = 4 * 256 * 1024
+PREDICTION_CSV_PAGE_MAX_ROWS = 5000
+PREDICTION_CSV_PAGE_MAX_BYTES = 2_000_000
+BACKTEST_SWEEP_MAX_COMBINATIONS = max(1, min(int(os.environ.get("BACKTEST_SWEEP_MAX_COMBINATIONS", "60") or 60), 400))
+# Share of vectorized backtests queued for backtest_kernel_validation_scheduler, which re-runs
+# them through backtesting.py and compares the metrics.
+BACKTEST_KERNEL_VALIDATION_RATE = max(
+    0.0,
+    min(float(os.environ.get("BACKTEST_KERNEL_VALIDATION_RATE", "0.02") or 0.02), 1.0),
+)
+BACKTEST_KERNEL_VALIDATION_BATCH_SIZE = max(
+    1, min(int(os.environ.get("BACKTEST_KERNEL_VALIDATION_BATCH_SIZE", "10") or 10), 50)
+)
 
 ALPACA_API_BASE = os.environ.get("ALPACA_API_BASE", "https://paper-api.alpaca.markets")
 ALPACA_DATA_BASE = os.environ.get("ALPACA_DATA_BASE", "https://data.alpaca.markets")
 ALPACA_API_KEY = os.environ.get("ALPACA_API_KEY") or os.environ.get("ALPACAAPIKEY")
 ALPACA_SECRET_KEY = os.environ.get("ALPACA_SECRET_KEY") or os.environ.get("ALPACASECRETKEY")
+ALPACA_DATA_FEED = str(os.environ.get("ALPACA_DATA_FEED") or "iex").strip().lower() or "iex"
+QUOTE_CACHE_TTL_SECONDS = max(1, min(int(os.environ.get("QUOTE_CACHE_TTL_SECONDS", "15") or 15), 300))
 
 IBM_TIMEMIXER_MODEL_ID = os.environ.get("IBM_TIMEMIXER_MODEL_ID", "ibm-granite/granite-timeseries-ttm-r2")
 IBM_TIMEMIXER_ENDPOINT = os.environ.get("IBM_TIMEMIXER_ENDPOINT", "").strip()
@@ -97,6 +228,18 @@ SOCIAL_AUTOMATION_ENABLED = str(os.environ.get("SOCIAL_AUTOMATION_ENABLED") or "
 SOCIAL_AUTOMATION_TIMEZONE = str(os.environ.get("SOCIAL_AUTOMATION_TIMEZONE") or "America/New_York").strip()
 SOCIAL_POSTING_TIMEZONE = str(os.environ.get("SOCIAL_POSTING_TIMEZONE") or SOCIAL_AUTOMATION_TIMEZONE).strip()
 SOCIAL_DISPATCH_BATCH_SIZE = max(1, min(int(os.environ.get("SOCIAL_DISPATCH_BATCH_SIZE", "30") or 30), 100))
+# Minimum spacing between consecutive posts to the same platform within one dispatch run.
+SOCIAL_PLATFORM_MIN_INTERVAL_SECONDS: dict[str, float] = {
+    "x": 2.0,
+    "linkedin": 1.0,
+    "facebook": 1.0,
+    "instagram": 3.0,
+    "tiktok": 3.0,
+}
+SOCIAL_DISPATCH_MAX_WORKERS = max(1, min(int(os.environ.get("SOCIAL_DISPATCH_MAX_WORKERS", "6") or 6), 12))
+FIRESTORE_BATCH_LIMIT = 500
+FCM_MULTICAST_LIMIT = 500
+PUSH_SEND_MAX_WORKERS = max(1, min(int(os.environ.get("PUSH_SEND_MAX_WORKERS", "4") or 4), 16))
 SOCIAL_DEFAULT_CTA_URL = str(os.environ.get("SOCIAL_DEFAULT_CTA_URL") or PUBLIC_ORIGIN).strip()
 SOCIAL_AUTOPILOT_ENABLED = str(os.environ.get("SOCIAL_AUTOPILOT_ENABLED") or "true").strip().lower() in {
     "1",
@@ -251,9 +394,35 @@ if not firebase_admin._apps:
         # Functions, we rely on Application Default Credentials and only pass options.
         firebase_admin.initialize_app(options=options or None)
 
-db = firestore.client()
+
+
+class _LazyFirestoreClient:
+    """Stands in for `firestore.client()` and creates the real client on first use."""
+
+    def __init__(self) -> None:
+        self._client: Any = None
+        self._lock = threading.Lock()
+
+    def _get(self) -> Any:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    _instrument_firestore()
+                    self._client = firestore.client()
+        return self._client
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._get(), name)
+
+
+db: Any = _LazyFirestoreClient()
 
 _REMOTE_CONFIG_CACHE: dict[str, Any] = {"template": None, "loadedAt": 0.0}
+# Evaluated configs keyed by context hash; reset whenever the template is reloaded.
+_REMOTE_CONFIG_EVAL_CACHE: dict[str, Any] = {"version": None, "configs": {}}
+_REMOTE_CONFIG_EVAL_CACHE_LOCK = threading.Lock()
+_AI_USAGE_TIERS_CACHE: dict[tuple[str, tuple[str, ...]], dict[str, Any]] = {}
+_AI_USAGE_TIERS_CACHE_LOCK = threading.Lock()
 DEFAULT_LLM_ALLOWED_MODELS = [
     "gpt-5-nano",
     "gpt-5-mini",
@@ -365,12 +534,41 @@ def _remote_config_context(
     return context
 
 
-def _remote_config_param(key: str, default: str = "", context: dict[str, Any] | None = None) -> str:
+def _evaluated_remote_config(context: dict[str, Any] | None = None) -> Any | None:
+    """Evaluates the template once per (template load, context) and reuses the result.
+
+    Every `_remote_config_*` lookup in a request shares the same context dict, so the
+    template and its conditions are evaluated once per request instead of once per key.
+    """
     template = _get_remote_config_template()
     if template is None:
+        return None
+    version = (id(template), float(_REMOTE_CONFIG_CACHE.get("loadedAt") or 0.0))
+    context_key = hashlib.sha256(json.dumps(context or {}, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    with _REMOTE_CONFIG_EVAL_CACHE_LOCK:
+        if _REMOTE_CONFIG_EVAL_CACHE.get("version") != version:
+            _REMOTE_CONFIG_EVAL_CACHE["version"] = version
+            _REMOTE_CONFIG_EVAL_CACHE["configs"] = {}
+        configs: dict[str, Any] = _REMOTE_CONFIG_EVAL_CACHE["configs"]
+        config = configs.get(context_key)
+    _record_cache("remote_config", config is not None)
+    if config is None:
+        try:
+            config = template.evaluate(context or {})
+        except Exception:
+            return None
+        with _REMOTE_CONFIG_EVAL_CACHE_LOCK:
+            if len(configs) >= 512:
+                configs.clear()
+            configs[context_key] = config
+    return config
+
+
+def _remote_config_param(key: str, default: str = "", context: dict[str, Any] | None = None) -> str:
+    config = _evaluated_remote_config(context)
+    if config is None:
         return default
     try:
-        config = template.evaluate(context or {})
         value = config.get_string(key)
         if value is None:
             return default
@@ -381,11 +579,10 @@ def _remote_config_param(key: str, default: str = "", context: dict[str, Any] |
 
 
 def _remote_config_bool(key: str, default: bool = False, context: dict[str, Any] | None = None) -> bool:
-    template = _get_remote_config_template()
-    if template is None:
+    config = _evaluated_remote_config(context)
+    if config is None:
         return default
     try:
-        config = template.evaluate(context or {})
         return bool(config.get_boolean(key))
     except Exception:
         raw = _remote_config_param(key, "", context=context)
@@ -553,10 +750,21 @@ def _get_ai_usage_tiers(context: dict[str, Any] | None = None) -> dict[str, Any]
             "volatility_alerts": True,
         },
     }
-    parsed = _remote_config_json_param("ai_usage_tiers", fallback, context=context)
-    if not isinstance(parsed, dict):
-        return fallback
+    raw = _remote_config_param("ai_usage_tiers", "", context=context)
     global_allowed = _get_llm_allowed_models(context=context)
+    # The normalized tiers only change when the template value or model allowlist changes.
+    cache_key = (raw, tuple(global_allowed))
+    with _AI_USAGE_TIERS_CACHE_LOCK:
+        cached = _AI_USAGE_TIERS_CACHE.get(cache_key)
+    if cached is not None:
+        return copy.deepcopy(cached)
+    parsed: Any = fallback
+    if raw:
+        try:
+            value = json.loads(raw)
+            parsed = value if isinstance(value, dict) else fallback
+        except Exception:
+            parsed = fallback
     global_allowed_set = set(global_allowed)
     default_limits = {"free": 3, "pro": 25, "desk": 75}
     for tier_name, tier_data in parsed.items():
@@ -612,10 +820,18 @@ def _get_ai_usage_tiers(context: dict[str, Any] | None = None) -> dict[str, Any]
         tier_data["daily_limit"] = weekly_limit  # Backward-compatible alias for older clients.
         tier_data["volatility_alerts"] = bool(tier_data.get("volatility_alerts"))
         tier_data["allowed_models"] = normalized
+    with _AI_USAGE_TIERS_CACHE_LOCK:
+        if len(_AI_USAGE_TIERS_CACHE) >= 32:
+            _AI_USAGE_TIERS_CACHE.clear()
+        _AI_USAGE_TIERS_CACHE[cache_key] = copy.deepcopy(parsed)
     return parsed
 
 
-def _resolve_paid_plan_tier(uid: str) -> str:
+_ENTITLEMENT_CACHE: dict[str, dict[str, Any]] = {}
+_ENTITLEMENT_CACHE_LOCK = threading.Lock()
+
+
+def _scan_paid_plan_tier(uid: str) -> str:
     """Infers a paid tier from the user's orders. Returns free/pro/desk."""
     best_rank = 0
     try:
@@ -643,6 +859,60 @@ def _resolve_paid_plan_tier(uid: str) -> str:
     return "free"
 
 
+def _refresh_user_entitlement(uid: str) -> dict[str, Any]:
+    """Recomputes the denormalized `user_entitlements/{uid}` record from orders.
+
+    Called whenever an order's payment state may have changed so that tier checks
+    can read a single document instead of scanning orders.
+    """
+    plan_tier = _scan_paid_plan_tier(uid)
+    entitlement = {"planTier": plan_tier, "paid": plan_tier != "free"}
+    with _ENTITLEMENT_CACHE_LOCK:
+        _ENTITLEMENT_CACHE[uid] = {"entitlement": entitlement, "loadedAt": time.time()}
+    try:
+        db.collection("user_entitlements").document(uid).set(
+            {**entitlement, "userId": uid, "updatedAt": firestore.SERVER_TIMESTAMP},
+            merge=True,
+        )
+    except Exception:
+        pass
+    return entitlement
+
+
+def _get_user_entitlement(uid: str) -> dict[str, Any]:
+    if not uid:
+        return {"planTier": "free", "paid": False}
+    now = time.time()
+    with _ENTITLEMENT_CACHE_LOCK:
+        cached = _ENTITLEMENT_CACHE.get(uid)
+    if cached and (now - float(cached.get("loadedAt") or 0.0)) < ENTITLEMENT_CACHE_TTL_SECONDS:
+        _record_cache("entitlement", True)
+        return cached["entitlement"]
+    _record_cache("entitlement", False)
+    try:
+        snap = db.collection("user_entitlements").document(uid).get()
+    except Exception:
+        return {"planTier": "free", "paid": False}
+    if not snap.exists:
+        # Users with orders that predate the entitlement record are backfilled on first read.
+        return _refresh_user_entitlement(uid)
+    data = snap.to_dict() or {}
+    plan_tier = str(data.get("planTier") or "free").strip().lower()
+    if plan_tier not in {"free", "pro", "desk"}:
+        plan_tier = "free"
+    entitlement = {"planTier": plan_tier, "paid": plan_tier != "free"}
+    with _ENTITLEMENT_CACHE_LOCK:
+        if len(_ENTITLEMENT_CACHE) >= 5000:
+            _ENTITLEMENT_CACHE.clear()
+        _ENTITLEMENT_CACHE[uid] = {"entitlement": entitlement, "loadedAt": now}
+    return entitlement
+
+
+def _resolve_paid_plan_tier(uid: str) -> str:
+    """Returns free/pro/desk from the user's cached entitlement record."""
+    return str(_get_user_entitlement(uid).get("planTier") or "free")
+
+
 def _resolve_ai_tier(
     uid: str,
     token: dict[str, Any],
@@ -690,6 +960,398 @@ def _resolve_ai_tier(
     return tier_key, tier
 
 
+# Per-invocation tracing. `_callable` opens a trace for each request; external calls
+# (HTTP, yfinance, Firestore, Storage) record spans into it, and the per-phase totals are
+# added to the endpoint_metrics log line. Outside a traced invocation every hook is a no-op.
+_ACTIVE_TRACE: contextvars.ContextVar[dict[str, Any] | None] = contextvars.ContextVar("quantura_trace", default=None)
+
+
+class _InMemorySpanExporter:
+    """Keeps finished traces in memory; append one to _SPAN_EXPORTERS in tests and read `.records`."""
+
+    def __init__(self) -> None:
+        self.records: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def export(self, record: dict[str, Any]) -> None:
+        with self._lock:
+            self.records.append(record)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.records.clear()
+
+
+class _JsonlSpanExporter:
+    """Appends one JSON line per finished trace to a local file."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, record: dict[str, Any]) -> None:
+        line = json.dumps(record, default=str)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as handle:
+                handle.write(line + "\n")
+
+
+_SPAN_EXPORTERS: list[Any] = [_JsonlSpanExporter(SPAN_EXPORT_PATH)] if SPAN_EXPORT_PATH else []
+
+
+def _start_trace(name: str) -> contextvars.Token:
+    trace = {
+        "name": name,
+        "started": time.perf_counter(),
+        "phases": {},
+        "cache": {},
+        "spans": [],
+        "droppedSpans": 0,
+        "lock": threading.Lock(),
+    }
+    return _ACTIVE_TRACE.set(trace)
+
+
+def _finish_trace(token: contextvars.Token) -> dict[str, Any] | None:
+    trace = _ACTIVE_TRACE.get()
+    _ACTIVE_TRACE.reset(token)
+    if trace is None:
+        return None
+    with trace["lock"]:
+        phases = {
+            name: {**phase, "totalMs": round(phase["totalMs"], 1), "maxMs": round(phase["maxMs"], 1)}
+            for name, phase in sorted(trace["phases"].items())
+        }
+        return {
+            "phases": phases,
+            "cache": {name: dict(counts) for name, counts in sorted(trace["cache"].items())},
+            "spans": list(trace["spans"]),
+            "droppedSpans": trace["droppedSpans"],
+        }
+
+
+def _record_span(
+    name: str,
+    started: float,
+    attrs: dict[str, Any],
+    error: bool = False,
+    trace: dict[str, Any] | None = None,
+) -> None:
+    trace = trace or _ACTIVE_TRACE.get()
+    if trace is None:
+        return
+    duration_ms = (time.perf_counter() - started) * 1000
+    nbytes = int(attrs.get("bytes") or 0)
+    with trace["lock"]:
+        phase = trace["phases"].get(name)
+        if phase is None:
+            phase = trace["phases"][name] = {"count": 0, "totalMs": 0.0, "maxMs": 0.0, "bytes": 0, "errors": 0}
+        phase["count"] += 1
+        phase["totalMs"] += duration_ms
+        phase["maxMs"] = max(phase["maxMs"], duration_ms)
+        phase["bytes"] += nbytes
+        phase["errors"] += int(error)
+        if len(trace["spans"]) < TRACE_MAX_SPANS:
+            trace["spans"].append(
+                {
+                    "name": name,
+                    "startMs": round((started - trace["started"]) * 1000, 1),
+                    "durationMs": round(duration_ms, 1),
+                    "error": error,
+                    **attrs,
+                }
+            )
+        else:
+            trace["droppedSpans"] += 1
+
+
+@contextlib.contextmanager
+def _span(name: str, **attrs: Any):
+    """Times the block as one span of phase `name`.
+
+    Yields the span's attribute dict so the block can add `bytes`, `docs`, `rows`, ...
+    """
+    trace = _ACTIVE_TRACE.get()
+    if trace is None:
+        yield attrs
+        return
+    started = time.perf_counter()
+    error = False
+    try:
+        yield attrs
+    except BaseException:
+        error = True
+        raise
+    finally:
+        _record_span(name, started, attrs, error, trace)
+
+
+def _record_cache(name: str, hit: bool) -> None:
+    trace = _ACTIVE_TRACE.get()
+    if trace is None:
+        return
+    with trace["lock"]:
+        counts = trace["cache"].get(name)
+        if counts is None:
+            counts = trace["cache"][name] = {"hit": 0, "miss": 0}
+        counts["hit" if hit else "miss"] += 1
+
+
+def _in_trace_context(fn: Any) -> Any:
+    """Binds `fn` to the caller's context so spans recorded on pool threads reach the caller's trace."""
+    context = contextvars.copy_context()
+
+    def run(*args: Any, **kwargs: Any) -> Any:
+        # A Context can only be entered by one thread at a time; each call gets its own copy.
+        return context.copy().run(fn, *args, **kwargs)
+
+    return run
+
+
+def _wrap_traced(owner: Any, attr: str, phase: str, measure: Any = None) -> None:
+    """Replaces `owner.attr` (function, method or property) with a version that records a span.
+
+    `measure(args, kwargs, result)` may return extra span attributes such as bytes or rows.
+    """
+    original = getattr(owner, attr, None)
+    if original is None:
+        return
+    target = original.fget if isinstance(original, property) else original
+    if target is None or getattr(target, "__quantura_traced__", False):
+        return
+
+    @functools.wraps(target)
+    def traced(*args: Any, **kwargs: Any) -> Any:
+        with _span(phase) as attrs:
+            result = target(*args, **kwargs)
+            if measure is not None:
+                try:
+                    attrs.update(measure(args, kwargs, result) or {})
+                except Exception:
+                    pass
+            return result
+
+    traced.__quantura_traced__ = True  # type: ignore[attr-defined]
+    setattr(owner, attr, property(traced) if isinstance(original, property) else traced)
+
+
+def _frame_rows(args: Any, kwargs: Any, result: Any) -> dict[str, Any]:
+    shape = getattr(result, "shape", None)
+    return {"rows": int(shape[0])} if shape else {}
+
+
+def _payload_bytes(args: Any, kwargs: Any, result: Any) -> dict[str, Any]:
+    data = kwargs.get("data", args[1] if len(args) > 1 else b"")
+    return {"bytes": len(data.encode("utf-8") if isinstance(data, str) else data)}
+
+
+def _result_bytes(args: Any, kwargs: Any, result: Any) -> dict[str, Any]:
+    return {"bytes": len(result.encode("utf-8") if isinstance(result, str) else result)}
+
+
+def _query_stream_traced(original: Any) -> Any:
+    @functools.wraps(original)
+    def stream(self: Any, *args: Any, **kwargs: Any) -> Any:
+        trace = _ACTIVE_TRACE.get()
+        if trace is None or kwargs.get("explain_options") is not None:
+            return original(self, *args, **kwargs)
+
+        def generate() -> Any:
+            # Measured until the caller stops iterating, so the time covers every page fetched.
+            started = time.perf_counter()
+            attrs = {"docs": 0}
+            error = False
+            try:
+                for snapshot in original(self, *args, **kwargs):
+                    attrs["docs"] += 1
+                    yield snapshot
+            except BaseException as exc:
+                error = not isinstance(exc, GeneratorExit)
+                raise
+            finally:
+                _record_span("firestore.query", started, attrs, error, trace)
+
+        return generate()
+
+    stream.__quantura_traced__ = True  # type: ignore[attr-defined]
+    return stream
+
+
+_INSTRUMENTED: set[str] = set()
+_INSTRUMENT_LOCK = threading.Lock()
+
+
+def _instrument_once(name: str, install: Any) -> None:
+    if name in _INSTRUMENTED:
+        return
+    with _INSTRUMENT_LOCK:
+        if name in _INSTRUMENTED:
+            return
+        try:
+            install()
+        except Exception as exc:
+            print(f"Warning: {name} instrumentation disabled: {exc}")
+        _INSTRUMENTED.add(name)
+
+
+def _instrument_firestore() -> None:
+    def install() -> None:
+        from google.cloud.firestore_v1.batch import WriteBatch  # type: ignore
+        from google.cloud.firestore_v1.document import DocumentReference  # type: ignore
+        from google.cloud.firestore_v1.query import Query  # type: ignore
+
+        for attr in ("get", "set", "update", "create", "delete"):
+            _wrap_traced(DocumentReference, attr, f"firestore.{attr}")
+        # CollectionReference.get/stream and Query.get all go through Query.stream.
+        if not getattr(Query.stream, "__quantura_traced__", False):
+            Query.stream = _query_stream_traced(Query.stream)
+        _wrap_traced(WriteBatch, "commit", "firestore.commit", lambda args, kwargs, result: {"writes": len(result or [])})
+
+    _instrument_once("firestore", install)
+
+
+def _storage_bucket(name: str = STORAGE_BUCKET) -> Any:
+    def install() -> None:
+        from google.cloud.storage import Blob, Bucket  # type: ignore
+
+        for attr in ("upload_from_string", "upload_from_file", "upload_from_filename"):
+            _wrap_traced(Blob, attr, "storage.upload", _payload_bytes if attr == "upload_from_string" else None)
+        for attr in ("download_as_bytes", "download_as_text"):
+            _wrap_traced(Blob, attr, "storage.download", _result_bytes)
+        for attr in ("download_to_filename", "download_to_file"):
+            _wrap_traced(Blob, attr, "storage.download")
+        for attr in ("exists", "reload", "patch", "delete"):
+            _wrap_traced(Blob, attr, "storage.metadata")
+        _wrap_traced(Bucket, "copy_blob", "storage.copy")
+
+    _instrument_once("storage", install)
+    return admin_storage.bucket(name)
+
+
+_YFINANCE_TICKER_CALLS = (
+    "history",
+    "option_chain",
+    "get_earnings_dates",
+    "info",
+    "news",
+    "options",
+    "calendar",
+    "dividends",
+    "recommendations",
+    "quarterly_income_stmt",
+    "quarterly_balance_sheet",
+    "quarterly_cashflow",
+)
+
+
+def _yfinance() -> Any:
+    """Imports yfinance with its downloads and Ticker lookups traced as `yfinance.*` phases."""
+    import yfinance as yf  # type: ignore
+
+    def install() -> None:
+        _wrap_traced(yf, "download", "yfinance.download", _frame_rows)
+        for attr in _YFINANCE_TICKER_CALLS:
+            _wrap_traced(yf.Ticker, attr, f"yfinance.{attr}", _frame_rows)
+
+    _instrument_once("yfinance", install)
+    return yf
+
+
+def _http_phase(host: str) -> str:
+    if host == "api.openai.com":
+        return "openai"
+    if host.endswith("yahoo.com"):
+        return "yahoo"
+    return "http"
+
+
+_HTTP_SESSIONS: dict[str, requests.Session] = {}
+_HTTP_REQUEST_COUNTS: dict[str, int] = {}
+_HTTP_SESSIONS_LOCK = threading.Lock()
+# Idempotent methods retry on throttling/5xx; writes (social posts, orders, LLM calls) only
+# retry connection failures, where the request never reached the server.
+_HTTP_RETRY_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "DELETE"})
+
+
+def _http_session(url: str) -> requests.Session:
+    """Returns the pooled keep-alive session for the URL's host, shared across warm invocations."""
+    host = (urlparse(url).netloc or "").lower()
+    session = _HTTP_SESSIONS.get(host)
+    if session is not None:
+        return session
+    with _HTTP_SESSIONS_LOCK:
+        session = _HTTP_SESSIONS.get(host)
+        if session is None:
+            retry = Retry(
+                total=HTTP_RETRY_TOTAL,
+                connect=HTTP_RETRY_TOTAL,
+                read=1,
+                status=HTTP_RETRY_TOTAL,
+                backoff_factor=0.4,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=_HTTP_RETRY_METHODS,
+                # Callers inspect status codes themselves; never sleep on long Retry-After values.
+                raise_on_status=False,
+                respect_retry_after_header=False,
+            )
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=HTTP_POOL_MAXSIZE, max_retries=retry)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _HTTP_SESSIONS[host] = session
+    return session
+
+
+def _http_request(method: str, url: str, **kwargs: Any) -> requests.Response:
+    session = _http_session(url)
+    host = (urlparse(url).netloc or "").lower()
+    with _HTTP_SESSIONS_LOCK:
+        _HTTP_REQUEST_COUNTS[host] = _HTTP_REQUEST_COUNTS.get(host, 0) + 1
+    with _span(_http_phase(host), host=host, method=method) as attrs:
+        resp = session.request(method, url, **kwargs)
+        attrs["status"] = resp.status_code
+        length = resp.headers.get("Content-Length")
+        attrs["bytes"] = int(length) if length and length.isdigit() else len(resp.content or b"")
+    return resp
+
+
+def _http_get(url: str, **kwargs: Any) -> requests.Response:
+    return _http_request("GET", url, **kwargs)
+
+
+def _http_post(url: str, **kwargs: Any) -> requests.Response:
+    return _http_request("POST", url, **kwargs)
+
+
+def _http_delete(url: str, **kwargs: Any) -> requests.Response:
+    return _http_request("DELETE", url, **kwargs)
+
+
+def _http_pool_stats() -> dict[str, dict[str, int]]:
+    """Per-host request and connection counters; `reused` counts requests served on a kept-alive socket."""
+    with _HTTP_SESSIONS_LOCK:
+        sessions = list(_HTTP_SESSIONS.items())
+        counts = dict(_HTTP_REQUEST_COUNTS)
+    out: dict[str, dict[str, int]] = {}
+    for host, session in sessions:
+        connections = 0
+        adapter = session.get_adapter("https://")
+        pools = getattr(getattr(adapter, "poolmanager", None), "pools", None)
+        if pools is not None:
+            for key in list(pools.keys()):
+                try:
+                    connections += int(getattr(pools[key], "num_connections", 0) or 0)
+                except Exception:
+                    continue
+        requests_sent = counts.get(host, 0)
+        out[host] = {
+            "requests": requests_sent,
+            "connections": connections,
+            "reused": max(0, requests_sent - connections),
+        }
+    return out
+
+
 def _yahoo_headers() -> dict[str, str]:
     # Yahoo endpoints frequently rate-limit requests without a browser-like UA.
     return {
@@ -893,7 +1555,7 @@ def _post_x_direct(text: str) -> dict[str, Any]:
         ]
         response = None
         for endpoint in endpoints:
-            candidate = requests.post(
+            candidate = _http_post(
                 endpoint,
                 headers=headers,
                 auth=auth,
@@ -972,7 +1634,7 @@ def _post_linkedin_direct(text: str) -> dict[str, Any]:
         "visibility": {"com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"},
     }
     try:
-        response = requests.post(
+        response = _http_post(
             "https://api.linkedin.com/v2/ugcPosts",
             headers={
                 "Authorization": f"Bearer {LINKEDIN_ACCESS_TOKEN}",
@@ -1002,7 +1664,7 @@ def _post_facebook_direct(text: str) -> dict[str, Any]:
             "error": "Missing FACEBOOK_PAGE_ID or FACEBOOK_PAGE_ACCESS_TOKEN for Facebook posting.",
         }
     try:
-        response = requests.post(
+        response = _http_post(
             f"https://graph.facebook.com/{META_GRAPH_API_VERSION}/{FACEBOOK_PAGE_ID}/feed",
             data={"message": text, "access_token": FACEBOOK_PAGE_ACCESS_TOKEN},
             timeout=20,
@@ -1030,7 +1692,7 @@ def _post_instagram_direct(text: str) -> dict[str, Any]:
     if not INSTAGRAM_DEFAULT_IMAGE_URL:
         return {"ok": False, "pendingCredentials": True, "error": "Missing INSTAGRAM_DEFAULT_IMAGE_URL for Instagram posts."}
     try:
-        create_resp = requests.post(
+        create_resp = _http_post(
             f"https://graph.facebook.com/{META_GRAPH_API_VERSION}/{INSTAGRAM_BUSINESS_ACCOUNT_ID}/media",
             data={
                 "image_url": INSTAGRAM_DEFAULT_IMAGE_URL,
@@ -1049,7 +1711,7 @@ def _post_instagram_direct(text: str) -> dict[str, Any]:
         if not creation_id:
             return {"ok": False, "pendingCredentials": False, "error": "Instagram media create did not return an id."}
 
-        publish_resp = requests.post(
+        publish_resp = _http_post(
             f"https://graph.facebook.com/{META_GRAPH_API_VERSION}/{INSTAGRAM_BUSINESS_ACCOUNT_ID}/media_publish",
             data={
                 "creation_id": creation_id,
@@ -1238,7 +1900,7 @@ def _invoke_amazon_nova_text(
         "x-api-key": AMAZON_NOVA_API_KEY,
     }
     try:
-        response = requests.post(endpoint, headers=headers, json=payload, timeout=30)
+        response = _http_post(endpoint, headers=headers, json=payload, timeout=30)
         response.raise_for_status()
         body = response.json() if response.text else {}
         return _extract_nova_output_text(body)
@@ -1293,7 +1955,7 @@ def _yahoo_search_symbols(query: str, *, max_results: int = 8) -> list[str]:
     if not q:
         return []
     try:
-        response = requests.get(
+        response = _http_get(
             YAHOO_SEARCH_URL,
             headers=_yahoo_headers(),
             params={"q": q, "quotesCount": max(1, min(max_results, 20)), "newsCount": 0},
@@ -1321,35 +1983,39 @@ def _yahoo_search_symbols(query: str, *, max_results: int = 8) -> list[str]:
     return out
 
 
+_COUNTRY_CODE_ALIASES: dict[str, str] = {
+    "USA": "US",
+    "UNITED STATES": "US",
+    "UNITED STATES OF AMERICA": "US",
+    "U.S.": "US",
+    "U.S.A.": "US",
+    "CANADA": "CA",
+    "UNITED KINGDOM": "GB",
+    "UK": "GB",
+    "GREAT BRITAIN": "GB",
+    "GERMANY": "DE",
+    "FRANCE": "FR",
+    "JAPAN": "JP",
+    "CHINA": "CN",
+    "HONG KONG": "HK",
+    "INDIA": "IN",
+    "AUSTRALIA": "AU",
+    "BRAZIL": "BR",
+    "MEXICO": "MX",
+    "SOUTH KOREA": "KR",
+    "TAIWAN": "TW",
+    "SINGAPORE": "SG",
+}
+# Markets prewarmed by `market_headlines_prewarm_scheduler`, in alias-table order.
+MARKET_HEADLINES_PREWARM_COUNTRIES = list(dict.fromkeys(_COUNTRY_CODE_ALIASES.values()))[:10]
+
+
 def _normalize_country_code(raw: Any) -> str:
     text = str(raw or "").strip().upper()
     if not text:
         return "US"
-    alias = {
-        "USA": "US",
-        "UNITED STATES": "US",
-        "UNITED STATES OF AMERICA": "US",
-        "U.S.": "US",
-        "U.S.A.": "US",
-        "CANADA": "CA",
-        "UNITED KINGDOM": "GB",
-        "UK": "GB",
-        "GREAT BRITAIN": "GB",
-        "GERMANY": "DE",
-        "FRANCE": "FR",
-        "JAPAN": "JP",
-        "CHINA": "CN",
-        "HONG KONG": "HK",
-        "INDIA": "IN",
-        "AUSTRALIA": "AU",
-        "BRAZIL": "BR",
-        "MEXICO": "MX",
-        "SOUTH KOREA": "KR",
-        "TAIWAN": "TW",
-        "SINGAPORE": "SG",
-    }
-    if text in alias:
-        return alias[text]
+    if text in _COUNTRY_CODE_ALIASES:
+        return _COUNTRY_CODE_ALIASES[text]
     if len(text) == 2 and text.isalpha():
         return text
     return "US"
@@ -1357,7 +2023,7 @@ def _normalize_country_code(raw: Any) -> str:
 
 def _is_us_equity_symbol(symbol: str) -> bool:
     try:
-        import yfinance as yf  # type: ignore
+        yf = _yfinance()
 
         info = yf.Ticker(str(symbol or "").strip().upper()).info or {}
         if not isinstance(info, dict):
@@ -1413,7 +2079,7 @@ def _fetch_yahoo_corporate_events_for_ticker(
     start_date: date,
     end_date: date,
 ) -> list[dict[str, Any]]:
-    import yfinance as yf  # type: ignore
+    yf = _yfinance()
 
     symbol = _normalize_symbol_token(ticker)
     if not symbol:
@@ -1503,6 +2169,67 @@ def _fetch_yahoo_corporate_events_for_ticker(
     return out
 
 
+_CORPORATE_EVENTS_CACHE: dict[tuple[str, str, str], dict[str, Any]] = {}
+_CORPORATE_EVENTS_CACHE_MAX_ENTRIES = 2000
+# Concurrent requests on one instance share the module-level caches below; each has a lock
+# around its lookups and its evict-then-insert, never around the fetch itself.
+_CORPORATE_EVENTS_CACHE_LOCK = threading.Lock()
+
+
+def _fetch_yahoo_corporate_events_cached(
+    tickers: list[str],
+    *,
+    start_date: date,
+    end_date: date,
+) -> list[dict[str, Any]]:
+    """Loads Yahoo events for many tickers, fetching only expired symbols and running them concurrently."""
+    now = time.time()
+    window = (start_date.isoformat(), end_date.isoformat())
+    events: list[dict[str, Any]] = []
+    missing: list[str] = []
+    with _CORPORATE_EVENTS_CACHE_LOCK:
+        cached_by_symbol = {symbol: _CORPORATE_EVENTS_CACHE.get((symbol, *window)) for symbol in tickers}
+    for symbol in tickers:
+        cached = cached_by_symbol[symbol]
+        if cached and (now - float(cached.get("loadedAt") or 0.0)) < CORPORATE_EVENTS_CACHE_TTL_SECONDS:
+            events.extend(dict(row) for row in cached["events"])
+        else:
+            missing.append(symbol)
+        _record_cache("corporate_events", symbol not in missing)
+    if not missing:
+        return events
+
+    def _load(symbol: str) -> tuple[str, list[dict[str, Any]] | None]:
+        try:
+            return symbol, _fetch_yahoo_corporate_events_for_ticker(symbol, start_date=start_date, end_date=end_date)
+        except Exception:
+            return symbol, None
+
+    with ThreadPoolExecutor(max_workers=min(len(missing), CORPORATE_EVENTS_FETCH_WORKERS)) as pool:
+        results = list(pool.map(_in_trace_context(_load), missing))
+
+    with _CORPORATE_EVENTS_CACHE_LOCK:
+        if len(_CORPORATE_EVENTS_CACHE) + len(results) > _CORPORATE_EVENTS_CACHE_MAX_ENTRIES:
+            expired = [
+                key
+                for key, entry in _CORPORATE_EVENTS_CACHE.items()
+                if (now - float(entry.get("loadedAt") or 0.0)) >= CORPORATE_EVENTS_CACHE_TTL_SECONDS
+            ]
+            for key in expired:
+                _CORPORATE_EVENTS_CACHE.pop(key, None)
+            if len(_CORPORATE_EVENTS_CACHE) + len(results) > _CORPORATE_EVENTS_CACHE_MAX_ENTRIES:
+                _CORPORATE_EVENTS_CACHE.clear()
+        for symbol, rows in results:
+            # Failed lookups are retried on the next call instead of being cached as empty.
+            if rows is not None:
+                _CORPORATE_EVENTS_CACHE[(symbol, *window)] = {"events": rows, "loadedAt": now}
+
+    for _, rows in results:
+        if rows is not None:
+            events.extend(dict(row) for row in rows)
+    return events
+
+
 def _fetch_massive_corporate_events(
     *,
     tickers: list[str],
@@ -1543,7 +2270,7 @@ def _fetch_massive_corporate_events(
 
     url = f"{MASSIVE_BASE_URL}/tmx/v1/corporate-events"
     try:
-        response = requests.get(url, params=params, timeout=18)
+        response = _http_get(url, params=params, timeout=18)
         response.raise_for_status()
         payload = response.json() if response.text else {}
         rows = payload.get("results") or []
@@ -1605,7 +2332,7 @@ def _fetch_yahoo_news_query(query: str, *, limit: int = 12) -> list[dict[str, An
     seen: set[str] = set()
     out: list[dict[str, Any]] = []
     try:
-        response = requests.get(
+        response = _http_get(
             YAHOO_SEARCH_URL,
             headers=_yahoo_headers(),
             params={"q": q, "newsCount": max(1, min(int(limit or 12), 50)), "quotesCount": 0, "listsCount": 0},
@@ -1656,7 +2383,7 @@ def _fetch_unsplash_random_photos(
         return [], "Unsplash access key is not configured."
 
     try:
-        response = requests.get(
+        response = _http_get(
             "https://api.unsplash.com/photos/random",
             headers={
                 "Accept-Version": "v1",
@@ -1972,7 +2699,7 @@ def _fetch_social_posts_via_web_search(
     errors: list[str] = []
     for source_name, source_url, source_headers in attempts:
         try:
-            response = requests.get(source_url, headers=source_headers, timeout=16)
+            response = _http_get(source_url, headers=source_headers, timeout=16)
             if response.status_code >= 400:
                 errors.append(f"{source_name} HTTP {response.status_code}")
                 continue
@@ -2053,7 +2780,7 @@ def _fetch_reddit_social_posts(query: str, *, limit: int = 8) -> list[dict[str,
             continue
         seen_queries.add(clean_query.lower())
         try:
-            response = requests.get(
+            response = _http_get(
                 "https://www.reddit.com/search.json",
                 params={
                     "q": clean_query,
@@ -2123,7 +2850,7 @@ def _fetch_x_news_stories(
     }
 
     try:
-        response = requests.get(
+        response = _http_get(
             endpoint,
             headers={"Authorization": f"Bearer {TWITTER_BEARER_TOKEN}"},
             params=params,
@@ -2269,7 +2996,7 @@ def _fetch_x_social_posts(query: str, *, limit: int = 8) -> tuple[list[dict[str,
     try:
         for auth_mode, headers, auth_obj in auth_attempts:
             for endpoint in endpoints:
-                response = requests.get(
+                response = _http_get(
                     endpoint,
                     headers=headers,
                     auth=auth_obj,
@@ -2361,7 +3088,7 @@ def _fetch_meta_social_posts(query: str, *, platform: str, limit: int = 6) -> tu
                 return fallback_posts, "Using web fallback for Facebook because page credentials are missing."
             return [], "Facebook page credentials are not configured."
         try:
-            response = requests.get(
+            response = _http_get(
                 f"https://graph.facebook.com/{META_GRAPH_API_VERSION}/{FACEBOOK_PAGE_ID}/posts",
                 params={
                     "access_token": FACEBOOK_PAGE_ACCESS_TOKEN,
@@ -2416,7 +3143,7 @@ def _fetch_meta_social_posts(query: str, *, platform: str, limit: int = 6) -> tu
                 return fallback_posts, "Using web fallback for Instagram because business credentials are missing."
             return [], "Instagram business credentials are not configured."
         try:
-            response = requests.get(
+            response = _http_get(
                 f"https://graph.facebook.com/{META_GRAPH_API_VERSION}/{INSTAGRAM_BUSINESS_ACCOUNT_ID}/media",
                 params={
                     "access_token": INSTAGRAM_ACCESS_TOKEN,
@@ -2528,7 +3255,7 @@ def _resolve_screener_note_signals(
             "max_output_tokens": 600,
         }
         try:
-            response = requests.post(
+            response = _http_post(
                 "https://api.openai.com/v1/responses",
                 headers={
                     "Authorization": f"Bearer {OPENAI_API_KEY}",
@@ -2679,7 +3406,7 @@ def _generate_social_copy_with_openai(
             "text": {"format": {"type": "json_object"}},
             "max_output_tokens": max_output_tokens,
         }
-        response = requests.post(
+        response = _http_post(
             "https://api.openai.com/v1/responses",
             headers={
                 "Authorization": f"Bearer {OPENAI_API_KEY}",
@@ -2706,7 +3433,7 @@ def _generate_social_copy_with_openai(
             ],
             "response_format": {"type": "json_object"},
         }
-        chat_response = requests.post(
+        chat_response = _http_post(
             "https://api.openai.com/v1/chat/completions",
             headers={
                 "Authorization": f"Bearer {OPENAI_API_KEY}",
@@ -2796,6 +3523,19 @@ def _generate_social_copy_with_openai(
     return normalized, (SOCIAL_CONTENT_MODEL if used_model else "template_fallback")
 
 
+def _commit_set_batches(writes: list[tuple[Any, dict[str, Any]]], *, merge: bool = True) -> int:
+    """Applies (ref, payload) sets in Firestore batches of at most FIRESTORE_BATCH_LIMIT writes."""
+    committed = 0
+    for offset in range(0, len(writes), FIRESTORE_BATCH_LIMIT):
+        chunk = writes[offset : offset + FIRESTORE_BATCH_LIMIT]
+        batch = db.batch()
+        for ref, payload in chunk:
+            batch.set(ref, payload, merge=merge)
+        batch.commit()
+        committed += len(chunk)
+    return committed
+
+
 def _enqueue_social_posts(
     *,
     campaign_id: str,
@@ -2913,7 +3653,7 @@ def _post_to_social_channel(
         "campaignId": campaign_id,
         "queueId": queue_id,
     }
-    response = requests.post(webhook, json=payload, timeout=20)
+    response = _http_post(webhook, json=payload, timeout=20)
     if response.status_code >= 400:
         return {"ok": False, "pendingCredentials": False, "error": f"{response.status_code} {response.text}"}
     external_id = ""
@@ -2925,6 +3665,34 @@ def _post_to_social_channel(
     return {"ok": True, "externalId": external_id, "statusCode": response.status_code, "provider": "webhook"}
 
 
+def _social_post_update(item: dict[str, Any], result: dict[str, Any]) -> tuple[str, dict[str, Any]]:
+    """Queue status and social_queue update for one publish attempt."""
+    attempts = int(item.get("attempts") or 0) + 1
+    if result.get("ok"):
+        return "posted", {
+            "status": "posted",
+            "attempts": attempts,
+            "postedAt": firestore.SERVER_TIMESTAMP,
+            "updatedAt": firestore.SERVER_TIMESTAMP,
+            "externalId": result.get("externalId") or "",
+            "lastError": "",
+        }
+    if result.get("pendingCredentials"):
+        return "waiting_credentials", {
+            "status": "waiting_credentials",
+            "attempts": attempts,
+            "updatedAt": firestore.SERVER_TIMESTAMP,
+            "lastError": str(result.get("error") or "Missing credentials"),
+        }
+    status = "failed" if attempts >= 3 else "retry"
+    return status, {
+        "status": status,
+        "attempts": attempts,
+        "updatedAt": firestore.SERVER_TIMESTAMP,
+        "lastError": str(result.get("error") or "Publish failed"),
+    }
+
+
 def _dispatch_due_social_posts(*, max_posts: int, trigger: str, actor_uid: str = "") -> dict[str, Any]:
     now_utc = datetime.now(timezone.utc)
     snapshot = (
@@ -2943,68 +3711,59 @@ def _dispatch_due_social_posts(*, max_posts: int, trigger: str, actor_uid: str =
         if len(due_docs) >= max_posts:
             break
 
-    posted = 0
-    waiting_credentials = 0
-    failed = 0
-    retried = 0
-    processed_ids: list[str] = []
-
+    by_platform: dict[str, list[tuple[str, dict[str, Any]]]] = {}
     for queue_id, item in due_docs:
         platform = str(item.get("platform") or "").strip().lower()
-        attempts = int(item.get("attempts") or 0)
-        result = _post_to_social_channel(
-            platform=platform,
-            body=str(item.get("body") or ""),
-            headline=str(item.get("headline") or ""),
-            hashtags=item.get("hashtags") if isinstance(item.get("hashtags"), list) else [],
-            cta=str(item.get("cta") or ""),
-            cta_url=str(item.get("ctaUrl") or SOCIAL_DEFAULT_CTA_URL),
-            campaign_id=str(item.get("campaignId") or ""),
-            queue_id=queue_id,
-        )
-
-        ref = db.collection("social_queue").document(queue_id)
-        if result.get("ok"):
-            ref.set(
-                {
-                    "status": "posted",
-                    "attempts": attempts + 1,
-                    "postedAt": firestore.SERVER_TIMESTAMP,
-                    "updatedAt": firestore.SERVER_TIMESTAMP,
-                    "externalId": result.get("externalId") or "",
-                    "lastError": "",
-                },
-                merge=True,
-            )
-            posted += 1
-        elif result.get("pendingCredentials"):
-            ref.set(
-                {
-                    "status": "waiting_credentials",
-                    "attempts": attempts + 1,
-                    "updatedAt": firestore.SERVER_TIMESTAMP,
-                    "lastError": str(result.get("error") or "Missing credentials"),
-                },
-                merge=True,
-            )
-            waiting_credentials += 1
-        else:
-            next_attempts = attempts + 1
-            exhausted = next_attempts >= 3
-            ref.set(
-                {
-                    "status": "failed" if exhausted else "retry",
-                    "attempts": next_attempts,
-                    "updatedAt": firestore.SERVER_TIMESTAMP,
-                    "lastError": str(result.get("error") or "Publish failed"),
-                },
-                merge=True,
-            )
-            if exhausted:
-                failed += 1
-            else:
-                retried += 1
-        processed_ids.append(queue_id)
+        by_platform.setdefault(platform, []).append((queue_id, item))
+
+    def _publish_platform(
+        platform: str,
+        items: list[tuple[str, dict[str, Any]]],
+    ) -> list[tuple[str, str]]:
+        # Posts to one platform stay sequential and spaced out; platforms run in parallel.
+        min_interval = SOCIAL_PLATFORM_MIN_INTERVAL_SECONDS.get(platform, 1.0)
+        results: list[tuple[str, str]] = []
+        last_sent = 0.0
+        for queue_id, item in items:
+            wait_s = min_interval - (time.monotonic() - last_sent)
+            if last_sent and wait_s > 0:
+                time.sleep(wait_s)
+            last_sent = time.monotonic()
+            try:
+                result = _post_to_social_channel(
+                    platform=platform,
+                    body=str(item.get("body") or ""),
+                    headline=str(item.get("headline") or ""),
+                    hashtags=item.get("hashtags") if isinstance(item.get("hashtags"), list) else [],
+                    cta=str(item.get("cta") or ""),
+                    cta_url=str(item.get("ctaUrl") or SOCIAL_DEFAULT_CTA_URL),
+                    campaign_id=str(item.get("campaignId") or ""),
+                    queue_id=queue_id,
+                )
+            except Exception as exc:
+                result = {"ok": False, "pendingCredentials": False, "error": str(exc)[:500]}
+            outcome, update = _social_post_update(item, result)
+            # Record each post as soon as it is published, so a crash or timeout later in the
+            # run cannot leave an already-published post queued for a duplicate retry.
+            try:
+                db.collection("social_queue").document(queue_id).set(update, merge=True)
+            except Exception as exc:
+                print(f"Warning: unable to record social post {queue_id} as {update['status']}: {exc}")
+            results.append((queue_id, outcome))
+        return results
+
+    dispatched: list[tuple[str, str]] = []
+    if by_platform:
+        with ThreadPoolExecutor(max_workers=min(len(by_platform), SOCIAL_DISPATCH_MAX_WORKERS)) as pool:
+            for platform_results in pool.map(_in_trace_context(lambda entry: _publish_platform(*entry)), list(by_platform.items())):
+                dispatched.extend(platform_results)
+
+    outcomes = [outcome for _, outcome in dispatched]
+    posted = outcomes.count("posted")
+    waiting_credentials = outcomes.count("waiting_credentials")
+    failed = outcomes.count("failed")
+    retried = outcomes.count("retry")
+    processed_ids = [queue_id for queue_id, _ in dispatched]
 
     db.collection("social_dispatch_logs").add(
         {
@@ -3362,60 +4121,340 @@ def _meta_build_custom_data(params: Any) -> dict[str, Any]:
     return out
 
 
+_AUDIT_BUFFER: deque[dict[str, Any]] = deque()
+_AUDIT_LOCK = threading.Lock()
+_AUDIT_FLUSH_LOCK = threading.Lock()
+_AUDIT_FLUSH_SIGNAL = threading.Event()
+_AUDIT_STATS: dict[str, int] = {"enqueued": 0, "written": 0, "dropped": 0, "failedBatches": 0}
+_AUDIT_FLUSHER: dict[str, Any] = {"thread": None}
+
+
 def _audit_event(uid: str, email: str | None, event_type: str, payload: dict[str, Any]) -> None:
-    db.collection("user_events").add(
-        {
-            "userId": uid,
-            "userEmail": email,
-            "eventType": event_type,
-            "payload": payload,
-            "createdAt": firestore.SERVER_TIMESTAMP,
-        }
-    )
+    """Buffers a `user_events` record; a background flusher writes it off the request path."""
+    event = {
+        "userId": uid,
+        "userEmail": email,
+        "eventType": event_type,
+        "payload": payload,
+        "createdAt": firestore.SERVER_TIMESTAMP,
+    }
+    with _AUDIT_LOCK:
+        if len(_AUDIT_BUFFER) >= AUDIT_BUFFER_MAX_EVENTS:
+            _AUDIT_STATS["dropped"] += 1
+            return
+        _AUDIT_BUFFER.append(event)
+        _AUDIT_STATS["enqueued"] += 1
+    _ensure_audit_flusher()
+    _AUDIT_FLUSH_SIGNAL.set()
+
+
+def _flush_audit_events() -> int:
+    """Writes buffered audit events in batches of up to FIRESTORE_BATCH_LIMIT. Returns events written."""
+    written = 0
+    with _AUDIT_FLUSH_LOCK:
+        while True:
+            with _AUDIT_LOCK:
+                chunk = [_AUDIT_BUFFER.popleft() for _ in range(min(len(_AUDIT_BUFFER), FIRESTORE_BATCH_LIMIT))]
+            if not chunk:
+                return written
+            try:
+                batch = db.batch()
+                for event in chunk:
+                    batch.set(db.collection("user_events").document(), event)
+                batch.commit()
+            except Exception as exc:
+                with _AUDIT_LOCK:
+                    _AUDIT_STATS["failedBatches"] += 1
+                    _AUDIT_STATS["dropped"] += len(chunk)
+                print(f"Warning: dropped {len(chunk)} audit events: {exc}")
+                return written
+            written += len(chunk)
+            with _AUDIT_LOCK:
+                _AUDIT_STATS["written"] += len(chunk)
+
+
+def _audit_flusher_loop() -> None:
+    while True:
+        _AUDIT_FLUSH_SIGNAL.wait(timeout=5.0)
+        _AUDIT_FLUSH_SIGNAL.clear()
+        try:
+            _flush_audit_events()
+        except Exception:
+            pass
 
 
-def _token_doc_id(token: str) -> str:
-    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+def _ensure_audit_flusher() -> None:
+    thread = _AUDIT_FLUSHER.get("thread")
+    if thread is not None and thread.is_alive():
+        return
+    with _AUDIT_LOCK:
+        thread = _AUDIT_FLUSHER.get("thread")
+        if thread is None or not thread.is_alive():
+            thread = threading.Thread(target=_audit_flusher_loop, name="audit-flusher", daemon=True)
+            thread.start()
+            _AUDIT_FLUSHER["thread"] = thread
 
 
-def _normalize_notification_token(raw: Any) -> str:
-    token = str(raw or "").strip()
-    if len(token) < 20:
-        return ""
-    return token
+atexit.register(_flush_audit_events)
 
 
-def _active_notification_tokens_for_user(user_id: str) -> list[str]:
-    docs = (
-        db.collection("notification_tokens")
-        .where("userId", "==", user_id)
-        .where("active", "==", True)
-        .limit(500)
-        .stream()
-    )
-    tokens: list[str] = []
-    for doc in docs:
-        token_value = (doc.to_dict() or {}).get("token")
-        if isinstance(token_value, str) and token_value:
-            tokens.append(token_value)
-    return list(dict.fromkeys(tokens))
+def _end_invocation() -> None:
+    # Make sure nothing buffered during this invocation is left behind if the instance is throttled.
+    if _AUDIT_BUFFER:
+        _flush_audit_events()
 
 
-def _send_push_tokens(tokens: list[str], title: str, body: str, data: dict[str, Any] | None = None) -> dict[str, Any]:
-    tokens = [str(token).strip() for token in tokens if str(token).strip()]
-    if not tokens:
-        return {"successCount": 0, "failureCount": 0, "failed": [], "staleTokenHashes": []}
+def _with_teardown(fn):
+    """Runs `_end_invocation` after scheduled and raw HTTP handlers, which bypass `_callable`."""
 
-    payload_data = {str(key): str(value) for key, value in (data or {}).items() if value is not None}
-    target = payload_data.get("url") or "/dashboard"
-    link = target if target.startswith("http") else f"{PUBLIC_ORIGIN}{target}"
-    icon = f"{PUBLIC_ORIGIN}/assets/quantura-icon.svg"
-    message = admin_messaging.MulticastMessage(
-        tokens=tokens[:500],
-        notification=admin_messaging.Notification(title=title, body=body),
-        data=payload_data,
-        webpush=admin_messaging.WebpushConfig(
-            notification=admin_messaging.WebpushNotification(
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _end_invocation()
+
+    return wrapper
+
+
+# Third-party modules behind each feature, loaded inside the endpoints on first use.
+# Endpoints declare their features through @_callable(features=...); every endpoint also
+# pays for _CORE_IMPORTS the first time it touches Firestore.
+_CORE_IMPORTS: tuple[str, ...] = ("firebase_admin.firestore",)
+FEATURE_IMPORTS: dict[str, tuple[str, ...]] = {
+    "billing": ("stripe",),
+    "messaging": ("firebase_admin.messaging",),
+    "storage": ("firebase_admin.storage",),
+    "social": ("requests_oauthlib",),
+    "market_data": ("numpy", "pandas", "yfinance"),
+    "technicals": ("pandas", "yfinance", "finta"),
+    "forecasting": ("numpy", "pandas", "yfinance", "prophet", "trading_calendar"),
+    "calendar": ("numpy", "trading_calendar"),
+    "backtesting": ("numpy", "pandas", "yfinance", "backtesting", "backtesting.test", "matplotlib.pyplot"),
+    "reports": ("matplotlib.pyplot", "pptx", "weasyprint"),
+    "remote_config": ("firebase_admin.remote_config",),
+}
+_ENDPOINT_FEATURES: dict[str, tuple[str, ...]] = {}
+
+
+def _endpoint_imports(name: str) -> tuple[str, ...]:
+    modules = list(_CORE_IMPORTS)
+    for feature in _ENDPOINT_FEATURES.get(name, ()):
+        modules.extend(module for module in FEATURE_IMPORTS[feature] if module not in modules)
+    return tuple(modules)
+
+
+def _load_endpoint_imports(name: str) -> tuple[str, ...]:
+    """Imports (and forces any lazy module to execute) everything endpoint `name` depends on.
+
+    Used by scripts/benchmark_functions_cold_start.py to time each endpoint's cold start.
+    """
+    modules = _endpoint_imports(name)
+    for module_name in modules:
+        module = importlib.import_module(module_name)
+        getattr(module, "__file__", None)
+    return modules
+
+
+# Cloud Run sizing classes. Concurrency above 1 needs a whole CPU, so every profile pins cpu=1;
+# heavy pandas/prophet/backtest work keeps one request per instance.
+DEPLOYMENT_PROFILES: dict[str, dict[str, Any]] = {
+    "light": {
+        "memory": MemoryOption.MB_256,
+        "timeout_sec": 60,
+        "cpu": 1,
+        "concurrency": 8,
+        "min_instances": 0,
+        "max_instances": 100,
+    },
+    "standard": {
+        "memory": MemoryOption.MB_512,
+        "timeout_sec": 120,
+        "cpu": 1,
+        "concurrency": 4,
+        "min_instances": 0,
+        "max_instances": 60,
+    },
+    "data": {
+        "memory": MemoryOption.GB_1,
+        "timeout_sec": 180,
+        "cpu": 1,
+        "concurrency": 2,
+        "min_instances": 0,
+        "max_instances": 40,
+    },
+    "compute": {
+        "memory": MemoryOption.GB_1,
+        "timeout_sec": 180,
+        "cpu": 1,
+        "concurrency": 1,
+        "min_instances": 0,
+        "max_instances": 20,
+    },
+}
+DEPLOYMENT_PROFILE_OPTIONS = ("memory", "timeout_sec", "cpu", "concurrency", "min_instances", "max_instances")
+# Written by scripts/recommend_deployment_profiles.py from measured endpoint_metrics logs.
+DEPLOYMENT_PROFILE_OVERRIDES_PATH = os.path.join(os.path.dirname(__file__), "deployment_profiles.json")
+_DEPLOYMENT_PROFILE_OVERRIDES: dict[str, dict[str, Any]] | None = None
+_ENDPOINT_PROFILES: dict[str, str] = {}
+_INSTANCE_INVOCATIONS = 0
+
+
+def _deployment_profile_overrides() -> dict[str, dict[str, Any]]:
+    global _DEPLOYMENT_PROFILE_OVERRIDES
+    if _DEPLOYMENT_PROFILE_OVERRIDES is None:
+        overrides: dict[str, dict[str, Any]] = {}
+        try:
+            with open(DEPLOYMENT_PROFILE_OVERRIDES_PATH, encoding="utf-8") as handle:
+                raw = json.load(handle)
+            endpoints = raw.get("endpoints") if isinstance(raw, dict) else None
+            if isinstance(endpoints, dict):
+                overrides = {str(name): dict(value) for name, value in endpoints.items() if isinstance(value, dict)}
+        except FileNotFoundError:
+            pass
+        except Exception as exc:
+            print(f"Warning: ignoring unreadable {DEPLOYMENT_PROFILE_OVERRIDES_PATH}: {exc}")
+        _DEPLOYMENT_PROFILE_OVERRIDES = overrides
+    return _DEPLOYMENT_PROFILE_OVERRIDES
+
+
+def _deployment_options(name: str, profile: str, **options: Any) -> dict[str, Any]:
+    """Resolves deploy options for endpoint `name`.
+
+    Later layers win: the named profile, options passed in code, then the measured
+    override for the endpoint. An override that switches the endpoint to another profile
+    replaces the in-code options too, since the recommendation was sized for that profile.
+    """
+    override = dict(_deployment_profile_overrides().get(name) or {})
+    recommended = str(override.pop("profile", None) or profile)
+    if recommended not in DEPLOYMENT_PROFILES:
+        raise ValueError(f"Unknown deployment profile {recommended!r} for {name}")
+    if recommended == profile:
+        resolved = {**DEPLOYMENT_PROFILES[profile], **options}
+    else:
+        resolved = {**options, **DEPLOYMENT_PROFILES[recommended]}
+    profile = recommended
+    for key in DEPLOYMENT_PROFILE_OPTIONS:
+        if key in override:
+            resolved[key] = MemoryOption(int(override[key])) if key == "memory" else override[key]
+    _ENDPOINT_PROFILES[name] = profile
+    return resolved
+
+
+def _peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    # ru_maxrss is reported in kilobytes on Linux.
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def _log_endpoint_metrics(name: str, started: float, failed: bool, trace: dict[str, Any] | None = None) -> None:
+    """Emits one structured log line per invocation; Cloud Logging parses it into jsonPayload.
+
+    The line carries the trace's per-phase totals and cache counts; span exporters also
+    receive the individual spans.
+    """
+    global _INSTANCE_INVOCATIONS
+    _INSTANCE_INVOCATIONS += 1
+    record = {
+        "event": "endpoint_metrics",
+        "endpoint": name,
+        "profile": _ENDPOINT_PROFILES.get(name),
+        "latencyMs": round((time.perf_counter() - started) * 1000, 1),
+        # High-water mark of the whole instance since it started (ru_maxrss), not this
+        # invocation alone: it includes earlier and concurrent requests on the instance.
+        "peakRssMb": _peak_rss_mb(),
+        "coldStart": _INSTANCE_INVOCATIONS == 1,
+        "failed": failed,
+        "phases": (trace or {}).get("phases") or {},
+        "cache": (trace or {}).get("cache") or {},
+    }
+    print(json.dumps(record))
+    if not _SPAN_EXPORTERS:
+        return
+    exported = {**record, "spans": (trace or {}).get("spans") or [], "droppedSpans": (trace or {}).get("droppedSpans", 0)}
+    for exporter in list(_SPAN_EXPORTERS):
+        try:
+            exporter.export(exported)
+        except Exception as exc:
+            print(f"Warning: span exporter {type(exporter).__name__} failed: {exc}")
+
+
+def _callable(*, profile: str = "light", features: tuple[str, ...] = (), **options: Any):
+    """`https_fn.on_call` sized by a deployment profile, with a span trace and per-invocation
+    teardown (audit flush, endpoint metrics) wrapped around the handler."""
+    unknown = sorted(set(features) - set(FEATURE_IMPORTS))
+    if unknown:
+        raise ValueError(f"Unknown endpoint features: {', '.join(unknown)}")
+
+    def decorator(fn):
+        _ENDPOINT_FEATURES[fn.__name__] = tuple(features)
+        deploy_options = _deployment_options(fn.__name__, profile, **options)
+
+        @functools.wraps(fn)
+        def wrapper(req: https_fn.CallableRequest) -> Any:
+            started = time.perf_counter()
+            trace_token = _start_trace(fn.__name__)
+            failed = True
+            try:
+                result = fn(req)
+                failed = False
+                return result
+            finally:
+                _end_invocation()
+                _log_endpoint_metrics(fn.__name__, started, failed, _finish_trace(trace_token))
+
+        return https_fn.on_call(**deploy_options)(wrapper)
+
+    return decorator
+
+
+def _token_doc_id(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _normalize_notification_token(raw: Any) -> str:
+    token = str(raw or "").strip()
+    if len(token) < 20:
+        return ""
+    return token
+
+
+def _active_notification_tokens_for_user(user_id: str) -> list[str]:
+    return _active_notification_tokens_for_users([user_id]).get(user_id, [])
+
+
+def _active_notification_tokens_for_users(user_ids: list[str]) -> dict[str, list[str]]:
+    """Loads active push tokens for many users with `in` queries of up to 30 user ids each."""
+    user_ids = list(dict.fromkeys([str(uid).strip() for uid in user_ids if str(uid or "").strip()]))
+    tokens_by_user: dict[str, list[str]] = {uid: [] for uid in user_ids}
+    for offset in range(0, len(user_ids), 30):
+        chunk = user_ids[offset : offset + 30]
+        query = db.collection("notification_tokens").where("active", "==", True)
+        if len(chunk) == 1:
+            query = query.where("userId", "==", chunk[0]).limit(500)
+        else:
+            query = query.where("userId", "in", chunk)
+        for doc in query.stream():
+            payload = doc.to_dict() or {}
+            token_value = payload.get("token")
+            owner = str(payload.get("userId") or "")
+            if isinstance(token_value, str) and token_value and owner in tokens_by_user:
+                tokens_by_user[owner].append(token_value)
+    return {uid: list(dict.fromkeys(tokens)) for uid, tokens in tokens_by_user.items()}
+
+
+def _send_push_multicast(tokens: list[str], title: str, body: str, payload_data: dict[str, str]) -> dict[str, Any]:
+    """Sends one FCM multicast (at most FCM_MULTICAST_LIMIT tokens)."""
+    target = payload_data.get("url") or "/dashboard"
+    link = target if target.startswith("http") else f"{PUBLIC_ORIGIN}{target}"
+    icon = f"{PUBLIC_ORIGIN}/assets/quantura-icon.svg"
+    message = admin_messaging.MulticastMessage(
+        tokens=tokens,
+        notification=admin_messaging.Notification(title=title, body=body),
+        data=payload_data,
+        webpush=admin_messaging.WebpushConfig(
+            notification=admin_messaging.WebpushNotification(
                 title=title,
                 body=body,
                 icon=icon,
@@ -3432,7 +4471,7 @@ def _send_push_tokens(tokens: list[str], title: str, body: str, data: dict[str,
         # Avoid surfacing an opaque "internal error" to the caller. We still audit via _notify_user().
         return {
             "successCount": 0,
-            "failureCount": len(tokens[:500]),
+            "failureCount": len(tokens),
             "failed": [{"tokenHash": _token_doc_id(t), "error": str(exc)} for t in tokens[:5]],
             "staleTokenHashes": [],
             "error": str(exc),
@@ -3463,6 +4502,45 @@ def _send_push_tokens(tokens: list[str], title: str, body: str, data: dict[str,
     }
 
 
+def _send_push_tokens(tokens: list[str], title: str, body: str, data: dict[str, Any] | None = None) -> dict[str, Any]:
+    """Fans any number of tokens out into concurrent FCM_MULTICAST_LIMIT-sized multicasts."""
+    tokens = list(dict.fromkeys([str(token).strip() for token in tokens if str(token).strip()]))
+    if not tokens:
+        return {"successCount": 0, "failureCount": 0, "failed": [], "staleTokenHashes": []}
+
+    payload_data = {str(key): str(value) for key, value in (data or {}).items() if value is not None}
+    chunks = [tokens[offset : offset + FCM_MULTICAST_LIMIT] for offset in range(0, len(tokens), FCM_MULTICAST_LIMIT)]
+    if len(chunks) == 1:
+        results = [_send_push_multicast(chunks[0], title, body, payload_data)]
+    else:
+        with ThreadPoolExecutor(max_workers=min(len(chunks), PUSH_SEND_MAX_WORKERS)) as pool:
+            results = list(pool.map(_in_trace_context(lambda chunk: _send_push_multicast(chunk, title, body, payload_data)), chunks))
+
+    merged: dict[str, Any] = {"successCount": 0, "failureCount": 0, "failed": [], "staleTokenHashes": []}
+    errors: list[str] = []
+    for result in results:
+        merged["successCount"] += int(result.get("successCount") or 0)
+        merged["failureCount"] += int(result.get("failureCount") or 0)
+        merged["failed"].extend(result.get("failed") or [])
+        merged["staleTokenHashes"].extend(result.get("staleTokenHashes") or [])
+        if result.get("error"):
+            errors.append(str(result["error"]))
+    if errors:
+        merged["error"] = errors[0]
+    return merged
+
+
+def _deactivate_notification_tokens(token_hashes: list[str]) -> None:
+    writes = [
+        (
+            db.collection("notification_tokens").document(str(token_hash)),
+            {"active": False, "updatedAt": firestore.SERVER_TIMESTAMP},
+        )
+        for token_hash in dict.fromkeys(token_hashes)
+    ]
+    _commit_set_batches(writes)
+
+
 def _notify_user(
     user_id: str,
     user_email: str | None,
@@ -3470,8 +4548,10 @@ def _notify_user(
     body: str,
     data: dict[str, Any] | None = None,
     explicit_token: str | None = None,
+    tokens: list[str] | None = None,
 ) -> dict[str, Any]:
-    tokens = _active_notification_tokens_for_user(user_id)
+    """Pushes to every active token of one user; pass `tokens` when they were already loaded in bulk."""
+    tokens = list(tokens) if tokens is not None else _active_notification_tokens_for_user(user_id)
     fallback_token = _normalize_notification_token(explicit_token)
     used_fallback_token = False
     if fallback_token:
@@ -3493,14 +4573,7 @@ def _notify_user(
         )
     tokens = list(dict.fromkeys(tokens))
     result = _send_push_tokens(tokens, title=title, body=body, data=data)
-    for stale_hash in result.get("staleTokenHashes", []):
-        db.collection("notification_tokens").document(str(stale_hash)).set(
-            {
-                "active": False,
-                "updatedAt": firestore.SERVER_TIMESTAMP,
-            },
-            merge=True,
-        )
+    _deactivate_notification_tokens(result.get("staleTokenHashes", []))
     _audit_event(
         user_id,
         user_email,
@@ -3518,49 +4591,169 @@ def _notify_user(
     return result
 
 
-def _serialize_for_firestore(value: Any) -> Any:
-    try:
-        import numpy as np  # type: ignore
+def _broadcast_notification(
+    user_ids: list[str],
+    title: str,
+    body: str,
+    data: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Sends one message to many users: bulk token lookup, chunked multicasts, batched stale cleanup."""
+    tokens_by_user = _active_notification_tokens_for_users(user_ids)
+    tokens = [token for user_tokens in tokens_by_user.values() for token in user_tokens]
+    result = _send_push_tokens(tokens, title=title, body=body, data=data)
+    _deactivate_notification_tokens(result.get("staleTokenHashes", []))
+    result["userCount"] = len(tokens_by_user)
+    result["attemptedTokenCount"] = len(set(tokens))
+    return result
 
-        if isinstance(value, (np.floating, np.integer)):
-            return value.item()
-        if isinstance(value, np.ndarray):
-            return [_serialize_for_firestore(item) for item in value.tolist()]
-    except Exception:
-        pass
 
-    try:
-        import pandas as pd  # type: ignore
+def _ticker_subscriber_ids(ticker: str) -> list[str]:
+    """Workspace owners whose watchlist contains `ticker`."""
+    symbol = str(ticker or "").upper().strip()
+    if not symbol:
+        return []
+    user_ids: list[str] = []
+    for doc in db.collection_group("watchlist").where("ticker", "==", symbol).stream():
+        owner_ref = doc.reference.parent.parent
+        if owner_ref is not None:
+            user_ids.append(owner_ref.id)
+    return list(dict.fromkeys(user_ids))
+
+
+_FIRESTORE_PASSTHROUGH = "passthrough"
+_FIRESTORE_LIST = "list"
+_FIRESTORE_DICT = "dict"
+# Handler per concrete type, resolved on first sight. numpy/pandas types can only show up once
+# those modules are loaded, so resolving through sys.modules never imports them here.
+_FIRESTORE_HANDLERS: dict[type, Any] = {
+    str: _FIRESTORE_PASSTHROUGH,
+    int: _FIRESTORE_PASSTHROUGH,
+    float: _FIRESTORE_PASSTHROUGH,
+    bool: _FIRESTORE_PASSTHROUGH,
+    type(None): _FIRESTORE_PASSTHROUGH,
+    bytes: _FIRESTORE_PASSTHROUGH,
+    list: _FIRESTORE_LIST,
+    dict: _FIRESTORE_DICT,
+}
 
-        if isinstance(value, pd.Timestamp):
-            return value.isoformat()
-    except Exception:
-        pass
 
-    if isinstance(value, (datetime, date)):
-        return value.isoformat()
+def _firestore_datetime64_strings(values: Any) -> list[str]:
+    """ISO strings for a 1-D datetime64 array, matching `Timestamp.isoformat()` (NaT -> "NaT")."""
+    np = sys.modules["numpy"]
+    values = values.astype("datetime64[ns]")
+    ticks = values.view("i8")[~np.isnat(values)]
+    if not (ticks % 1_000_000_000).any():
+        return np.datetime_as_string(values, unit="s").tolist()
+    # Sub-second values: isoformat() only prints the fraction where it is non-zero.
+    return ["NaT" if item is None else item.isoformat() for item in values.astype("datetime64[us]").tolist()]
+
+
+def _firestore_array_values(values: Any) -> tuple[list[Any], bool]:
+    """Converts a numpy array in one pass. Returns (values, clean); clean lists hold only Firestore scalars."""
+    kind = values.dtype.kind
+    if kind in "biuf":
+        return values.tolist(), True
+    if kind == "M" and values.ndim == 1:
+        return _firestore_datetime64_strings(values), True
+    return values.tolist(), False
+
+
+def _firestore_series_values(series: Any) -> tuple[list[Any], bool]:
+    np = sys.modules["numpy"]
+    if isinstance(series.dtype, np.dtype):
+        return _firestore_array_values(series.to_numpy())
+    if series.dtype.kind == "M":
+        # Timezone-aware timestamps keep their offset, so format them one by one.
+        return [value.isoformat() for value in series], True
+    return series.astype(object).where(series.notna(), None).tolist(), False
+
+
+def _firestore_convert_frame(frame: Any) -> tuple[Any, bool]:
+    """Rows as `to_dict(orient="records")` would give them, but converted column by column."""
+    columns = list(frame.columns)
+    converted = [_firestore_series_values(frame.iloc[:, position]) for position in range(len(columns))]
+    rows = [dict(zip(columns, row)) for row in zip(*(values for values, _ in converted))]
+    if not columns:
+        rows = [{} for _ in range(len(frame))]
+    return rows, all(clean for _, clean in converted)
+
+
+def _firestore_convert_scalar(value: Any) -> tuple[Any, bool]:
+    return value.item(), True
+
+
+def _firestore_convert_datetime(value: Any) -> tuple[Any, bool]:
+    return value.isoformat(), True
+
+
+def _firestore_handler(kind: type) -> Any:
+    handler = _FIRESTORE_HANDLERS.get(kind)
+    if handler is not None:
+        return handler
+    np = sys.modules.get("numpy")
+    pd = sys.modules.get("pandas")
+    if issubclass(kind, (datetime, date)):
+        handler = _firestore_convert_datetime
+    elif issubclass(kind, dict):
+        handler = _FIRESTORE_DICT
+    elif issubclass(kind, list):
+        handler = _FIRESTORE_LIST
+    elif np is not None and issubclass(kind, (np.floating, np.integer, np.bool_)):
+        handler = _firestore_convert_scalar
+    elif np is not None and issubclass(kind, np.ndarray):
+        handler = _firestore_array_values
+    elif pd is not None and issubclass(kind, pd.DataFrame):
+        handler = _firestore_convert_frame
+    elif pd is not None and issubclass(kind, pd.Series):
+        handler = _firestore_series_values
+    else:
+        handler = _FIRESTORE_PASSTHROUGH
+    _FIRESTORE_HANDLERS[kind] = handler
+    return handler
 
-    if isinstance(value, list):
-        return [_serialize_for_firestore(item) for item in value]
-    if isinstance(value, dict):
-        return {key: _serialize_for_firestore(item) for key, item in value.items()}
-    return value
 
+def _serialize_for_firestore(value: Any) -> Any:
+    """Returns `value` with numpy/pandas/datetime values replaced by Firestore-safe scalars.
 
-def _trending_snapshots(tickers: list[str], max_rows: int = 18) -> dict[str, dict[str, Any]]:
+    Walks nested lists and dicts with an explicit stack and returns new containers.
+    DataFrames become lists of row dicts and Series/arrays become lists. They are converted
+    column-wise, so numeric and datetime columns never pass through the walk.
+    """
+    handlers = _FIRESTORE_HANDLERS
+    root = [value]
+    pending: list[Any] = [root]
+    while pending:
+        node = pending.pop()
+        for key, item in (node.items() if type(node) is dict else enumerate(node)):
+            handler = handlers.get(type(item)) or _firestore_handler(type(item))
+            if handler is _FIRESTORE_PASSTHROUGH:
+                continue
+            if handler is _FIRESTORE_LIST:
+                item = list(item)
+            elif handler is _FIRESTORE_DICT:
+                item = dict(item)
+            else:
+                item, clean = handler(item)
+                if clean:
+                    node[key] = item
+                    continue
+            node[key] = item
+            if type(item) is list or type(item) is dict:
+                pending.append(item)
+    return root[0]
+
+
+def _download_close_series(tickers: list[str], period: str) -> dict[str, pd.Series]:
+    """Bulk-downloads daily bars and returns each ticker's numeric Close series."""
     import pandas as pd  # type: ignore
-    import yfinance as yf  # type: ignore
+    yf = _yfinance()
 
-    tickers = [str(t).upper().strip() for t in (tickers or []) if str(t).strip()]
-    tickers = list(dict.fromkeys([t for t in tickers if t]))[: max(1, int(max_rows or 18))]
     if not tickers:
         return {}
-
-    symbols = " ".join(tickers)
     try:
         frame = yf.download(
-            symbols,
-            period="14d",
+            " ".join(tickers),
+            period=period,
             interval="1d",
             group_by="ticker",
             progress=False,
@@ -3569,24 +4762,12 @@ def _trending_snapshots(tickers: list[str], max_rows: int = 18) -> dict[str, dic
         )
     except Exception:
         frame = pd.DataFrame()
-
     if frame.empty:
         return {}
 
-    snapshots: dict[str, dict[str, Any]] = {}
-
-    def _snap_from_close(series: pd.Series) -> dict[str, Any] | None:
-        close = pd.to_numeric(series, errors="coerce").dropna()
-        if close.empty:
-            return None
-        last = float(close.iloc[-1])
-        prev = float(close.iloc[-2]) if len(close) >= 2 else None
-        change = round(last - prev, 4) if prev else None
-        change_pct = round((last - prev) / prev * 100.0, 4) if prev else None
-        return {"lastClose": round(last, 4), "prevClose": round(prev, 4) if prev else None, "change": change, "changePct": change_pct}
-
+    out: dict[str, pd.Series] = {}
     if isinstance(frame.columns, pd.MultiIndex):
-        # shape: (field, ticker) or (ticker, field)
+        # shape: (field, ticker) or (ticker, field) depending on yfinance version
         level0 = list(frame.columns.get_level_values(0))
         is_ticker_level0 = any(t in set(level0) for t in tickers)
         for ticker in tickers:
@@ -3598,15 +4779,38 @@ def _trending_snapshots(tickers: list[str], max_rows: int = 18) -> dict[str, dic
                 sub.columns = sub.columns.get_level_values(-1)
             if "Close" not in sub.columns:
                 continue
-            snap = _snap_from_close(sub["Close"])
-            if snap:
-                snapshots[ticker] = snap
-        return snapshots
+            close = pd.to_numeric(sub["Close"], errors="coerce").dropna()
+            if not close.empty:
+                out[ticker] = close
+        return out
 
     if "Close" in frame.columns and len(tickers) == 1:
-        snap = _snap_from_close(frame["Close"])
-        if snap:
-            snapshots[tickers[0]] = snap
+        close = pd.to_numeric(frame["Close"], errors="coerce").dropna()
+        if not close.empty:
+            out[tickers[0]] = close
+    return out
+
+
+def _trending_snapshots(tickers: list[str], max_rows: int = 18) -> dict[str, dict[str, Any]]:
+    tickers = [str(t).upper().strip() for t in (tickers or []) if str(t).strip()]
+    tickers = list(dict.fromkeys([t for t in tickers if t]))[: max(1, int(max_rows or 18))]
+    if not tickers:
+        return {}
+
+    snapshots: dict[str, dict[str, Any]] = {}
+    for ticker, quote in _get_quotes(tickers).items():
+        last = _safe_float(quote.get("price"))
+        if last is None:
+            continue
+        prev = _safe_float(quote.get("prevClose"))
+        change = round(last - prev, 4) if prev else None
+        change_pct = round((last - prev) / prev * 100.0, 4) if prev else None
+        snapshots[ticker] = {
+            "lastClose": round(last, 4),
+            "prevClose": round(prev, 4) if prev else None,
+            "change": change,
+            "changePct": change_pct,
+        }
     return snapshots
 
 
@@ -3657,7 +4861,7 @@ def _parse_quantiles(raw: Any) -> list[float]:
 
 def _load_history(ticker: str, start: str | None, interval: str) -> pd.DataFrame:
     import pandas as pd  # type: ignore
-    import yfinance as yf  # type: ignore
+    yf = _yfinance()
 
     period = "730d" if interval == "1h" else "10y"
     frame = yf.download(
@@ -3684,58 +4888,111 @@ def _load_history(ticker: str, start: str | None, interval: str) -> pd.DataFrame
     return frame
 
 
-def _latest_close_prices(tickers: list[str]) -> dict[str, float]:
-    import pandas as pd  # type: ignore
-    import yfinance as yf  # type: ignore
-
-    tickers = [str(t).upper().strip() for t in (tickers or []) if str(t).strip()]
-    tickers = list(dict.fromkeys([t for t in tickers if t]))
-    if not tickers:
-        return {}
-
-    symbols = " ".join(tickers)
-    try:
-        frame = yf.download(
-            symbols,
-            period="7d",
-            interval="1d",
-            group_by="ticker",
-            progress=False,
-            threads=True,
-            auto_adjust=False,
-        )
-    except Exception:
-        frame = pd.DataFrame()
+_QUOTE_CACHE: dict[str, dict[str, Any]] = {}
+_QUOTE_CACHE_LOCK = threading.Lock()
 
-    prices: dict[str, float] = {}
-    if frame.empty:
-        return prices
 
-    if isinstance(frame.columns, pd.MultiIndex):
-        # shape: (field, ticker) or (ticker, field) depending on yfinance version
-        level0 = list(frame.columns.get_level_values(0))
-        level1 = list(frame.columns.get_level_values(1))
-        is_ticker_level0 = any(t in set(level0) for t in tickers)
-        for ticker in tickers:
-            try:
-                sub = frame[ticker] if is_ticker_level0 else frame.xs(ticker, axis=1, level=1)
-            except Exception:
+def _fetch_alpaca_quotes(symbols: list[str]) -> dict[str, dict[str, Any]]:
+    """Last-trade quotes for many symbols from Alpaca's bulk snapshots endpoint."""
+    if not ALPACA_API_KEY or not ALPACA_SECRET_KEY or not symbols:
+        return {}
+    headers = {"APCA-API-KEY-ID": ALPACA_API_KEY, "APCA-API-SECRET-KEY": ALPACA_SECRET_KEY}
+    quotes: dict[str, dict[str, Any]] = {}
+    for offset in range(0, len(symbols), 200):
+        chunk = symbols[offset : offset + 200]
+        try:
+            response = _http_get(
+                f"{ALPACA_DATA_BASE}/v2/stocks/snapshots",
+                headers=headers,
+                params={"symbols": ",".join(chunk), "feed": ALPACA_DATA_FEED},
+                timeout=10,
+            )
+            if response.status_code >= 400:
                 continue
-            if isinstance(sub.columns, pd.MultiIndex):
-                sub.columns = sub.columns.get_level_values(-1)
-            if "Close" not in sub.columns:
+            payload = response.json() if response.text else {}
+        except Exception:
+            continue
+        if not isinstance(payload, dict):
+            continue
+        for symbol, snapshot in payload.items():
+            if not isinstance(snapshot, dict):
                 continue
-            close = pd.to_numeric(sub["Close"], errors="coerce").dropna()
-            if close.empty:
+            trade = snapshot.get("latestTrade") or {}
+            price = _safe_float(trade.get("p")) or _safe_float((snapshot.get("dailyBar") or {}).get("c"))
+            if price is None:
                 continue
-            prices[ticker] = float(close.iloc[-1])
-        return prices
+            quotes[str(symbol).upper()] = {
+                "price": price,
+                "prevClose": _safe_float((snapshot.get("prevDailyBar") or {}).get("c")),
+                "asOf": str(trade.get("t") or ""),
+                "source": "alpaca",
+            }
+    return quotes
 
-    if "Close" in frame.columns and len(tickers) == 1:
-        close = pd.to_numeric(frame["Close"], errors="coerce").dropna()
-        if not close.empty:
-            prices[tickers[0]] = float(close.iloc[-1])
-    return prices
+
+def _fetch_yfinance_quotes(symbols: list[str]) -> dict[str, dict[str, Any]]:
+    quotes: dict[str, dict[str, Any]] = {}
+    for ticker, close in _download_close_series(symbols, "7d").items():
+        quotes[ticker] = {
+            "price": float(close.iloc[-1]),
+            "prevClose": float(close.iloc[-2]) if len(close) >= 2 else None,
+            "asOf": str(close.index[-1]),
+            "source": "yfinance",
+        }
+    return quotes
+
+
+def _get_quotes(tickers: list[str]) -> dict[str, dict[str, Any]]:
+    """Returns {symbol: {price, prevClose, asOf, source}} for many symbols.
+
+    Quotes come from a short-lived instance cache, then one bulk Alpaca snapshot call for
+    the misses, then a yfinance bulk download for anything Alpaca could not price.
+    """
+    symbols = [str(t).upper().strip() for t in (tickers or []) if str(t).strip()]
+    symbols = list(dict.fromkeys([t for t in symbols if t]))
+    now = time.time()
+    quotes: dict[str, dict[str, Any]] = {}
+    missing: list[str] = []
+    with _QUOTE_CACHE_LOCK:
+        cached_by_symbol = {symbol: _QUOTE_CACHE.get(symbol) for symbol in symbols}
+    for symbol in symbols:
+        cached = cached_by_symbol[symbol]
+        if cached and (now - float(cached.get("loadedAt") or 0.0)) < QUOTE_CACHE_TTL_SECONDS:
+            quotes[symbol] = cached["quote"]
+            _record_cache("quotes", True)
+        else:
+            missing.append(symbol)
+            _record_cache("quotes", False)
+    if not missing:
+        return quotes
+
+    fetched = _fetch_alpaca_quotes(missing)
+    remaining = [symbol for symbol in missing if symbol not in fetched]
+    if remaining:
+        fetched.update(_fetch_yfinance_quotes(remaining))
+
+    with _QUOTE_CACHE_LOCK:
+        if len(_QUOTE_CACHE) + len(fetched) > 5000:
+            _QUOTE_CACHE.clear()
+        for symbol, quote in fetched.items():
+            _QUOTE_CACHE[symbol] = {"quote": quote, "loadedAt": now}
+    quotes.update(fetched)
+    return quotes
+
+
+def _latest_prices(tickers: list[str]) -> dict[str, float]:
+    quotes = _get_quotes(tickers)
+    return {symbol: float(quote["price"]) for symbol, quote in quotes.items() if quote.get("price") is not None}
+
+
+def _future_trading_days(last: Any, periods: int) -> pd.DatetimeIndex:
+    """The next `periods` NYSE sessions after `last`, keeping its timezone and time of day."""
+    import pandas as pd  # type: ignore
+    from trading_calendar import next_sessions  # type: ignore
+
+    last = pd.Timestamp(last)
+    dates = pd.DatetimeIndex(next_sessions(last.date(), periods).astype("datetime64[ns]")) + (last - last.normalize())
+    return dates.tz_localize(last.tz) if last.tz is not None else dates
 
 
 def _generate_quantile_forecast(
@@ -3770,8 +5027,10 @@ def _generate_quantile_forecast(
     sims = rng.normal(loc=drift, scale=vol, size=(1500, horizon)).cumsum(axis=1)
     sim_prices = values[-1] * np.exp(sims)
 
-    freq = "H" if interval == "1h" else "B"
-    dates = pd.date_range(close_series.index[-1], periods=horizon + 1, freq=freq)[1:]
+    if interval == "1h":
+        dates = pd.date_range(close_series.index[-1], periods=horizon + 1, freq="H")[1:]
+    else:
+        dates = _future_trading_days(close_series.index[-1], horizon)
 
     forecast_rows: list[dict[str, Any]] = []
     for idx, ts in enumerate(dates):
@@ -3864,9 +5123,11 @@ def _run_prophet_engine(close_series: pd.Series, horizon: int, quantiles: list[f
         except Exception:
             pass
 
-        freq = "H" if is_hourly else "B"
         periods = max(1, min(horizon, 365 if not is_hourly else 240))
-        future = model.make_future_dataframe(periods=periods, freq=freq, include_history=False)
+        if is_hourly:
+            future = model.make_future_dataframe(periods=periods, freq="H", include_history=False)
+        else:
+            future = pd.DataFrame({"ds": _future_trading_days(df["ds"].iloc[-1], periods)})
         forecast = model.predict(future)
 
         normal = NormalDist()
@@ -3918,7 +5179,7 @@ def _run_timemixer_engine(close_series: pd.Series, horizon: int, quantiles: list
 
     if IBM_TIMEMIXER_ENDPOINT:
         try:
-            response = requests.post(IBM_TIMEMIXER_ENDPOINT, headers=headers, json=payload, timeout=30)
+            response = _http_post(IBM_TIMEMIXER_ENDPOINT, headers=headers, json=payload, timeout=30)
             response.raise_for_status()
             body = response.json()
             if isinstance(body, dict) and isinstance(body.get("forecastRows"), list):
@@ -3938,7 +5199,7 @@ def _run_timemixer_engine(close_series: pd.Series, horizon: int, quantiles: list
                 "Authorization": f"Bearer {HUGGINGFACEHUB_API_TOKEN}",
                 "Content-Type": "application/json",
             }
-            hf_response = requests.post(
+            hf_response = _http_post(
                 f"https://api-inference.huggingface.co/models/{IBM_TIMEMIXER_MODEL_ID}",
                 headers=hf_headers,
                 json={"inputs": payload},
@@ -3980,6 +5241,124 @@ def _forecast_preview_rows(rows: list[dict[str, Any]], max_rows: int = 12) -> li
     return rows[:max_rows]
 
 
+def _forecast_rows_checksum(columns: list[str], values: dict[str, list[Any]]) -> str:
+    body = json.dumps({"columns": columns, "values": values}, sort_keys=True, separators=(",", ":"), default=str)
+    return "sha256:" + hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+def _encode_forecast_rows(rows: list[dict[str, Any]]) -> tuple[dict[str, Any], dict[str, Any]]:
+    """Packs row dicts into one array per column (Firestore rejects nested arrays, not maps of arrays).
+
+    Returns (payload for forecast_rows/{id}, pointer for the forecast_requests doc). The
+    document id is the content hash, so identical forecasts share one payload.
+    """
+    columns = list(dict.fromkeys(key for row in rows for key in (row or {})))
+    values = {column: [(row or {}).get(column) for row in rows] for column in columns}
+    checksum = _forecast_rows_checksum(columns, values)
+    pointer = {
+        "id": checksum.split(":", 1)[1],
+        "checksum": checksum,
+        "encoding": FORECAST_ROWS_ENCODING,
+        "rowCount": len(rows),
+        "columns": columns,
+    }
+    payload = {
+        "encoding": FORECAST_ROWS_ENCODING,
+        "columns": columns,
+        "values": values,
+        "rowCount": len(rows),
+        "checksum": checksum,
+    }
+    return payload, pointer
+
+
+def _decode_forecast_rows(payload: dict[str, Any]) -> list[dict[str, Any]]:
+    columns = [str(column) for column in payload.get("columns") or []]
+    values = payload.get("values") if isinstance(payload.get("values"), dict) else {}
+    row_count = int(payload.get("rowCount") or 0)
+    series = [values.get(column) or [] for column in columns]
+    return [
+        {column: (column_values[index] if index < len(column_values) else None) for column, column_values in zip(columns, series)}
+        for index in range(row_count)
+    ]
+
+
+def _load_forecast_rows(forecast_doc: dict[str, Any]) -> list[dict[str, Any]]:
+    """Full forecast rows for a forecast_requests doc: inline on older docs, else via forecastRowsRef."""
+    if isinstance(forecast_doc.get("forecastRows"), list):
+        return forecast_doc["forecastRows"]
+    pointer = forecast_doc.get("forecastRowsRef") if isinstance(forecast_doc.get("forecastRowsRef"), dict) else {}
+    rows_id = str(pointer.get("id") or "").strip()
+    if not rows_id:
+        return []
+    snap = db.collection(FORECAST_ROWS_COLLECTION).document(rows_id).get()
+    if not snap.exists:
+        print(f"Warning: forecast rows {rows_id} are missing")
+        return []
+    payload = snap.to_dict() or {}
+    columns = [str(column) for column in payload.get("columns") or []]
+    values = payload.get("values") if isinstance(payload.get("values"), dict) else {}
+    if _forecast_rows_checksum(columns, values) != pointer.get("checksum"):
+        print(f"Warning: forecast rows {rows_id} failed checksum verification")
+        return []
+    return _decode_forecast_rows(payload)
+
+
+def _forecast_rows_expiry() -> datetime:
+    # Outlives every forecast_results entry that may still point at the rows.
+    return datetime.now(timezone.utc) + timedelta(days=FORECAST_RESULT_RETENTION_DAYS + 1)
+
+
+def _store_forecast_rows(rows_id: str, payload: dict[str, Any]) -> None:
+    """Writes forecast_rows/{rows_id}; rows no forecast_requests doc references carry expiresAt."""
+    ref = db.collection(FORECAST_ROWS_COLLECTION).document(rows_id)
+
+    @firestore.transactional
+    def _write(transaction: Any) -> None:
+        snap = ref.get(transaction=transaction)
+        if not snap.exists:
+            transaction.set(ref, {**payload, "refCount": 0, "expiresAt": _forecast_rows_expiry()})
+        elif int((snap.to_dict() or {}).get("refCount") or 0) <= 0:
+            # Same content hash, so the payload is unchanged; only push the expiry out.
+            transaction.update(ref, {"expiresAt": _forecast_rows_expiry()})
+
+    _write(db.transaction())
+
+
+def _retain_forecast_rows(pointer: Any) -> None:
+    """Counts one more forecast_requests doc pointing at the rows and cancels their expiry."""
+    rows_id = str((pointer or {}).get("id") or "").strip() if isinstance(pointer, dict) else ""
+    if not rows_id:
+        return
+    try:
+        db.collection(FORECAST_ROWS_COLLECTION).document(rows_id).update(
+            {"refCount": firestore.Increment(1), "expiresAt": firestore.DELETE_FIELD}
+        )
+    except Exception as exc:
+        print(f"Warning: unable to retain forecast rows {rows_id}: {exc}")
+
+
+def _release_forecast_rows(pointer: Any) -> None:
+    """Drops one reference to the rows; the last one hands them to the expiresAt TTL."""
+    rows_id = str((pointer or {}).get("id") or "").strip() if isinstance(pointer, dict) else ""
+    if not rows_id:
+        return
+    ref = db.collection(FORECAST_ROWS_COLLECTION).document(rows_id)
+
+    @firestore.transactional
+    def _release(transaction: Any) -> None:
+        snap = ref.get(transaction=transaction)
+        if not snap.exists:
+            return
+        remaining = int((snap.to_dict() or {}).get("refCount") or 0) - 1
+        update: dict[str, Any] = {"refCount": max(0, remaining)}
+        if remaining <= 0:
+            update["expiresAt"] = _forecast_rows_expiry()
+        transaction.update(ref, update)
+
+    _release(db.transaction())
+
+
 def _forecast_quantile_entries(rows: list[dict[str, Any]]) -> list[tuple[float, str]]:
     if not rows:
         return []
@@ -4382,6 +5761,7 @@ def _generate_and_store_forecast_report_assets(
 ) -> dict[str, Any]:
     import uuid
 
+    forecast_doc = {**forecast_doc, "forecastRows": _load_forecast_rows(forecast_doc)}
     workspace_id = str(forecast_doc.get("userId") or forecast_doc.get("createdByUid") or "").strip() or "workspace"
     ticker = str(forecast_doc.get("ticker") or "ticker").upper()
     service = str(forecast_doc.get("service") or "prophet")
@@ -4408,7 +5788,7 @@ def _generate_and_store_forecast_report_assets(
     pdf_path = f"{base_path}/{safe_prefix}_executive_brief.pdf"
     pptx_path = f"{base_path}/{safe_prefix}_slide_deck.pptx"
 
-    bucket = admin_storage.bucket(STORAGE_BUCKET)
+    bucket = _storage_bucket()
 
     def _upload_with_token(path: str, payload: bytes, *, content_type: str) -> None:
         # Files uploaded via Admin SDK do not automatically get Firebase download tokens.
@@ -4441,7 +5821,7 @@ def _generate_and_store_forecast_report_assets(
     }
 
 
-@https_fn.on_call()
+@_callable()
 def create_order(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     data = req.data or {}
@@ -4480,7 +5860,7 @@ def create_order(req: https_fn.CallableRequest) -> dict[str, Any]:
     return {"orderId": doc_ref.id}
 
 
-@https_fn.on_call()
+@_callable(features=("billing", "remote_config"))
 def create_stripe_checkout_session(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     data = req.data or {}
@@ -4599,7 +5979,7 @@ def create_stripe_checkout_session(req: https_fn.CallableRequest) -> dict[str, A
     }
 
 
-@https_fn.on_call()
+@_callable(features=("billing",))
 def confirm_stripe_checkout(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     data = req.data or {}
@@ -4684,6 +6064,8 @@ def confirm_stripe_checkout(req: https_fn.CallableRequest) -> dict[str, Any]:
         update_payload["paymentStatus"] = "unpaid"
 
     order_ref.set(update_payload, merge=True)
+    if owner_id:
+        _refresh_user_entitlement(owner_id)
     if owner_id and customer_id:
         _persist_user_stripe_customer_id(owner_id, customer_id)
     _audit_event(
@@ -4704,7 +6086,7 @@ def confirm_stripe_checkout(req: https_fn.CallableRequest) -> dict[str, Any]:
     }
 
 
-@https_fn.on_call()
+@_callable(features=("billing",))
 def create_stripe_billing_portal_session(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     data = req.data or {}
@@ -4802,7 +6184,7 @@ def create_stripe_billing_portal_session(req: https_fn.CallableRequest) -> dict[
     }
 
 
-@https_fn.on_call()
+@_callable(features=("billing",))
 def create_stripe_connect_onboarding_link(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     data = req.data or {}
@@ -4886,7 +6268,7 @@ def create_stripe_connect_onboarding_link(req: https_fn.CallableRequest) -> dict
     }
 
 
-@https_fn.on_call()
+@_callable(features=("billing",))
 def create_creator_support_checkout(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     data = req.data or {}
@@ -5057,7 +6439,8 @@ def create_creator_support_checkout(req: https_fn.CallableRequest) -> dict[str,
     }
 
 
-@https_fn.on_request()
+@https_fn.on_request(**_deployment_options("stripe_webhook", "light"))
+@_with_teardown
 def stripe_webhook(req: https_fn.Request) -> tuple[str, int]:
     if req.method != "POST":
         return ("Method not allowed", 405)
@@ -5089,7 +6472,8 @@ def stripe_webhook(req: https_fn.Request) -> tuple[str, int]:
 
                 is_paid = payment_status == "paid" or session_status == "complete"
                 customer_id = _stripe_id(session_obj.get("customer"))
-                db.collection("orders").document(order_id).set(
+                order_ref = db.collection("orders").document(order_id)
+                order_ref.set(
                     {
                         "paymentProvider": "stripe",
                         "paymentStatus": "paid" if is_paid else "unpaid",
@@ -5105,6 +6489,10 @@ def stripe_webhook(req: https_fn.Request) -> tuple[str, int]:
                     },
                     merge=True,
                 )
+                order_snap = order_ref.get()
+                order_user_id = str((order_snap.to_dict() or {}).get("userId") or "") if order_snap.exists else ""
+                if order_user_id:
+                    _refresh_user_entitlement(order_user_id)
     except Exception:
         # Webhook processing is best-effort; Stripe will retry on non-2xx, so keep this 200 unless signature fails.
         pass
@@ -5112,7 +6500,7 @@ def stripe_webhook(req: https_fn.Request) -> tuple[str, int]:
     return ("ok", 200)
 
 
-@https_fn.on_call()
+@_callable(features=("messaging",))
 def update_order_status(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     _require_admin(token)
@@ -5157,6 +6545,8 @@ def update_order_status(req: https_fn.CallableRequest) -> dict[str, Any]:
 
     order_user_id = order_data.get("userId")
     order_user_email = order_data.get("userEmail")
+    if isinstance(order_user_id, str) and order_user_id:
+        _refresh_user_entitlement(order_user_id)
     if isinstance(order_user_id, str) and order_user_id:
         product = str(order_data.get("product") or "Deep Forecast")
         human_status = status.replace("_", " ").title()
@@ -5176,7 +6566,7 @@ def update_order_status(req: https_fn.CallableRequest) -> dict[str, Any]:
     return {"orderId": order_id, "status": status}
 
 
-@https_fn.on_call()
+@_callable()
 def submit_contact(req: https_fn.CallableRequest) -> dict[str, Any]:
     data = req.data or {}
     payload = {
@@ -5206,7 +6596,7 @@ def submit_contact(req: https_fn.CallableRequest) -> dict[str, Any]:
     return {"contactId": doc_ref.id}
 
 
-@https_fn.on_call()
+@_callable()
 def create_collab_invite(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     data = req.data or {}
@@ -5245,7 +6635,7 @@ def create_collab_invite(req: https_fn.CallableRequest) -> dict[str, Any]:
     return {"inviteId": doc_ref.id, "status": "pending"}
 
 
-@https_fn.on_call()
+@_callable()
 def list_collab_invites(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     email_norm = _normalize_email(token.get("email"))
@@ -5279,7 +6669,7 @@ def list_collab_invites(req: https_fn.CallableRequest) -> dict[str, Any]:
     return {"invites": _serialize_for_firestore(invites)}
 
 
-@https_fn.on_call()
+@_callable()
 def accept_collab_invite(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     data = req.data or {}
@@ -5353,7 +6743,7 @@ def accept_collab_invite(req: https_fn.CallableRequest) -> dict[str, Any]:
     return {"status": "accepted", "workspaceUserId": workspace_user_id, "workspaceEmail": workspace_email, "role": role}
 
 
-@https_fn.on_call()
+@_callable()
 def revoke_collab_invite(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     data = req.data or {}
@@ -5376,7 +6766,7 @@ def revoke_collab_invite(req: https_fn.CallableRequest) -> dict[str, Any]:
     return {"inviteId": invite_id, "status": "revoked"}
 
 
-@https_fn.on_call()
+@_callable()
 def list_collaborators(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     docs = db.collection("users").document(req.auth.uid).collection("collaborators").limit(200).stream()
@@ -5394,7 +6784,7 @@ def list_collaborators(req: https_fn.CallableRequest) -> dict[str, Any]:
     return {"collaborators": _serialize_for_firestore(collaborators)}
 
 
-@https_fn.on_call()
+@_callable()
 def remove_collaborator(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     data = req.data or {}
@@ -5411,7 +6801,7 @@ def remove_collaborator(req: https_fn.CallableRequest) -> dict[str, Any]:
     return {"status": "removed", "collaboratorUserId": collaborator_user_id}
 
 
-@https_fn.on_call()
+@_callable()
 def track_meta_conversion_event(req: https_fn.CallableRequest) -> dict[str, Any]:
     data = req.data or {}
     if not isinstance(data, dict):
@@ -5492,7 +6882,7 @@ def track_meta_conversion_event(req: https_fn.CallableRequest) -> dict[str, Any]
     endpoint = f"https://graph.facebook.com/{META_GRAPH_API_VERSION}/{META_PIXEL_ID}/events"
 
     try:
-        response = requests.post(
+        response = _http_post(
             endpoint,
             params={"access_token": META_CAPI_ACCESS_TOKEN},
             json=payload,
@@ -5523,7 +6913,7 @@ def track_meta_conversion_event(req: https_fn.CallableRequest) -> dict[str, Any]
     }
 
 
-@https_fn.on_call()
+@_callable(features=("remote_config",))
 def get_web_push_config(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     meta = req.data.get("meta") if isinstance(req.data, dict) else {}
@@ -5537,7 +6927,7 @@ def get_web_push_config(req: https_fn.CallableRequest) -> dict[str, Any]:
     return {"vapidKey": vapid_key}
 
 
-@https_fn.on_call()
+@_callable(features=("remote_config",))
 def get_feature_flags(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     meta = req.data.get("meta") if isinstance(req.data, dict) else {}
@@ -5562,7 +6952,7 @@ def get_feature_flags(req: https_fn.CallableRequest) -> dict[str, Any]:
     }
 
 
-@https_fn.on_call()
+@_callable()
 def register_notification_token(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     data = req.data or {}
@@ -5597,7 +6987,7 @@ def register_notification_token(req: https_fn.CallableRequest) -> dict[str, Any]
     return {"tokenHash": doc_id, "active": True}
 
 
-@https_fn.on_call()
+@_callable()
 def unregister_notification_token(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     data = req.data or {}
@@ -5620,7 +7010,7 @@ def unregister_notification_token(req: https_fn.CallableRequest) -> dict[str, An
     return {"tokenHash": doc_id, "active": False}
 
 
-@https_fn.on_call()
+@_callable(features=("messaging",))
 def send_test_notification(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     data = req.data or {}
@@ -5645,15 +7035,52 @@ def send_test_notification(req: https_fn.CallableRequest) -> dict[str, Any]:
     return result
 
 
-@https_fn.on_call()
-def check_price_alerts(req: https_fn.CallableRequest) -> dict[str, Any]:
+@_callable(features=("messaging",))
+def send_ticker_broadcast(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
+    _require_admin(token)
     data = req.data or {}
-    workspace_id = str(data.get("workspaceId") or req.auth.uid or "").strip()
-    if not workspace_id:
-        workspace_id = req.auth.uid
+    ticker = _normalize_symbol_token(data.get("ticker"))
+    title = str(data.get("title") or "").strip()
+    body = str(data.get("body") or "").strip()
+    if not ticker or not title or not body:
+        raise https_fn.HttpsError(
+            https_fn.FunctionsErrorCode.INVALID_ARGUMENT,
+            "Ticker, title and body are required.",
+        )
 
-    # Allow scanning your own workspace, or a shared workspace you have access to.
+    subscriber_ids = _ticker_subscriber_ids(ticker)
+    result = _broadcast_notification(
+        subscriber_ids,
+        title=title,
+        body=body,
+        data={"type": "ticker_broadcast", "ticker": ticker, "url": "/dashboard#watchlist"},
+    )
+    _audit_event(
+        req.auth.uid,
+        token.get("email"),
+        "ticker_broadcast_sent",
+        {
+            "ticker": ticker,
+            "userCount": result.get("userCount", 0),
+            "successCount": result.get("successCount", 0),
+            "failureCount": result.get("failureCount", 0),
+        },
+    )
+    result.pop("failed", None)
+    result["ticker"] = ticker
+    return result
+
+
+@_callable(profile="standard", features=("market_data", "messaging"))
+def check_price_alerts(req: https_fn.CallableRequest) -> dict[str, Any]:
+    token = _require_auth(req)
+    data = req.data or {}
+    workspace_id = str(data.get("workspaceId") or req.auth.uid or "").strip()
+    if not workspace_id:
+        workspace_id = req.auth.uid
+
+    # Allow scanning your own workspace, or a shared workspace you have access to.
     if workspace_id != req.auth.uid and token.get("email") != ADMIN_EMAIL:
         shared = (
             db.collection("users")
@@ -5679,48 +7106,20 @@ def check_price_alerts(req: https_fn.CallableRequest) -> dict[str, Any]:
     if not alert_docs:
         return {"workspaceId": workspace_id, "checked": 0, "triggered": 0, "triggeredAlerts": []}
 
-    alerts: list[dict[str, Any]] = []
-    tickers: list[str] = []
-    for doc, payload in alert_docs:
-        ticker = str(payload.get("ticker") or "").upper().strip()
-        if ticker:
-            tickers.append(ticker)
-        alerts.append({"ref": doc.reference, "id": doc.id, "data": payload, "ticker": ticker})
-
-    price_map = _latest_close_prices(tickers)
-    batch = db.batch()
+    alerts = [_price_alert_record(doc, payload) for doc, payload in alert_docs]
+    index = _build_price_alert_index(alerts)
+    price_map = _latest_prices(list(index.keys()))
+    writes: list[tuple[Any, dict[str, Any]]] = []
     triggered: list[dict[str, Any]] = []
 
-    for alert in alerts:
-        ref = alert["ref"]
-        payload = alert["data"] or {}
-        ticker = alert["ticker"]
-        condition = str(payload.get("condition") or "above").strip().lower()
-        target = _safe_float(payload.get("targetPrice") or payload.get("target") or payload.get("price"))
-        current = price_map.get(ticker)
-
-        update_payload: dict[str, Any] = {
-            "lastCheckedAt": firestore.SERVER_TIMESTAMP,
-            "lastPrice": current,
-            "updatedAt": firestore.SERVER_TIMESTAMP,
-        }
-
-        fired = False
-        if current is not None and target is not None:
-            if condition == "below" and current <= target:
-                fired = True
-            if condition != "below" and current >= target:
-                fired = True
-
-        if fired:
-            update_payload.update(
-                {
-                    "active": False,
-                    "status": "triggered",
-                    "triggeredAt": firestore.SERVER_TIMESTAMP,
-                    "triggeredPrice": current,
-                }
-            )
+    # Only crossed alerts are written, and only by the run that flips them inactive; the scan
+    # itself is recorded once per workspace below.
+    for ticker, current in price_map.items():
+        for alert in _crossed_price_alerts(index, ticker, current):
+            if not _mark_price_alert_triggered(alert, current):
+                continue
+            condition = alert["condition"]
+            target = alert["target"]
             triggered.append(
                 {
                     "alertId": alert["id"],
@@ -5731,26 +7130,37 @@ def check_price_alerts(req: https_fn.CallableRequest) -> dict[str, Any]:
                     "currentPrice": current,
                 }
             )
-            event_ref = db.collection("price_alert_events").document()
-            batch.set(
-                event_ref,
-                {
-                    "alertId": alert["id"],
-                    "workspaceId": workspace_id,
-                    "userId": req.auth.uid,
-                    "userEmail": token.get("email"),
-                    "ticker": ticker,
-                    "condition": condition,
-                    "targetPrice": target,
-                    "currentPrice": current,
-                    "createdAt": firestore.SERVER_TIMESTAMP,
-                    "meta": data.get("meta") or {},
-                },
+            writes.append(
+                (
+                    db.collection("price_alert_events").document(),
+                    {
+                        "alertId": alert["id"],
+                        "workspaceId": workspace_id,
+                        "userId": req.auth.uid,
+                        "userEmail": token.get("email"),
+                        "ticker": ticker,
+                        "condition": condition,
+                        "targetPrice": target,
+                        "currentPrice": current,
+                        "createdAt": firestore.SERVER_TIMESTAMP,
+                        "meta": data.get("meta") or {},
+                    },
+                )
             )
 
-        batch.set(ref, update_payload, merge=True)
-
-    batch.commit()
+    writes.append(
+        (
+            db.collection("users").document(workspace_id).collection("alert_scans").document(req.auth.uid),
+            {
+                "userId": req.auth.uid,
+                "lastCheckedAt": firestore.SERVER_TIMESTAMP,
+                "checked": len(alerts),
+                "triggered": len(triggered),
+                "prices": _serialize_for_firestore(price_map),
+            },
+        )
+    )
+    _commit_set_batches(writes)
 
     if triggered:
         lines = []
@@ -5780,9 +7190,368 @@ def check_price_alerts(req: https_fn.CallableRequest) -> dict[str, Any]:
         "triggered": len(triggered),
         "triggeredAlerts": _serialize_for_firestore(triggered),
         "prices": _serialize_for_firestore(price_map),
+        "checkedAt": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+# ticker -> {"above"|"below": (sorted targets, alerts in the same order)}
+_PriceAlertIndex = dict[str, dict[str, tuple[list[float], list[dict[str, Any]]]]]
+
+
+def _price_alert_record(doc: Any, payload: dict[str, Any]) -> dict[str, Any]:
+    workspace_ref = doc.reference.parent.parent
+    condition = str(payload.get("condition") or "above").strip().lower()
+    return {
+        "ref": doc.reference,
+        "updateTime": doc.update_time,
+        "id": doc.id,
+        "workspaceId": workspace_ref.id if workspace_ref is not None else "",
+        "userId": str(payload.get("createdByUid") or "").strip(),
+        "userEmail": str(payload.get("createdByEmail") or "").strip() or None,
+        "ticker": str(payload.get("ticker") or "").upper().strip(),
+        "condition": condition,
+        "target": _safe_float(payload.get("targetPrice") or payload.get("target") or payload.get("price")),
+        "data": payload,
+    }
+
+
+def _mark_price_alert_triggered(alert: dict[str, Any], price: float) -> bool:
+    """Deactivates a crossed alert unless it changed since it was read; True if this call flipped it.
+
+    Overlapping scans (the scheduler and a manual check, or two scheduler runs) read the same
+    active alert, but only the first update passes the precondition, so the event and the
+    push are sent once.
+    """
+    from google.api_core import exceptions as google_exceptions  # type: ignore
+
+    try:
+        alert["ref"].update(
+            {
+                "active": False,
+                "status": "triggered",
+                "triggeredAt": firestore.SERVER_TIMESTAMP,
+                "triggeredPrice": price,
+                "lastCheckedAt": firestore.SERVER_TIMESTAMP,
+                "lastPrice": price,
+                "updatedAt": firestore.SERVER_TIMESTAMP,
+            },
+            option=db.write_option(last_update_time=alert["updateTime"]),
+        )
+    except (google_exceptions.FailedPrecondition, google_exceptions.NotFound):
+        return False
+    return True
+
+
+def _build_price_alert_index(alerts: list[dict[str, Any]]) -> _PriceAlertIndex:
+    """Groups alerts by ticker into threshold-sorted "above" and "below" arrays.
+
+    Alerts without a numeric target (e.g. volatility alerts) are left out; they never fire here.
+    """
+    grouped: dict[str, dict[str, list[dict[str, Any]]]] = {}
+    for alert in alerts:
+        if not alert.get("ticker") or alert.get("target") is None:
+            continue
+        side = "below" if alert.get("condition") == "below" else "above"
+        grouped.setdefault(alert["ticker"], {"above": [], "below": []})[side].append(alert)
+    index: _PriceAlertIndex = {}
+    for ticker, sides in grouped.items():
+        index[ticker] = {}
+        for side, items in sides.items():
+            items.sort(key=lambda item: float(item["target"]))
+            index[ticker][side] = ([float(item["target"]) for item in items], items)
+    return index
+
+
+def _crossed_price_alerts(index: _PriceAlertIndex, ticker: str, price: float) -> list[dict[str, Any]]:
+    """Binary-searches the ticker's sorted thresholds for alerts crossed at `price`."""
+    sides = index.get(ticker)
+    if not sides:
+        return []
+    above_targets, above_alerts = sides.get("above") or ([], [])
+    below_targets, below_alerts = sides.get("below") or ([], [])
+    # "above" fires when price >= target; "below" fires when price <= target.
+    return above_alerts[: bisect_right(above_targets, price)] + below_alerts[bisect_left(below_targets, price) :]
+
+
+def _evaluate_all_price_alerts() -> dict[str, Any]:
+    """Scans active alerts in every workspace, fetching each ticker's price once."""
+    alerts = [
+        _price_alert_record(doc, doc.to_dict() or {})
+        for doc in db.collection_group("price_alerts").where("active", "==", True).stream()
+    ]
+    index = _build_price_alert_index(alerts)
+    if not index:
+        return {"checked": len(alerts), "tickers": 0, "triggered": 0}
+
+    price_map = _latest_prices(list(index.keys()))
+    writes: list[tuple[Any, dict[str, Any]]] = []
+    triggered_by_user: dict[str, list[dict[str, Any]]] = {}
+    # Same per-workspace, per-creator marker check_price_alerts writes, so the alert list
+    # can show when untriggered alerts were last checked and at what price.
+    scans: dict[tuple[str, str], dict[str, Any]] = {}
+    for alert in alerts:
+        if alert["workspaceId"] and alert["userId"]:
+            scan = scans.setdefault((alert["workspaceId"], alert["userId"]), {"checked": 0, "triggered": 0, "prices": {}})
+            scan["checked"] += 1
+            if alert["ticker"] in price_map:
+                scan["prices"][alert["ticker"]] = price_map[alert["ticker"]]
+    triggered = 0
+    for ticker, current in price_map.items():
+        for alert in _crossed_price_alerts(index, ticker, current):
+            if not _mark_price_alert_triggered(alert, current):
+                continue
+            triggered += 1
+            if (alert["workspaceId"], alert["userId"]) in scans:
+                scans[(alert["workspaceId"], alert["userId"])]["triggered"] += 1
+            writes.append(
+                (
+                    db.collection("price_alert_events").document(),
+                    {
+                        "alertId": alert["id"],
+                        "workspaceId": alert["workspaceId"],
+                        "userId": alert["userId"],
+                        "userEmail": alert["userEmail"],
+                        "ticker": ticker,
+                        "condition": alert["condition"],
+                        "targetPrice": alert["target"],
+                        "currentPrice": current,
+                        "createdAt": firestore.SERVER_TIMESTAMP,
+                        "meta": {"trigger": "scheduler"},
+                    },
+                )
+            )
+            if alert["userId"]:
+                triggered_by_user.setdefault(alert["userId"], []).append({**alert, "currentPrice": current})
+
+    for (workspace_id, user_id), scan in scans.items():
+        writes.append(
+            (
+                db.collection("users").document(workspace_id).collection("alert_scans").document(user_id),
+                {
+                    "userId": user_id,
+                    "lastCheckedAt": firestore.SERVER_TIMESTAMP,
+                    "checked": scan["checked"],
+                    "triggered": scan["triggered"],
+                    "prices": _serialize_for_firestore(scan["prices"]),
+                },
+            )
+        )
+    _commit_set_batches(writes)
+
+    tokens_by_user = _active_notification_tokens_for_users(list(triggered_by_user.keys()))
+    for user_id, items in triggered_by_user.items():
+        lines = []
+        for item in items[:6]:
+            cond = ">= " if item.get("condition") != "below" else "<= "
+            lines.append(f"{item.get('ticker') or '?'} {cond}{item.get('target')} (now {item.get('currentPrice')})")
+        _notify_user(
+            user_id,
+            items[0].get("userEmail"),
+            title="Quantura price alert",
+            body="Triggered: " + "; ".join(lines),
+            data={"type": "price_alert", "count": len(items), "url": "/dashboard#watchlist"},
+            tokens=tokens_by_user.get(user_id, []),
+        )
+
+    return {
+        "checked": len(alerts),
+        "tickers": len(index),
+        "triggered": triggered,
     }
 
 
+@scheduler_fn.on_schedule(
+    schedule="*/5 9-16 * * 1-5",
+    timezone=scheduler_fn.Timezone("America/New_York"),
+)
+@_with_teardown
+def price_alert_scheduler(event: scheduler_fn.ScheduledEvent) -> None:
+    del event
+    summary = _evaluate_all_price_alerts()
+    print(f"Price alert scan: {json.dumps(summary)}")
+
+
+_FORECAST_HISTORY_CACHE: dict[tuple[str, str, str], dict[str, Any]] = {}
+_FORECAST_HISTORY_CACHE_LOCK = threading.Lock()
+
+
+def _load_forecast_history(ticker: str, start: str | None, interval: str) -> pd.DataFrame:
+    key = (ticker, interval, str(start or ""))
+    with _FORECAST_HISTORY_CACHE_LOCK:
+        cached = _FORECAST_HISTORY_CACHE.get(key)
+    if cached and time.time() - float(cached.get("loadedAt") or 0) < FORECAST_HISTORY_CACHE_TTL_SECONDS:
+        _record_cache("forecast_history", True)
+        return cached["frame"]
+    _record_cache("forecast_history", False)
+    frame = _load_history(ticker=ticker, start=start, interval=interval)
+    with _FORECAST_HISTORY_CACHE_LOCK:
+        if len(_FORECAST_HISTORY_CACHE) >= 64:
+            _FORECAST_HISTORY_CACHE.clear()
+        _FORECAST_HISTORY_CACHE[key] = {"frame": frame, "loadedAt": time.time()}
+    return frame
+
+
+def _forecast_result_id(
+    ticker: str,
+    interval: str,
+    start: Any,
+    horizon: int,
+    quantiles: list[float],
+    service: str,
+    last_bar: str,
+) -> str:
+    key = [ticker, interval, str(start or ""), horizon, sorted(float(q) for q in quantiles), service, last_bar]
+    return hashlib.sha256(json.dumps(key, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def _compute_forecast_result(
+    ticker: str,
+    service: str,
+    close_series: pd.Series,
+    horizon: int,
+    quantiles: list[float],
+    interval: str,
+) -> tuple[dict[str, Any], bool]:
+    """Runs the forecast engine and stores its rows. Returns (shared result, cacheable).
+
+    Results from the fallback model after a service failure are not cacheable, so the next
+    request retries the service.
+    """
+    cacheable = True
+    try:
+        with _span("forecast.model", service=service, horizon=horizon):
+            result = _run_forecast_service(service, close_series, horizon, quantiles, interval)
+    except https_fn.HttpsError:
+        raise
+    except Exception as service_exc:
+        cacheable = False
+        try:
+            with _span("forecast.model", service="fallback", horizon=horizon):
+                result = _generate_quantile_forecast(close_series, horizon, quantiles, interval)
+            result["serviceMessage"] = "Forecast service failed; fallback model executed."
+        except https_fn.HttpsError:
+            raise
+        except Exception as exc:
+            _raise_structured_error(
+                https_fn.FunctionsErrorCode.INTERNAL,
+                "forecast_failed",
+                "Forecast generation failed.",
+                {"ticker": ticker, "service": service, "serviceRaw": str(service_exc), "raw": str(exc)},
+            )
+
+    forecast_rows = result.get("forecastRows") if isinstance(result.get("forecastRows"), list) else []
+    trade_rationale = _build_forecast_trade_rationale(
+        service=service,
+        horizon=horizon,
+        metrics=result.get("metrics") if isinstance(result.get("metrics"), dict) else {},
+        forecast_rows=forecast_rows,
+    )
+    quantile_end: dict[str, Any] = {}
+    try:
+        entries = _forecast_quantile_entries(forecast_rows)
+        if entries and forecast_rows:
+            last_row = forecast_rows[-1] or {}
+            for _, key in entries:
+                if key in last_row:
+                    quantile_end[key] = last_row.get(key)
+    except Exception:
+        quantile_end = {}
+
+    with _span("forecast.serialize"):
+        rows_payload, rows_ref = _encode_forecast_rows(_serialize_for_firestore(forecast_rows))
+        shared = {
+            "engine": result.get("engine"),
+            "status": result.get("status", "completed"),
+            "serviceMessage": result.get("serviceMessage"),
+            "metrics": _serialize_for_firestore(result.get("metrics") or {}),
+            "forecastPreview": _serialize_for_firestore(_forecast_preview_rows(forecast_rows)),
+            "forecastRowsRef": rows_ref,
+            "forecastQuantilesEnd": _serialize_for_firestore(quantile_end),
+            "tradeRationale": trade_rationale,
+        }
+    _store_forecast_rows(rows_ref["id"], rows_payload)
+    return shared, cacheable
+
+
+def _publish_forecast_result(ref: Any, compute: Any) -> dict[str, Any]:
+    try:
+        shared, cacheable = compute()
+    except BaseException:
+        try:
+            ref.delete()
+        except Exception:
+            pass
+        raise
+    if cacheable:
+        ref.set(
+            {
+                "status": "ready",
+                "result": shared,
+                "leaseUntil": 0,
+                "expiresAt": datetime.now(timezone.utc) + timedelta(days=FORECAST_RESULT_RETENTION_DAYS),
+                "updatedAt": firestore.SERVER_TIMESTAMP,
+            }
+        )
+    else:
+        ref.delete()
+    return shared
+
+
+def _claim_or_wait_forecast_result(result_id: str, compute: Any) -> tuple[dict[str, Any], bool]:
+    from google.api_core import exceptions as google_exceptions  # type: ignore
+
+    # Losing the claim race: the doc was created, changed or deleted since we read it.
+    claim_conflicts = (google_exceptions.AlreadyExists, google_exceptions.FailedPrecondition, google_exceptions.NotFound)
+    ref = db.collection(FORECAST_RESULTS_COLLECTION).document(result_id)
+    deadline = time.time() + FORECAST_RESULT_WAIT_SECONDS
+    while True:
+        snap = ref.get()
+        cached = (snap.to_dict() or {}) if snap.exists else None
+        expires_at = (cached or {}).get("expiresAt")
+        # TTL deletion lags expiresAt; past it, the rows the result points at may already be gone.
+        fresh = not isinstance(expires_at, datetime) or expires_at > datetime.now(timezone.utc)
+        if cached and fresh and cached.get("status") == "ready" and isinstance(cached.get("result"), dict):
+            _record_cache("forecast_result", True)
+            return cached["result"], True
+
+        claim = {
+            "status": "computing",
+            "leaseUntil": time.time() + FORECAST_RESULT_LEASE_SECONDS,
+            "updatedAt": firestore.SERVER_TIMESTAMP,
+        }
+        if cached is None or float(cached.get("leaseUntil") or 0) < time.time():
+            try:
+                if cached is None:
+                    ref.create(claim)
+                else:
+                    # Take over an abandoned claim only if nobody else touched it since we read it.
+                    ref.update(claim, option=db.write_option(last_update_time=snap.update_time))
+            except claim_conflicts:
+                # Another instance claimed it first; wait on that claim like any other follower.
+                pass
+            else:
+                _record_cache("forecast_result", False)
+                return _publish_forecast_result(ref, compute), False
+
+        if time.time() >= deadline:
+            _record_cache("forecast_result", False)
+            shared, _ = compute()
+            return shared, False
+        time.sleep(1.0)
+
+
+def _shared_forecast_result(result_id: str, compute: Any) -> tuple[dict[str, Any], bool]:
+    """Returns (result, cache_hit) for `result_id`, computing it at most once at a time.
+
+    The first caller claims forecast_results/{result_id} with a lease and computes it.
+    Other callers poll the doc until it is ready, the lease expires or their wait runs out.
+    """
+    with _span("forecast.result") as span_attrs:
+        shared, hit = _claim_or_wait_forecast_result(result_id, compute)
+        span_attrs["hit"] = hit
+    return shared, hit
+
+
 def _handle_forecast_request(req: https_fn.CallableRequest, forced_service: str | None = None) -> dict[str, Any]:
     token = _require_auth(req)
     data = dict(req.data or {})
@@ -5838,7 +7607,9 @@ def _handle_forecast_request(req: https_fn.CallableRequest, forced_service: str
     start = data.get("start")
 
     try:
-        history = _load_history(ticker=ticker, start=start, interval=interval)
+        with _span("forecast.history", ticker=ticker, interval=interval) as span_attrs:
+            history = _load_forecast_history(ticker, start, interval)
+            span_attrs["rows"] = len(history)
     except https_fn.HttpsError:
         raise
     except Exception as exc:
@@ -5848,31 +7619,11 @@ def _handle_forecast_request(req: https_fn.CallableRequest, forced_service: str
             "Unable to load market data for ticker.",
             {"ticker": ticker, "raw": str(exc)},
         )
+    result_id = _forecast_result_id(ticker, interval, start, horizon, quantiles, service, str(history.index[-1]))
     close_series = history["Close"].copy()
-
-    try:
-        result = _run_forecast_service(service, close_series, horizon, quantiles, interval)
-    except https_fn.HttpsError:
-        raise
-    except Exception as service_exc:
-        try:
-            result = _generate_quantile_forecast(close_series, horizon, quantiles, interval)
-            result["serviceMessage"] = "Forecast service failed; fallback model executed."
-        except https_fn.HttpsError:
-            raise
-        except Exception as exc:
-            _raise_structured_error(
-                https_fn.FunctionsErrorCode.INTERNAL,
-                "forecast_failed",
-                "Forecast generation failed.",
-                {"ticker": ticker, "service": service, "serviceRaw": str(service_exc), "raw": str(exc)},
-            )
-
-    trade_rationale = _build_forecast_trade_rationale(
-        service=service,
-        horizon=horizon,
-        metrics=result.get("metrics") if isinstance(result.get("metrics"), dict) else {},
-        forecast_rows=result.get("forecastRows") if isinstance(result.get("forecastRows"), list) else [],
+    shared, cache_hit = _shared_forecast_result(
+        result_id,
+        lambda: _compute_forecast_result(ticker, service, close_series, horizon, quantiles, interval),
     )
 
     request_doc = {
@@ -5886,13 +7637,15 @@ def _handle_forecast_request(req: https_fn.CallableRequest, forced_service: str
         "start": start,
         "quantiles": quantiles,
         "service": service,
-        "engine": result.get("engine"),
-        "status": result.get("status", "completed"),
-        "serviceMessage": result.get("serviceMessage"),
-        "metrics": _serialize_for_firestore(result.get("metrics") or {}),
-        "forecastPreview": _serialize_for_firestore(_forecast_preview_rows(result.get("forecastRows") or [])),
-        "forecastRows": _serialize_for_firestore(result.get("forecastRows") or []),
-        "tradeRationale": trade_rationale,
+        "engine": shared.get("engine"),
+        "status": shared.get("status") or "completed",
+        "serviceMessage": shared.get("serviceMessage"),
+        "metrics": shared.get("metrics") or {},
+        "forecastPreview": shared.get("forecastPreview") or [],
+        "forecastRowsRef": shared.get("forecastRowsRef") or {},
+        "forecastResultId": result_id,
+        "cacheHit": cache_hit,
+        "tradeRationale": shared.get("tradeRationale") or "",
         "reportStatus": "queued",
         "reportAssets": {},
         "meta": data.get("meta") or {},
@@ -5903,6 +7656,7 @@ def _handle_forecast_request(req: https_fn.CallableRequest, forced_service: str
 
     doc_ref = db.collection("forecast_requests").document()
     doc_ref.set(request_doc)
+    _retain_forecast_rows(request_doc["forecastRowsRef"])
 
     _audit_event(
         req.auth.uid,
@@ -5912,23 +7666,13 @@ def _handle_forecast_request(req: https_fn.CallableRequest, forced_service: str
             "requestId": doc_ref.id,
             "ticker": ticker,
             "service": service,
-            "engine": result.get("engine"),
+            "engine": request_doc["engine"],
             "workspaceId": workspace_id,
+            "cacheHit": cache_hit,
         },
     )
 
-    metrics = result.get("metrics") or {}
-    forecast_rows_out = result.get("forecastRows") if isinstance(result.get("forecastRows"), list) else []
-    quantile_end: dict[str, Any] = {}
-    try:
-        entries = _forecast_quantile_entries(forecast_rows_out)
-        if entries and forecast_rows_out:
-            last_row = forecast_rows_out[-1] or {}
-            for _, key in entries:
-                if key in last_row:
-                    quantile_end[key] = last_row.get(key)
-    except Exception:
-        quantile_end = {}
+    metrics = request_doc["metrics"]
     return {
         "requestId": doc_ref.id,
         "status": request_doc["status"],
@@ -5940,23 +7684,23 @@ def _handle_forecast_request(req: https_fn.CallableRequest, forced_service: str
         "mae": metrics.get("mae"),
         "coverage10_90": metrics.get("coverage10_90", "n/a"),
         "forecastPreview": request_doc["forecastPreview"],
-        "forecastQuantilesEnd": _serialize_for_firestore(quantile_end),
-        "tradeRationale": trade_rationale,
+        "forecastQuantilesEnd": shared.get("forecastQuantilesEnd") or {},
+        "tradeRationale": request_doc["tradeRationale"],
         "reportStatus": "queued",
     }
 
 
-@https_fn.on_call(memory=MemoryOption.GB_1, timeout_sec=180)
+@_callable(profile="compute", features=("forecasting", "remote_config"))
 def run_timeseries_forecast(req: https_fn.CallableRequest) -> dict[str, Any]:
     return _handle_forecast_request(req, forced_service="prophet")
 
 
-@https_fn.on_call(memory=MemoryOption.GB_1, timeout_sec=180)
+@_callable(profile="compute", features=("forecasting", "remote_config"))
 def run_prophet_forecast(req: https_fn.CallableRequest) -> dict[str, Any]:
     return _handle_forecast_request(req, forced_service="prophet")
 
 
-@https_fn.on_call()
+@_callable()
 def delete_forecast_request(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     data = req.data or {}
@@ -5982,7 +7726,37 @@ def delete_forecast_request(req: https_fn.CallableRequest) -> dict[str, Any]:
     return {"deleted": True, "forecastId": forecast_id}
 
 
-@https_fn.on_call(memory=MemoryOption.GB_1, timeout_sec=180)
+@_callable()
+def get_forecast_rows(req: https_fn.CallableRequest) -> dict[str, Any]:
+    """Full rows of a forecast the caller can read; forecast_rows itself is server-only."""
+    token = _require_auth(req)
+    data = req.data or {}
+    forecast_id = str(data.get("forecastId") or data.get("id") or "").strip()
+    if not forecast_id:
+        raise https_fn.HttpsError(https_fn.FunctionsErrorCode.INVALID_ARGUMENT, "Forecast ID is required.")
+
+    snap = db.collection("forecast_requests").document(forecast_id).get()
+    if not snap.exists:
+        raise https_fn.HttpsError(https_fn.FunctionsErrorCode.NOT_FOUND, "Forecast not found.")
+
+    doc = snap.to_dict() or {}
+    workspace_id = str(doc.get("userId") or "").strip()
+    if workspace_id:
+        _require_workspace_access(workspace_id, req.auth.uid, token)
+    elif token.get("email") != ADMIN_EMAIL:
+        raise https_fn.HttpsError(https_fn.FunctionsErrorCode.PERMISSION_DENIED, "Access denied.")
+    return {"forecastId": forecast_id, "rows": _serialize_for_firestore(_load_forecast_rows(doc))}
+
+
+@firestore_fn.on_document_deleted(document="forecast_requests/{requestId}")
+@_with_teardown
+def release_forecast_rows_on_delete(event: firestore_fn.Event[Any]) -> None:
+    # Fires for every delete path (callable, console, admin scripts), so refCount stays honest.
+    doc = event.data.to_dict() if event.data is not None else None
+    _release_forecast_rows((doc or {}).get("forecastRowsRef"))
+
+
+@_callable(profile="compute", features=("market_data", "reports", "storage"))
 def generate_forecast_report_assets(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     data = req.data or {}
@@ -6056,6 +7830,7 @@ def generate_forecast_report_assets(req: https_fn.CallableRequest) -> dict[str,
     schedule="*/30 * * * *",
     timezone=scheduler_fn.Timezone(SOCIAL_AUTOMATION_TIMEZONE),
 )
+@_with_teardown
 def forecast_report_agent_scheduler(event: scheduler_fn.ScheduledEvent) -> None:
     del event
     docs = list(db.collection("forecast_requests").where("reportStatus", "==", "queued").limit(REPORT_AGENT_BATCH_SIZE).stream())
@@ -6092,7 +7867,7 @@ def forecast_report_agent_scheduler(event: scheduler_fn.ScheduledEvent) -> None:
             )
 
 
-@https_fn.on_call()
+@_callable()
 def delete_screener_run(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     data = req.data or {}
@@ -6118,7 +7893,7 @@ def delete_screener_run(req: https_fn.CallableRequest) -> dict[str, Any]:
     return {"deleted": True, "runId": run_id}
 
 
-@https_fn.on_call()
+@_callable()
 def rename_screener_run(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     data = req.data or {}
@@ -6149,7 +7924,7 @@ def rename_screener_run(req: https_fn.CallableRequest) -> dict[str, Any]:
     return {"updated": True, "runId": run_id, "title": title}
 
 
-@https_fn.on_call()
+@_callable()
 def set_screener_public_visibility(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     data = req.data or {}
@@ -6190,7 +7965,7 @@ def set_screener_public_visibility(req: https_fn.CallableRequest) -> dict[str, A
     return {"runId": run_id, "isPublic": is_public, "workspaceId": workspace_id, "updated": True}
 
 
-@https_fn.on_call()
+@_callable()
 def upsert_ai_agent_social_action(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     data = req.data or {}
@@ -6311,7 +8086,7 @@ def upsert_ai_agent_social_action(req: https_fn.CallableRequest) -> dict[str, An
     }
 
 
-@https_fn.on_call()
+@_callable()
 def rename_prediction_upload(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     _require_admin(token)
@@ -6335,7 +8110,7 @@ def rename_prediction_upload(req: https_fn.CallableRequest) -> dict[str, Any]:
     return {"updated": True, "uploadId": upload_id, "title": title}
 
 
-@https_fn.on_call()
+@_callable(features=("storage",))
 def delete_prediction_upload(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     _require_admin(token)
@@ -6354,39 +8129,174 @@ def delete_prediction_upload(req: https_fn.CallableRequest) -> dict[str, Any]:
     file_path = str(doc.get("filePath") or "").strip()
     if file_path:
         try:
-            bucket = admin_storage.bucket(STORAGE_BUCKET)
+            bucket = _storage_bucket()
             bucket.blob(file_path).delete()
+            bucket.blob(_prediction_csv_index_path(file_path)).delete()
         except Exception:
             # Best-effort cleanup; still delete Firestore metadata.
             pass
 
+    db.collection(PREDICTION_SUMMARIES_COLLECTION).document(upload_id).delete()
     ref.delete()
     _audit_event(req.auth.uid, token.get("email"), "predictions_deleted", {"uploadId": upload_id})
     return {"deleted": True, "uploadId": upload_id}
 
 
-@https_fn.on_call()
-def get_prediction_upload_csv(req: https_fn.CallableRequest) -> dict[str, Any]:
-    token = _require_auth(req)
-    _require_admin(token)
-    data = req.data or {}
-    upload_id = str(data.get("uploadId") or data.get("id") or "").strip()
-    if not upload_id:
-        raise https_fn.HttpsError(https_fn.FunctionsErrorCode.INVALID_ARGUMENT, "Upload ID is required.")
-
-    max_bytes_raw = data.get("maxBytes")
-    max_bytes = 2_000_000
-    if max_bytes_raw is not None:
-        try:
-            max_bytes = int(max_bytes_raw)
-        except Exception:
-            max_bytes = 2_000_000
-    max_bytes = max(25_000, min(max_bytes, 5_000_000))
+_PREDICTION_CSV_INDEX_CACHE: dict[str, dict[str, Any]] = {}
+_PREDICTION_CSV_INDEX_CACHE_LOCK = threading.Lock()
 
-    ref = db.collection("prediction_uploads").document(upload_id)
-    snap = ref.get()
-    if not snap.exists:
-        raise https_fn.HttpsError(https_fn.FunctionsErrorCode.NOT_FOUND, "Upload not found.")
+
+def _build_prediction_csv_index(blob: Any) -> dict[str, Any]:
+    """Streams the CSV once and records where every PREDICTION_CSV_INDEX_STRIDE-th data row starts."""
+    offsets: list[int] = []
+    newlines = 0
+    position = 0
+    head = b""
+    last_byte = b""
+    with blob.open("rb", chunk_size=PREDICTION_CSV_READ_CHUNK_BYTES) as handle:
+        while True:
+            chunk = handle.read(PREDICTION_CSV_READ_CHUNK_BYTES)
+            if not chunk:
+                break
+            for match in re.finditer(b"\n", chunk):
+                # Newline n ends line n, so data row n (line n + 1) starts right after it.
+                if newlines % PREDICTION_CSV_INDEX_STRIDE == 0:
+                    offsets.append(position + match.start() + 1)
+                newlines += 1
+            if not position:
+                head = chunk
+            position += len(chunk)
+            last_byte = chunk[-1:]
+    lines = newlines + (1 if position and last_byte != b"\n" else 0)
+    header = head[: offsets[0]] if offsets else head
+    return {
+        "version": 1,
+        "generation": str(blob.generation or ""),
+        "size": position,
+        "stride": PREDICTION_CSV_INDEX_STRIDE,
+        "offsets": offsets,
+        "rows": max(0, lines - 1),
+        "header": header.decode("utf-8", errors="replace").rstrip("\r\n")[:65536],
+    }
+
+
+def _prediction_csv_index_path(file_path: str) -> str:
+    return f"{PREDICTION_CSV_INDEX_PREFIX}/{file_path}.json"
+
+
+def _prediction_csv_index(bucket: Any, blob: Any) -> dict[str, Any]:
+    """Line-offset index for an uploaded CSV: memory, then the Storage sidecar, then a full scan."""
+    generation = str(blob.generation or "")
+    cache_key = f"{blob.name}#{generation}"
+    with _PREDICTION_CSV_INDEX_CACHE_LOCK:
+        index = _PREDICTION_CSV_INDEX_CACHE.get(cache_key)
+    _record_cache("prediction_csv_index", index is not None)
+    if index is not None:
+        return index
+
+    sidecar = bucket.blob(_prediction_csv_index_path(blob.name))
+    try:
+        index = json.loads(sidecar.download_as_bytes())
+    except Exception:
+        index = None
+    if not isinstance(index, dict) or index.get("version") != 1 or index.get("generation") != generation:
+        index = _build_prediction_csv_index(blob)
+        try:
+            sidecar.upload_from_string(json.dumps(index, separators=(",", ":")), content_type="application/json")
+        except Exception as exc:
+            print(f"Warning: unable to store CSV index for {blob.name}: {exc}")
+
+    with _PREDICTION_CSV_INDEX_CACHE_LOCK:
+        if len(_PREDICTION_CSV_INDEX_CACHE) >= 128:
+            _PREDICTION_CSV_INDEX_CACHE.clear()
+        _PREDICTION_CSV_INDEX_CACHE[cache_key] = index
+    return index
+
+
+def _read_prediction_csv_page(
+    blob: Any,
+    index: dict[str, Any],
+    *,
+    row_offset: int | None,
+    byte_offset: int | None,
+    limit: int,
+) -> dict[str, Any]:
+    """Reads whole rows with one ranged download, starting at a row number or at the first
+    line boundary at/after a byte offset."""
+    size = int(index.get("size") or 0)
+    offsets = [int(value) for value in index.get("offsets") or []]
+    stride = int(index.get("stride") or PREDICTION_CSV_INDEX_STRIDE)
+    total_rows = int(index.get("rows") or 0)
+    data_start = offsets[0] if offsets else size
+
+    if row_offset is not None:
+        row_offset = max(0, min(row_offset, total_rows))
+        checkpoint = row_offset // stride
+        start = offsets[checkpoint] if checkpoint < len(offsets) else size
+        end_checkpoint = (row_offset + limit) // stride + 1
+        end = offsets[end_checkpoint] if end_checkpoint < len(offsets) else size
+        skip = row_offset - checkpoint * stride
+    else:
+        start = max(data_start, min(int(byte_offset or 0), size))
+        end = min(size, start + PREDICTION_CSV_PAGE_MAX_BYTES)
+        skip = 0
+
+    if start >= end:
+        return {"lines": [], "offset": start, "nextOffset": size, "rowOffset": row_offset, "done": True}
+
+    # Read one byte early so a byte offset can tell whether it already sits on a line start.
+    read_from = start - 1 if row_offset is None and start > data_start else start
+    chunk = blob.download_as_bytes(start=read_from, end=end - 1)
+    body_start = 0
+    if read_from < start:
+        body_start = 1 if chunk[:1] == b"\n" else chunk.find(b"\n") + 1
+        if body_start == 0:
+            body_start = len(chunk)
+    if end < size:
+        body_end = chunk.rfind(b"\n") + 1
+        if body_end <= body_start:
+            raise https_fn.HttpsError(https_fn.FunctionsErrorCode.FAILED_PRECONDITION, "CSV row exceeds the page size.")
+    else:
+        body_end = len(chunk)
+
+    body = chunk[body_start:body_end]
+    lines = body.split(b"\n") if body else []
+    if body.endswith(b"\n"):
+        lines.pop()
+    page_offset = read_from + body_start + sum(len(line) + 1 for line in lines[:skip])
+    lines = lines[skip : skip + limit]
+    next_offset = min(size, page_offset + sum(len(line) + 1 for line in lines))
+    return {
+        "lines": [line.decode("utf-8", errors="replace").rstrip("\r") for line in lines],
+        "offset": page_offset,
+        "nextOffset": next_offset,
+        "rowOffset": row_offset,
+        "done": next_offset >= size,
+    }
+
+
+@_callable(features=("storage",))
+def get_prediction_upload_csv(req: https_fn.CallableRequest) -> dict[str, Any]:
+    token = _require_auth(req)
+    _require_admin(token)
+    data = req.data or {}
+    upload_id = str(data.get("uploadId") or data.get("id") or "").strip()
+    if not upload_id:
+        raise https_fn.HttpsError(https_fn.FunctionsErrorCode.INVALID_ARGUMENT, "Upload ID is required.")
+
+    max_bytes_raw = data.get("maxBytes")
+    max_bytes = 2_000_000
+    if max_bytes_raw is not None:
+        try:
+            max_bytes = int(max_bytes_raw)
+        except Exception:
+            max_bytes = 2_000_000
+    max_bytes = max(25_000, min(max_bytes, 5_000_000))
+
+    ref = db.collection("prediction_uploads").document(upload_id)
+    snap = ref.get()
+    if not snap.exists:
+        raise https_fn.HttpsError(https_fn.FunctionsErrorCode.NOT_FOUND, "Upload not found.")
 
     doc = snap.to_dict() or {}
 
@@ -6394,8 +8304,11 @@ def get_prediction_upload_csv(req: https_fn.CallableRequest) -> dict[str, Any]:
     if not file_path:
         raise https_fn.HttpsError(https_fn.FunctionsErrorCode.FAILED_PRECONDITION, "Upload is missing a storage path.")
 
+    if any(key in data for key in ("offset", "rowOffset", "limit")):
+        return _get_prediction_upload_csv_page(req, token, upload_id, doc, file_path)
+
     try:
-        bucket = admin_storage.bucket(STORAGE_BUCKET)
+        bucket = _storage_bucket()
         blob = bucket.blob(file_path)
         if not blob.exists():
             raise https_fn.HttpsError(https_fn.FunctionsErrorCode.NOT_FOUND, "CSV file not found in storage.")
@@ -6438,6 +8351,306 @@ def get_prediction_upload_csv(req: https_fn.CallableRequest) -> dict[str, Any]:
         raise https_fn.HttpsError(https_fn.FunctionsErrorCode.INTERNAL, "Unable to fetch CSV.")
 
 
+def _get_prediction_upload_csv_page(
+    req: https_fn.CallableRequest,
+    token: dict[str, Any],
+    upload_id: str,
+    doc: dict[str, Any],
+    file_path: str,
+) -> dict[str, Any]:
+    """Paged variant of get_prediction_upload_csv: `rowOffset` or byte `offset`, plus `limit` rows."""
+    data = req.data or {}
+    try:
+        limit = int(data.get("limit") or 1000)
+    except Exception:
+        limit = 1000
+    limit = max(1, min(limit, PREDICTION_CSV_PAGE_MAX_ROWS))
+    row_offset: int | None = None
+    byte_offset: int | None = None
+    try:
+        if data.get("rowOffset") is not None:
+            row_offset = max(0, int(data.get("rowOffset")))
+        else:
+            byte_offset = max(0, int(data.get("offset") or 0))
+    except Exception:
+        raise https_fn.HttpsError(https_fn.FunctionsErrorCode.INVALID_ARGUMENT, "Offsets must be integers.")
+
+    try:
+        bucket = _storage_bucket()
+        blob = bucket.get_blob(file_path)
+        if blob is None:
+            raise https_fn.HttpsError(https_fn.FunctionsErrorCode.NOT_FOUND, "CSV file not found in storage.")
+        index = _prediction_csv_index(bucket, blob)
+        page = _read_prediction_csv_page(blob, index, row_offset=row_offset, byte_offset=byte_offset, limit=limit)
+    except https_fn.HttpsError:
+        raise
+    except Exception:
+        raise https_fn.HttpsError(https_fn.FunctionsErrorCode.INTERNAL, "Unable to fetch CSV.")
+
+    lines = page["lines"]
+    header = str(index.get("header") or "")
+    _audit_event(
+        req.auth.uid,
+        token.get("email"),
+        "predictions_csv_fetched",
+        {"uploadId": upload_id, "rowOffset": row_offset, "offset": page["offset"], "rows": len(lines)},
+    )
+    return {
+        "uploadId": upload_id,
+        "title": doc.get("title") or "",
+        "filePath": file_path,
+        "header": header,
+        "csv": "\n".join([header, *lines]),
+        "rowOffset": row_offset,
+        "rowCount": len(lines),
+        "nextRowOffset": None if row_offset is None else row_offset + len(lines),
+        "totalRows": int(index.get("rows") or 0),
+        "offset": page["offset"],
+        "nextOffset": page["nextOffset"],
+        "bytes": int(page["nextOffset"]) - int(page["offset"]),
+        "size": int(index.get("size") or 0),
+        "done": page["done"],
+        "truncated": not page["done"],
+    }
+
+
+_PREDICTION_DATE_COLUMNS = {"date", "ds", "datetime", "timestamp", "time"}
+_PREDICTION_DATE_FORMATS = ("%m/%d/%Y", "%Y/%m/%d", "%m/%d/%Y %H:%M", "%m/%d/%Y %H:%M:%S")
+
+
+def _prediction_quantile_columns(header: list[str]) -> list[dict[str, Any]]:
+    """Quantile columns named like p10, q50, p0.9 or quantile0.25, ordered by quantile."""
+    columns: list[dict[str, Any]] = []
+    for idx, raw in enumerate(header):
+        name = str(raw or "").strip()
+        normalized = re.sub(r"[^a-z0-9.]", "", name.lower())
+        match = re.fullmatch(r"[pq](\d{1,2})", normalized)
+        if match:
+            q = int(match.group(1)) / 100
+        else:
+            match = re.fullmatch(r"(?:[pq]|quantile)?(0?\.\d+)", normalized)
+            if not match:
+                continue
+            q = float(match.group(1))
+        if not 0 < q < 1:
+            continue
+        columns.append({"idx": idx, "header": name, "q": q, "label": f"p{int(q * 100 + 0.5)}"})
+    return sorted(columns, key=lambda column: column["q"])
+
+
+def _parse_prediction_date(value: str) -> date | None:
+    text = str(value or "").strip()
+    if not text:
+        return None
+    if len(text) == 10 and text[4] == "-" and text[7] == "-":
+        try:
+            return date.fromisoformat(text)
+        except ValueError:
+            return None
+    try:
+        return datetime.fromisoformat(text.replace("Z", "+00:00")).date()
+    except ValueError:
+        pass
+    for fmt in _PREDICTION_DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _prediction_row_quantiles(row: list[str], columns: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    values: list[dict[str, Any]] = []
+    for column in columns:
+        idx = column["idx"]
+        try:
+            value = float(row[idx]) if idx < len(row) else math.nan
+        except ValueError:
+            continue
+        if math.isfinite(value):
+            values.append({"label": column["label"], "q": column["q"], "value": value})
+    return values
+
+
+def _summarize_prediction_csv(blob: Any) -> dict[str, Any]:
+    """Single streaming pass over an uploaded predictions CSV.
+
+    Mirrors the browser's quantile mapping inputs: the date column, the quantile columns, the
+    raw first/last rows, and the first/last weekday rows that carry numeric quantiles (falling
+    back to any row with quantiles), plus weekday and NYSE session checks.
+    """
+    import numpy as np  # type: ignore
+    from trading_calendar import count_sessions, is_session  # type: ignore
+
+    with blob.open("rb", chunk_size=PREDICTION_CSV_READ_CHUNK_BYTES) as raw:
+        reader = csv.reader(TextIOWrapper(raw, encoding="utf-8-sig", errors="replace", newline=""))
+        header = next(reader, None) or []
+        normalized = [re.sub(r"[^a-z0-9]", "", str(name or "").lower()) for name in header]
+        date_index = next((idx for idx, name in enumerate(normalized) if name in _PREDICTION_DATE_COLUMNS), -1)
+        if date_index < 0:
+            raise https_fn.HttpsError(https_fn.FunctionsErrorCode.FAILED_PRECONDITION, "Could not find a date column in this CSV.")
+        columns = _prediction_quantile_columns(header)
+        if not columns:
+            raise https_fn.HttpsError(
+                https_fn.FunctionsErrorCode.FAILED_PRECONDITION,
+                "No quantile columns were detected (expected names like p10/q50/p90).",
+            )
+
+        rows = 0
+        undated_rows = 0
+        days: list[date] = []
+        first_raw: tuple[list[str], date | None] | None = None
+        last_raw: tuple[list[str], date | None] | None = None
+        first_use = first_any = last_use = last_any = None
+        for row in reader:
+            if not row:
+                continue
+            rows += 1
+            day = _parse_prediction_date(row[date_index]) if date_index < len(row) else None
+            if first_raw is None:
+                first_raw = (row, day)
+            last_raw = (row, day)
+            if day is None:
+                undated_rows += 1
+            else:
+                days.append(day)
+            quantiles = _prediction_row_quantiles(row, columns)
+            if not quantiles:
+                continue
+            entry = (day, quantiles)
+            if first_any is None:
+                first_any = entry
+            last_any = entry
+            if day is not None and day.weekday() < 5:
+                if first_use is None:
+                    first_use = entry
+                last_use = entry
+
+    if first_raw is None or last_raw is None or first_raw[1] is None or last_raw[1] is None:
+        raise https_fn.HttpsError(
+            https_fn.FunctionsErrorCode.FAILED_PRECONDITION,
+            "First/last prediction rows are missing valid dates.",
+        )
+    first_use = first_use or first_any
+    last_use = last_use or last_any
+    if first_use is None or last_use is None:
+        raise https_fn.HttpsError(
+            https_fn.FunctionsErrorCode.FAILED_PRECONDITION,
+            "Could not find numeric quantile values on the first weekday row.",
+        )
+
+    first_day, last_day = first_raw[1], last_raw[1]
+    day_array = np.array(days, dtype="datetime64[D]")
+    weekdays = np.is_busday(day_array)
+    sessions = is_session(day_array)
+    return {
+        "dateColumn": header[date_index],
+        "quantileColumns": [column["label"] for column in columns],
+        "rowCount": rows,
+        "weekendRowCount": int(len(days) - weekdays.sum()),
+        "holidayRowCount": int((weekdays & ~sessions).sum()),
+        "undatedRowCount": undated_rows,
+        "predictionLengthDays": (last_day - first_day).days,
+        "predictionLengthSessions": int(count_sessions(first_day + timedelta(days=1), last_day + timedelta(days=1))),
+        "firstRowDate": first_day.isoformat(),
+        "firstRowDay": first_day.strftime("%A"),
+        "firstRowIsWeekday": first_day.weekday() < 5,
+        "firstRowIsSession": bool(is_session(first_day)),
+        "lastRowDate": last_day.isoformat(),
+        "lastRowDay": last_day.strftime("%A"),
+        "lastRowIsWeekday": last_day.weekday() < 5,
+        "lastRowIsSession": bool(is_session(last_day)),
+        "firstWeekdayDate": first_use[0].isoformat() if first_use[0] else first_day.isoformat(),
+        "lastWeekdayDate": last_use[0].isoformat() if last_use[0] else last_day.isoformat(),
+        "firstQuantiles": first_use[1],
+        "lastQuantiles": last_use[1],
+        "firstRowText": " | ".join(first_raw[0])[:1200],
+        "lastRowText": " | ".join(last_raw[0])[:1200],
+    }
+
+
+def _prediction_csv_summary(upload_id: str, file_path: str) -> dict[str, Any]:
+    """Stored summary for an upload, re-parsing the CSV only when the blob generation changed."""
+    blob = _storage_bucket().get_blob(file_path)
+    if blob is None:
+        raise https_fn.HttpsError(https_fn.FunctionsErrorCode.NOT_FOUND, "CSV file not found in storage.")
+    generation = str(blob.generation or "")
+    ref = db.collection(PREDICTION_SUMMARIES_COLLECTION).document(upload_id)
+    stored = ref.get()
+    cached = stored.to_dict() if stored.exists else None
+    _record_cache("prediction_csv_summary", bool(cached and cached.get("generation") == generation))
+    if cached and cached.get("generation") == generation and isinstance(cached.get("summary"), dict):
+        return cached["summary"]
+
+    summary = _summarize_prediction_csv(blob)
+    ref.set(
+        {
+            "uploadId": upload_id,
+            "filePath": file_path,
+            "generation": generation,
+            "size": int(blob.size or 0),
+            "summary": summary,
+            "updatedAt": firestore.SERVER_TIMESTAMP,
+        }
+    )
+    return summary
+
+
+def _prediction_mapping_summary(
+    summary: dict[str, Any],
+    ticker: str,
+    reference_high: float | None,
+    reference_high_date: str,
+) -> dict[str, Any]:
+    """Quantile selection on top of the stored CSV summary, same rules as the browser agent:
+    the highest first-row quantile at or below the reference high, else the one nearest p50."""
+    start = list(summary.get("firstQuantiles") or [])
+    last = list(summary.get("lastQuantiles") or [])
+    if reference_high is not None:
+        selected = start[0]
+        for candidate in start:
+            if reference_high >= candidate["value"]:
+                selected = candidate
+    else:
+        selected = min(start, key=lambda item: abs(item["q"] - 0.5))
+
+    point = next((item["value"] for item in last if item["label"] == selected["label"]), None)
+    if point is None and last:
+        point = min(last, key=lambda item: abs(item["q"] - selected["q"]))["value"]
+
+    label = selected["label"].upper()
+    start_value = selected["value"]
+    if reference_high is None:
+        relation = f"Reference high was unavailable, so {label} was selected from the first usable row."
+    else:
+        comparison = "above" if reference_high > start_value else "below" if reference_high < start_value else "equal to"
+        relation = f"High {reference_high:.2f} is {comparison} {label} start value {start_value:.2f}."
+
+    warnings = []
+    if not summary.get("firstRowIsWeekday"):
+        warnings.append(f"First row ({summary.get('firstRowDate')}) is not a weekday; using {summary.get('firstWeekdayDate')}.")
+    if not summary.get("lastRowIsWeekday"):
+        warnings.append(f"Last row ({summary.get('lastRowDate')}) is not a weekday; using {summary.get('lastWeekdayDate')}.")
+    if summary.get("holidayRowCount"):
+        warnings.append(f"{summary['holidayRowCount']} weekday row(s) fall on NYSE holidays.")
+
+    mapping = {key: value for key, value in summary.items() if key not in {"firstQuantiles", "lastQuantiles"}}
+    mapping.update(
+        {
+            "ticker": ticker,
+            "warningText": " ".join(warnings),
+            "referenceHigh": round(reference_high, 4) if reference_high is not None else None,
+            "referenceHighDate": reference_high_date,
+            "selectedQuantile": selected["label"],
+            "selectedQuantileLabel": label,
+            "selectedQuantileStartValue": round(start_value, 4),
+            "pointForecastValue": round(point, 4) if point is not None else None,
+            "relation": relation,
+        }
+    )
+    return mapping
+
+
 def _prediction_agent_fallback(summary: dict[str, Any], ticker: str) -> str:
     quantile = str(summary.get("selectedQuantileLabel") or summary.get("selectedQuantile") or "N/A")
     point = summary.get("pointForecastValue")
@@ -6460,7 +8673,7 @@ def _prediction_agent_fallback(summary: dict[str, Any], ticker: str) -> str:
     return " ".join(pieces)
 
 
-@https_fn.on_call()
+@_callable(features=("storage", "calendar"))
 def run_prediction_upload_agent(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     _require_admin(token)
@@ -6481,6 +8694,31 @@ def run_prediction_upload_agent(req: https_fn.CallableRequest) -> dict[str, Any]
     if not ticker:
         ticker = "UNKNOWN"
 
+    # The CSV is summarized here from Storage; the client only contributes the reference high it looked up.
+    # A client-built mappingSummary is only used for legacy uploads without a stored file.
+    file_path = str(doc.get("filePath") or "").strip()
+    if file_path:
+        try:
+            reference_high = float(data.get("referenceHigh", mapping_summary.get("referenceHigh")))
+        except (TypeError, ValueError):
+            reference_high = None
+        if reference_high is not None and not math.isfinite(reference_high):
+            reference_high = None
+        reference_high_date = str(data.get("referenceHighDate") or mapping_summary.get("referenceHighDate") or "")
+        mapping_summary = _prediction_mapping_summary(
+            _prediction_csv_summary(upload_id, file_path),
+            ticker,
+            reference_high,
+            reference_high_date,
+        )
+        mapping_summary["uploadId"] = upload_id
+        mapping_summary["uploadTitle"] = str(doc.get("title") or "predictions.csv")
+        if data.get("summaryOnly"):
+            # First leg of the web flow: the browser needs firstWeekdayDate to look up the reference high.
+            return {"uploadId": upload_id, "ticker": ticker, "summary": mapping_summary}
+    elif data.get("summaryOnly"):
+        raise https_fn.HttpsError(https_fn.FunctionsErrorCode.FAILED_PRECONDITION, "Upload has no stored CSV file.")
+
     # Trim very long cells before sending to model.
     compact_summary = dict(mapping_summary or {})
     for key in ("firstRowText", "lastRowText", "relation", "warningText"):
@@ -6520,7 +8758,7 @@ def run_prediction_upload_agent(req: https_fn.CallableRequest) -> dict[str, Any]
             ],
         }
         try:
-            response = requests.post(
+            response = _http_post(
                 "https://api.openai.com/v1/chat/completions",
                 headers={
                     "Authorization": f"Bearer {OPENAI_API_KEY}",
@@ -6555,47 +8793,98 @@ def run_prediction_upload_agent(req: https_fn.CallableRequest) -> dict[str, Any]
         "analysis": analysis,
         "provider": provider,
         "model": model_used,
+        "summary": mapping_summary,
     }
 
 
 def _is_paid_user(uid: str) -> bool:
-    try:
-        docs = db.collection("orders").where("userId", "==", uid).limit(25).stream()
-        for doc in docs:
-            data = doc.to_dict() or {}
-            status = str(data.get("paymentStatus") or "").strip().lower()
-            if status in {"paid", "succeeded"}:
-                return True
-    except Exception:
-        return False
-    return False
+    return bool(_get_user_entitlement(uid).get("paid"))
 
 
-def _enforce_daily_usage(uid: str, feature_key: str, limit: int, limit_message: str | None = None) -> None:
-    if limit <= 0:
-        return
-    day_key = datetime.now(timezone.utc).date().isoformat()
-    ref = db.collection("usage_daily").document(f"{uid}_{day_key}")
-    transaction = db.transaction()
-    snap = ref.get(transaction=transaction)
-    existing = snap.to_dict() if snap.exists else {}
-    count = int(existing.get(feature_key) or 0)
-    if count >= limit:
+_USAGE_COUNT_CACHE: dict[tuple[str, str, str], int] = {}
+_USAGE_COUNT_CACHE_LOCK = threading.Lock()
+_USAGE_TOKEN_BUCKETS: dict[tuple[str, str], tuple[float, float]] = {}
+_USAGE_TOKEN_BUCKETS_LOCK = threading.Lock()
+
+
+def _take_usage_token(doc_id: str, feature_key: str) -> bool:
+    """Takes one token from this instance's bucket for `doc_id`/`feature_key`; False when empty."""
+    key = (doc_id, feature_key)
+    now = time.monotonic()
+    with _USAGE_TOKEN_BUCKETS_LOCK:
+        tokens, updated = _USAGE_TOKEN_BUCKETS.get(key, (float(USAGE_BUCKET_BURST), now))
+        tokens = min(float(USAGE_BUCKET_BURST), tokens + (now - updated) * USAGE_BUCKET_REFILL_PER_SECOND)
+        if tokens < 1.0:
+            _USAGE_TOKEN_BUCKETS[key] = (tokens, now)
+            return False
+        if key not in _USAGE_TOKEN_BUCKETS and len(_USAGE_TOKEN_BUCKETS) >= 10000:
+            _USAGE_TOKEN_BUCKETS.clear()
+        _USAGE_TOKEN_BUCKETS[key] = (tokens - 1.0, now)
+        return True
+
+
+def _consume_usage_quota(
+    collection: str,
+    doc_id: str,
+    feature_key: str,
+    limit: int,
+    base_fields: dict[str, Any],
+    limit_message: str,
+) -> None:
+    """Counts one use of `feature_key` and rejects calls beyond `limit`.
+
+    The count lives in `USAGE_COUNTER_SHARDS` docs under `{collection}/{doc_id}/shards`. Each
+    call bumps one random shard with a server-side Increment (no transaction to contend on),
+    then sums the shards; a call that pushed the sum past `limit` takes its increment back and
+    is rejected. Racing calls at the limit can therefore both be rejected, but never both admitted.
+
+    Before touching Firestore, a per-instance token bucket turns away bursts from one user, and
+    an instance that has already seen the limit reached rejects locally (counts only grow
+    within a period).
+    """
+    if not _take_usage_token(doc_id, feature_key):
         raise https_fn.HttpsError(
             https_fn.FunctionsErrorCode.RESOURCE_EXHAUSTED,
-            limit_message or "Daily usage limit reached.",
+            "Too many requests. Please wait a moment and try again.",
         )
-    transaction.set(
-        ref,
-        {
-            "userId": uid,
-            "date": day_key,
-            feature_key: count + 1,
-            "updatedAt": firestore.SERVER_TIMESTAMP,
-        },
+    key = (collection, doc_id, feature_key)
+    with _USAGE_COUNT_CACHE_LOCK:
+        known = _USAGE_COUNT_CACHE.get(key)
+    if known is not None and known >= limit:
+        raise https_fn.HttpsError(https_fn.FunctionsErrorCode.RESOURCE_EXHAUSTED, limit_message)
+
+    shards = db.collection(collection).document(doc_id).collection("shards")
+    shard_ref = shards.document(str(random.randrange(USAGE_COUNTER_SHARDS)))
+    shard_ref.set(
+        {**base_fields, feature_key: firestore.Increment(1), "updatedAt": firestore.SERVER_TIMESTAMP},
         merge=True,
     )
-    transaction.commit()
+    count = sum(int((snap.to_dict() or {}).get(feature_key) or 0) for snap in shards.stream())
+    consumed = count <= limit
+    if not consumed:
+        shard_ref.set({feature_key: firestore.Increment(-1)}, merge=True)
+        count -= 1
+
+    with _USAGE_COUNT_CACHE_LOCK:
+        if key not in _USAGE_COUNT_CACHE and len(_USAGE_COUNT_CACHE) >= 10000:
+            _USAGE_COUNT_CACHE.clear()
+        _USAGE_COUNT_CACHE[key] = max(count, _USAGE_COUNT_CACHE.get(key, 0))
+    if not consumed:
+        raise https_fn.HttpsError(https_fn.FunctionsErrorCode.RESOURCE_EXHAUSTED, limit_message)
+
+
+def _enforce_daily_usage(uid: str, feature_key: str, limit: int, limit_message: str | None = None) -> None:
+    if limit <= 0:
+        return
+    day_key = datetime.now(timezone.utc).date().isoformat()
+    _consume_usage_quota(
+        "usage_daily",
+        f"{uid}_{day_key}",
+        feature_key,
+        limit,
+        {"userId": uid, "date": day_key},
+        limit_message or "Daily usage limit reached.",
+    )
 
 
 def _iso_week_key(now_utc: datetime | None = None) -> str:
@@ -6608,27 +8897,14 @@ def _enforce_weekly_usage(uid: str, feature_key: str, limit: int, limit_message:
     if limit <= 0:
         return
     week_key = _iso_week_key()
-    ref = db.collection("usage_weekly").document(f"{uid}_{week_key}")
-    transaction = db.transaction()
-    snap = ref.get(transaction=transaction)
-    existing = snap.to_dict() if snap.exists else {}
-    count = int(existing.get(feature_key) or 0)
-    if count >= limit:
-        raise https_fn.HttpsError(
-            https_fn.FunctionsErrorCode.RESOURCE_EXHAUSTED,
-            limit_message or "Weekly usage limit reached.",
-        )
-    transaction.set(
-        ref,
-        {
-            "userId": uid,
-            "week": week_key,
-            feature_key: count + 1,
-            "updatedAt": firestore.SERVER_TIMESTAMP,
-        },
-        merge=True,
+    _consume_usage_quota(
+        "usage_weekly",
+        f"{uid}_{week_key}",
+        feature_key,
+        limit,
+        {"userId": uid, "week": week_key},
+        limit_message or "Weekly usage limit reached.",
     )
-    transaction.commit()
 
 
 def _generate_backtest_code(payload: dict[str, Any]) -> str:
@@ -7046,104 +9322,142 @@ def _build_backtest_export_sources(payload: dict[str, Any]) -> dict[str, dict[st
     }
 
 
-@https_fn.on_call(memory=MemoryOption.GB_1, timeout_sec=180)
-def run_backtest(req: https_fn.CallableRequest) -> dict[str, Any]:
-    token = _require_auth(req)
-    data = req.data or {}
-    meta = data.get("meta") if isinstance(data.get("meta"), dict) else {}
-    context = _remote_config_context(req, token, meta)
-
-    if not _remote_config_bool("backtesting_enabled", True, context=context):
-        raise https_fn.HttpsError(https_fn.FunctionsErrorCode.FAILED_PRECONDITION, "Backtesting is temporarily disabled.")
-
-    ticker = str(data.get("ticker") or "").upper().strip()
-    if not ticker or len(ticker) > 12 or not all(ch.isalnum() or ch in {".", "-"} for ch in ticker):
-        raise https_fn.HttpsError(https_fn.FunctionsErrorCode.INVALID_ARGUMENT, "Ticker is required.")
-
-    interval = str(data.get("interval") or "1d").strip()
-    if interval not in {"1d", "1h"}:
-        raise https_fn.HttpsError(https_fn.FunctionsErrorCode.INVALID_ARGUMENT, "Invalid interval.")
+_BACKTEST_HISTORY_CACHE: dict[tuple[str, str, int, str], dict[str, Any]] = {}
+_BACKTEST_HISTORY_CACHE_MAX_ENTRIES = 32
+_BACKTEST_HISTORY_CACHE_LOCK = threading.Lock()
+_BACKTEST_SWEEP_PARAM_KEYS: dict[str, tuple[str, ...]] = {
+    "sma_cross": ("fast", "slow", "slPct", "tpPct"),
+    "rsi_reversion": ("rsiPeriod", "oversold", "exitAbove", "slPct", "tpPct"),
+}
+_BACKTEST_SWEEP_MAX_VALUES_PER_PARAM = 12
+_BACKTEST_INTEGER_PARAMS = {"fast", "slow", "rsiPeriod"}
 
-    strategy = str(data.get("strategy") or "sma_cross").strip().lower()
-    if strategy not in {"sma_cross", "rsi_reversion"}:
-        raise https_fn.HttpsError(https_fn.FunctionsErrorCode.INVALID_ARGUMENT, "Invalid strategy.")
 
-    lookback_days = int(data.get("lookbackDays") or data.get("lookback") or 730)
-    if lookback_days < 30 or lookback_days > 5000:
-        raise https_fn.HttpsError(https_fn.FunctionsErrorCode.INVALID_ARGUMENT, "Lookback must be between 30 and 5000 days.")
+def _backtest_param(params_raw: dict[str, Any], keys: tuple[str, ...], default: float, *, integer: bool = False) -> Any:
+    """First of `keys` present in `params_raw`, else `default`.
 
-    cash = float(data.get("cash") or 10_000)
-    commission = float(data.get("commission") or 0.0)
-    if cash <= 0 or cash > 10_000_000:
-        raise https_fn.HttpsError(https_fn.FunctionsErrorCode.INVALID_ARGUMENT, "Invalid cash amount.")
-    if commission < 0 or commission > 0.05:
-        raise https_fn.HttpsError(https_fn.FunctionsErrorCode.INVALID_ARGUMENT, "Invalid commission.")
-
-    params_raw = data.get("params") if isinstance(data.get("params"), dict) else {}
-    sl_pct = float(params_raw.get("slPct") or params_raw.get("sl") or 0.0)
-    tp_pct = float(params_raw.get("tpPct") or params_raw.get("tp") or 0.0)
+    An explicit 0 is kept (range checks reject it where it is invalid) and fractional
+    values for whole-number parameters are rejected rather than truncated.
+    """
+    raw = next((params_raw.get(key) for key in keys if params_raw.get(key) not in (None, "")), None)
+    if raw is None:
+        return int(default) if integer else float(default)
+    try:
+        number = float(raw) if not isinstance(raw, bool) else math.nan
+    except (TypeError, ValueError):
+        number = math.nan
+    if not math.isfinite(number):
+        raise https_fn.HttpsError(https_fn.FunctionsErrorCode.INVALID_ARGUMENT, f"Invalid {keys[0]} value.")
+    if integer:
+        if not number.is_integer():
+            raise https_fn.HttpsError(https_fn.FunctionsErrorCode.INVALID_ARGUMENT, f"{keys[0]} must be a whole number.")
+        return int(number)
+    return number
+
+
+def _parse_backtest_params(strategy: str, params_raw: dict[str, Any]) -> dict[str, Any]:
+    sl_pct = _backtest_param(params_raw, ("slPct", "sl"), 0.0)
+    tp_pct = _backtest_param(params_raw, ("tpPct", "tp"), 0.0)
     if sl_pct < 0 or sl_pct > 0.5:
         raise https_fn.HttpsError(https_fn.FunctionsErrorCode.INVALID_ARGUMENT, "Stop-loss percent must be between 0 and 0.5.")
     if tp_pct < 0 or tp_pct > 0.5:
         raise https_fn.HttpsError(https_fn.FunctionsErrorCode.INVALID_ARGUMENT, "Take-profit percent must be between 0 and 0.5.")
 
-    params: dict[str, Any] = {}
     if strategy == "sma_cross":
-        fast = int(params_raw.get("fast") or 20)
-        slow = int(params_raw.get("slow") or 50)
+        fast = _backtest_param(params_raw, ("fast",), 20, integer=True)
+        slow = _backtest_param(params_raw, ("slow",), 50, integer=True)
         if fast < 2 or slow < 5 or fast >= slow or slow > 400:
             raise https_fn.HttpsError(https_fn.FunctionsErrorCode.INVALID_ARGUMENT, "Invalid SMA parameters.")
-        params = {"fast": fast, "slow": slow, "slPct": sl_pct, "tpPct": tp_pct}
-    else:
-        rsi_period = int(params_raw.get("rsiPeriod") or params_raw.get("period") or 14)
-        oversold = float(params_raw.get("oversold") or 30)
-        exit_above = float(params_raw.get("exitAbove") or 55)
-        if rsi_period < 2 or rsi_period > 60:
-            raise https_fn.HttpsError(https_fn.FunctionsErrorCode.INVALID_ARGUMENT, "Invalid RSI period.")
-        if oversold <= 0 or oversold >= 50:
-            raise https_fn.HttpsError(https_fn.FunctionsErrorCode.INVALID_ARGUMENT, "Invalid RSI oversold threshold.")
-        if exit_above <= 50 or exit_above >= 95:
-            raise https_fn.HttpsError(https_fn.FunctionsErrorCode.INVALID_ARGUMENT, "Invalid RSI exit threshold.")
-        params = {"rsiPeriod": rsi_period, "oversold": oversold, "exitAbove": exit_above, "slPct": sl_pct, "tpPct": tp_pct}
+        return {"fast": fast, "slow": slow, "slPct": sl_pct, "tpPct": tp_pct}
+
+    rsi_period = _backtest_param(params_raw, ("rsiPeriod", "period"), 14, integer=True)
+    oversold = _backtest_param(params_raw, ("oversold",), 30)
+    exit_above = _backtest_param(params_raw, ("exitAbove",), 55)
+    if rsi_period < 2 or rsi_period > 60:
+        raise https_fn.HttpsError(https_fn.FunctionsErrorCode.INVALID_ARGUMENT, "Invalid RSI period.")
+    if oversold <= 0 or oversold >= 50:
+        raise https_fn.HttpsError(https_fn.FunctionsErrorCode.INVALID_ARGUMENT, "Invalid RSI oversold threshold.")
+    if exit_above <= 50 or exit_above >= 95:
+        raise https_fn.HttpsError(https_fn.FunctionsErrorCode.INVALID_ARGUMENT, "Invalid RSI exit threshold.")
+    return {"rsiPeriod": rsi_period, "oversold": oversold, "exitAbove": exit_above, "slPct": sl_pct, "tpPct": tp_pct}
+
+
+def _backtest_sweep_combinations(
+    strategy: str,
+    base_params: dict[str, Any],
+    grid: dict[str, Any],
+) -> tuple[list[str], list[dict[str, Any]]]:
+    """Expand a parameter grid into validated parameter sets.
+
+    Non-numeric values, and fractional values for whole-number parameters, reject the
+    grid. Combinations the single-run validation rejects (for example fast >= slow) are
+    skipped rather than failing the sweep.
+    """
+    allowed = _BACKTEST_SWEEP_PARAM_KEYS.get(strategy, ())
+    axes: list[str] = []
+    values: list[list[Any]] = []
+    for key in allowed:
+        raw = grid.get(key)
+        if raw is None:
+            continue
+        items = raw if isinstance(raw, list) else [raw]
+        cleaned: list[Any] = []
+        for item in items:
+            try:
+                number = float(item) if isinstance(item, (int, float, str)) and not isinstance(item, bool) else math.nan
+            except ValueError:
+                number = math.nan
+            if not math.isfinite(number):
+                raise https_fn.HttpsError(https_fn.FunctionsErrorCode.INVALID_ARGUMENT, f"Invalid {key} value in parameter grid.")
+            if key in _BACKTEST_INTEGER_PARAMS and not number.is_integer():
+                raise https_fn.HttpsError(https_fn.FunctionsErrorCode.INVALID_ARGUMENT, f"{key} values must be whole numbers.")
+            if number not in cleaned:
+                cleaned.append(number)
+        if not cleaned:
+            continue
+        if len(cleaned) > _BACKTEST_SWEEP_MAX_VALUES_PER_PARAM:
+            raise https_fn.HttpsError(
+                https_fn.FunctionsErrorCode.INVALID_ARGUMENT,
+                f"Sweep supports at most {_BACKTEST_SWEEP_MAX_VALUES_PER_PARAM} values per parameter.",
+            )
+        axes.append(key)
+        values.append(sorted(cleaned))
 
-    is_pro = token.get("email") == ADMIN_EMAIL or _is_paid_user(req.auth.uid)
-    free_limit = _remote_config_int("backtesting_free_daily_limit", 1, context=context)
-    pro_limit = _remote_config_int("backtesting_pro_daily_limit", 25, context=context)
-    _enforce_daily_usage(
-        req.auth.uid,
-        "backtestRuns",
-        pro_limit if is_pro else free_limit,
-        "Daily usage limit reached. Upgrade your plan to run more backtests.",
-    )
+    if not axes:
+        raise https_fn.HttpsError(https_fn.FunctionsErrorCode.INVALID_ARGUMENT, "Parameter grid has no valid values.")
+    total = math.prod(len(item) for item in values)
+    if total > BACKTEST_SWEEP_MAX_COMBINATIONS:
+        raise https_fn.HttpsError(
+            https_fn.FunctionsErrorCode.INVALID_ARGUMENT,
+            f"Parameter grid is too large ({total} combinations, max {BACKTEST_SWEEP_MAX_COMBINATIONS}).",
+        )
 
-    from datetime import timedelta  # local import to reduce cold start
-    import io
+    combos: list[dict[str, Any]] = []
+    for point in itertools.product(*values):
+        try:
+            combos.append(_parse_backtest_params(strategy, {**base_params, **dict(zip(axes, point))}))
+        except https_fn.HttpsError:
+            continue
+    if not combos:
+        raise https_fn.HttpsError(https_fn.FunctionsErrorCode.INVALID_ARGUMENT, "Parameter grid has no valid combinations.")
+    return axes, combos
 
-    try:
-        import pandas as pd  # type: ignore
-        import yfinance as yf  # type: ignore
-        from backtesting import Backtest, Strategy  # type: ignore
-        from backtesting.lib import crossover  # type: ignore
-        from backtesting.test import SMA  # type: ignore
-        import matplotlib
 
-        matplotlib.use("Agg")
-        import matplotlib.pyplot as plt  # type: ignore
-    except Exception as exc:
-        _raise_structured_error(
-            https_fn.FunctionsErrorCode.FAILED_PRECONDITION,
-            "backtest_dependency_error",
-            "Backtest dependencies are unavailable.",
-            {"raw": str(exc)},
-        )
+def _calc_rsi(series, period: int = 14):
+    import pandas as pd  # type: ignore
+
+    s = pd.Series(series)
+    delta = s.diff()
+    up = delta.clip(lower=0).rolling(period).mean()
+    down = (-delta.clip(upper=0)).rolling(period).mean()
+    rs = up / down
+    return 100 - (100 / (1 + rs))
 
-    def calc_rsi(series, period: int = 14):
-        s = pd.Series(series)
-        delta = s.diff()
-        up = delta.clip(lower=0).rolling(period).mean()
-        down = (-delta.clip(upper=0)).rolling(period).mean()
-        rs = up / down
-        return 100 - (100 / (1 + rs))
+
+def _backtest_strategy(strategy: str, params: dict[str, Any]) -> tuple[Any, str]:
+    from backtesting import Strategy  # type: ignore
+    from backtesting.lib import crossover  # type: ignore
+    from backtesting.test import SMA  # type: ignore
 
     if strategy == "rsi_reversion":
 
@@ -7164,7 +9478,7 @@ def run_backtest(req: https_fn.CallableRequest) -> dict[str, Any]:
                 return out
 
             def init(self):
-                self.rsi = self.I(calc_rsi, self.data.Close, self.rsi_period)
+                self.rsi = self.I(_calc_rsi, self.data.Close, self.rsi_period)
 
             def next(self):
                 if not self.position and self.rsi[-1] < self.oversold:
@@ -7172,75 +9486,447 @@ def run_backtest(req: https_fn.CallableRequest) -> dict[str, Any]:
                 elif self.position and self.rsi[-1] > self.exit_above:
                     self.position.close()
 
-        strategy_cls = RsiReversion
-        strategy_name = "RSI reversion"
-    else:
+        return RsiReversion, "RSI reversion"
+
+    class SmaCross(Strategy):  # type: ignore
+        fast = int(params["fast"])
+        slow = int(params["slow"])
+        sl_pct = float(params.get("slPct") or 0.0)
+        tp_pct = float(params.get("tpPct") or 0.0)
+
+        def _risk_args(self):
+            last_close = float(self.data.Close[-1])
+            out: dict[str, float] = {}
+            if self.sl_pct > 0:
+                out["sl"] = last_close * (1 - self.sl_pct)
+            if self.tp_pct > 0:
+                out["tp"] = last_close * (1 + self.tp_pct)
+            return out
 
-        class SmaCross(Strategy):  # type: ignore
-            fast = int(params["fast"])
-            slow = int(params["slow"])
-            sl_pct = float(params.get("slPct") or 0.0)
-            tp_pct = float(params.get("tpPct") or 0.0)
+        def init(self):
+            price = self.data.Close
+            self.sma_fast = self.I(SMA, price, self.fast)
+            self.sma_slow = self.I(SMA, price, self.slow)
 
-            def _risk_args(self):
-                last_close = float(self.data.Close[-1])
-                out: dict[str, float] = {}
-                if self.sl_pct > 0:
-                    out["sl"] = last_close * (1 - self.sl_pct)
-                if self.tp_pct > 0:
-                    out["tp"] = last_close * (1 + self.tp_pct)
-                return out
+        def next(self):
+            if crossover(self.sma_fast, self.sma_slow):
+                self.position.close()
+                self.buy(**self._risk_args())
+            elif crossover(self.sma_slow, self.sma_fast):
+                self.position.close()
 
-            def init(self):
-                price = self.data.Close
-                self.sma_fast = self.I(SMA, price, self.fast)
-                self.sma_slow = self.I(SMA, price, self.slow)
+    return SmaCross, "SMA crossover"
 
-            def next(self):
-                if crossover(self.sma_fast, self.sma_slow):
-                    self.position.close()
-                    self.buy(**self._risk_args())
-                elif crossover(self.sma_slow, self.sma_fast):
-                    self.position.close()
 
-        strategy_cls = SmaCross
-        strategy_name = "SMA crossover"
+def _backtest_signals(close: Any, strategy: str, params: dict[str, Any]) -> tuple[Any, Any, int]:
+    """Entry/exit decision arrays for a built-in strategy, plus the first tradable bar."""
+    import numpy as np  # type: ignore
+    import pandas as pd  # type: ignore
+
+    with np.errstate(invalid="ignore"):
+        if strategy == "rsi_reversion":
+            rsi = np.asarray(_calc_rsi(close, int(params["rsiPeriod"])), dtype=float)
+            indicators = [rsi]
+            entries = rsi < float(params["oversold"])
+            exits = rsi > float(params["exitAbove"])
+        else:
+            # Same rolling mean as backtesting.test.SMA so crossovers land on identical bars.
+            fast = pd.Series(close).rolling(int(params["fast"])).mean().to_numpy(dtype=float)
+            slow = pd.Series(close).rolling(int(params["slow"])).mean().to_numpy(dtype=float)
+            indicators = [fast, slow]
+            prev_fast = np.r_[np.nan, fast[:-1]]
+            prev_slow = np.r_[np.nan, slow[:-1]]
+            entries = (prev_fast < prev_slow) & (fast > slow)
+            exits = (prev_fast > prev_slow) & (fast < slow)
+
+    # Like Backtest.run, skip the indicator warm-up plus one bar.
+    start = 1 + max(int(np.isnan(indicator).argmin()) for indicator in indicators)
+    entries[:start] = False
+    exits[:start] = False
+    return entries, exits, start
+
+
+def _vectorized_backtest(df: Any, strategy: str, params: dict[str, Any], cash: float, commission: float) -> dict[str, Any]:
+    """Run a built-in long-only strategy over signal arrays instead of a per-bar event loop.
+
+    Fill rules follow backtesting.py 0.3 so the results match Backtest.run():
+    - a decision on one bar fills at the next bar's open, and entries pay commission
+      through the adjusted entry price;
+    - stop-loss is checked before take-profit, from the entry bar onward, and a pending
+      signal exit at the open takes precedence over both;
+    - positions still open after the last bar are closed at that bar's open.
+    Only the trade boundaries are stepped through; positions, equity and metrics are
+    computed over whole arrays.
+    """
+    import numpy as np  # type: ignore
+    import pandas as pd  # type: ignore
+
+    open_ = df["Open"].to_numpy(dtype=float)
+    high = df["High"].to_numpy(dtype=float)
+    low = df["Low"].to_numpy(dtype=float)
+    close = df["Close"].to_numpy(dtype=float)
+    n = len(close)
+    entries, exits, start = _backtest_signals(close, strategy, params)
+    entry_bars = np.flatnonzero(entries)
+    exit_bars = np.flatnonzero(exits)
+
+    sl_pct = float(params.get("slPct") or 0.0)
+    tp_pct = float(params.get("tpPct") or 0.0)
+    long_adjust = 1 + commission
+    # (entry bar, exit bar or None if still open, shares, adjusted entry price, exit price)
+    trades: list[tuple[int, int | None, int, float, float]] = []
+    balance = float(cash)
+    search_from = start
+    while search_from < n:
+        pos = int(np.searchsorted(entry_bars, search_from))
+        if pos >= len(entry_bars):
+            break
+        decision = int(entry_bars[pos])
+        reference = close[decision] * long_adjust
+        sl = close[decision] * (1 - sl_pct) if sl_pct > 0 else None
+        tp = close[decision] * (1 + tp_pct) if tp_pct > 0 else None
+        if (sl is not None and not sl < reference) or (tp is not None and not reference < tp):
+            raise ValueError(f"Long orders require: SL ({sl}) < LIMIT ({reference}) < TP ({tp})")
+
+        # Orders decided on the last bar fill at that same bar's open in the final broker pass.
+        fill = min(decision + 1, n - 1)
+        entry_price = open_[fill] * long_adjust
+        size = int((balance * (1 - sys.float_info.epsilon)) // entry_price)
+        if size <= 0:
+            search_from = decision + 1
+            continue
+
+        hits = np.zeros(n - fill, dtype=bool)
+        if sl is not None:
+            hits |= low[fill:] < sl
+        if tp is not None:
+            hits |= high[fill:] > tp
+        hit_offsets = np.flatnonzero(hits)
+        stop_bar = fill + int(hit_offsets[0]) if len(hit_offsets) else None
+        signal_bar = None
+        if decision < n - 1:
+            pos = int(np.searchsorted(exit_bars, fill))
+            signal_bar = int(exit_bars[pos]) if pos < len(exit_bars) else None
+
+        if stop_bar is not None and (signal_bar is None or stop_bar <= signal_bar):
+            exit_bar = stop_bar
+            if sl is not None and low[stop_bar] < sl:
+                exit_price = min(open_[stop_bar], sl)
+            else:
+                exit_price = max(open_[stop_bar], tp)
+        elif decision == n - 1:
+            trades.append((fill, None, size, entry_price, float("nan")))
+            break
+        else:
+            exit_bar = min(signal_bar + 1, n - 1) if signal_bar is not None else n - 1
+            exit_price = open_[exit_bar]
+        trades.append((fill, exit_bar, size, entry_price, float(exit_price)))
+        balance += size * (exit_price - entry_price)
+        if stop_bar != exit_bar and (signal_bar is None or signal_bar == n - 1):
+            break
+        search_from = exit_bar
+
+    position = np.zeros(n)
+    cost_basis = np.zeros(n)
+    realized = np.zeros(n)
+    for entry_bar, exit_bar, size, entry_price, exit_price in trades:
+        held_until = n if exit_bar is None else exit_bar
+        position[entry_bar:held_until] += size
+        cost_basis[entry_bar:held_until] += size * entry_price
+        if exit_bar is not None:
+            realized[exit_bar] += size * (exit_price - entry_price)
+    equity = cash + np.cumsum(realized) + position * close - cost_basis
+    equity[: min(start, n)] = cash
+
+    index = df.index
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drawdown = 1 - equity / np.maximum.accumulate(equity)
+    max_drawdown = -np.nan_to_num(drawdown.max())
+
+    # Annualized return / volatility exactly as backtesting._stats.compute_stats derives Sharpe.
+    day_returns = pd.Series(equity, index=index).resample("D").last().dropna().pct_change()
+    growth = day_returns.fillna(0) + 1
+    gmean_day_return = 0 if (growth <= 0).any() else np.exp(np.log(growth).sum() / (len(growth) or np.nan)) - 1
+    annual_trading_days = float(365 if index.dayofweek.to_series().between(5, 6).mean() > 2 / 7 * 0.6 else 252)
+    annual_return_pct = ((1 + gmean_day_return) ** annual_trading_days - 1) * 100
+    volatility_pct = (
+        np.sqrt(
+            (day_returns.var(ddof=int(bool(day_returns.shape))) + (1 + gmean_day_return) ** 2) ** annual_trading_days
+            - (1 + gmean_day_return) ** (2 * annual_trading_days)
+        )
+        * 100
+    )
+    sharpe = np.clip(annual_return_pct / (volatility_pct or np.nan), 0, np.inf)
+
+    closed = [trade for trade in trades if trade[1] is not None]
+    wins = sum(1 for _, _, size, entry_price, exit_price in closed if size * (exit_price - entry_price) > 0)
+    return {
+        "Return [%]": (equity[-1] - equity[0]) / equity[0] * 100,
+        "Sharpe Ratio": sharpe,
+        "Max. Drawdown [%]": max_drawdown * 100,
+        "# Trades": len(closed),
+        "Win Rate [%]": wins / len(closed) * 100 if closed else np.nan,
+        "_equity_curve": pd.DataFrame({"Equity": equity, "DrawdownPct": drawdown}, index=index),
+    }
+
+
+def _run_backtest_engine(df: Any, strategy: str, params: dict[str, Any], cash: float, commission: float, engine: str) -> Any:
+    if engine == "vectorized":
+        return _vectorized_backtest(df, strategy, params, cash, commission)
+    from backtesting import Backtest  # type: ignore
+
+    strategy_cls, _ = _backtest_strategy(strategy, params)
+    return Backtest(df, strategy_cls, cash=cash, commission=commission).run()
+
+
+def _backtest_metrics_diverged(expected: dict[str, Any], actual: dict[str, Any]) -> list[str]:
+    diverged: list[str] = []
+    for key, value in expected.items():
+        other = actual.get(key)
+        if isinstance(value, float) and isinstance(other, float) and math.isnan(value) and math.isnan(other):
+            continue
+        if not math.isclose(float(value), float(other), rel_tol=1e-6, abs_tol=1e-6):
+            diverged.append(key)
+    return diverged
+
+
+def _validate_vectorized_backtest(df: Any, strategy: str, params: dict[str, Any], cash: float, commission: float) -> list[str]:
+    """Runs both kernels on the same frame; returns the metric keys that diverged, logging any drift."""
+    metrics = _backtest_stats_metrics(_run_backtest_engine(df, strategy, params, cash, commission, "vectorized"))
+    reference = _backtest_stats_metrics(_run_backtest_engine(df, strategy, params, cash, commission, "event"))
+    diverged = _backtest_metrics_diverged(reference, metrics)
+    if diverged:
+        print(
+            "Warning: vectorized backtest diverged from backtesting.py "
+            f"({strategy} {params}): "
+            + ", ".join(f"{key} {metrics.get(key)} != {reference.get(key)}" for key in diverged)
+        )
+    return diverged
+
+
+def _load_backtest_history(ticker: str, interval: str, lookback_days: int):
+    """Download OHLC history for a backtest, reusing a frame cached for the same day."""
+    from datetime import timedelta  # local import to reduce cold start
+
+    import pandas as pd  # type: ignore
+    yf = _yfinance()
+
+    end = datetime.now(timezone.utc)
+    cache_key = (ticker, interval, lookback_days, end.strftime("%Y-%m-%d"))
+    with _BACKTEST_HISTORY_CACHE_LOCK:
+        cached = _BACKTEST_HISTORY_CACHE.get(cache_key)
+    if cached and time.time() - float(cached.get("loadedAt") or 0) < BACKTEST_HISTORY_CACHE_TTL_SECONDS:
+        _record_cache("backtest_history", True)
+        return cached["frame"]
+    _record_cache("backtest_history", False)
+
+    start = end - timedelta(days=lookback_days)
+    try:
+        df = yf.download(
+            ticker,
+            start=start.strftime("%Y-%m-%d"),
+            end=end.strftime("%Y-%m-%d"),
+            interval=interval,
+            progress=False,
+            auto_adjust=False,
+            threads=False,
+        )
+    except Exception as exc:
+        _raise_structured_error(
+            https_fn.FunctionsErrorCode.NOT_FOUND,
+            "ticker_not_found",
+            "Unable to load ticker history for backtest.",
+            {"ticker": ticker, "raw": str(exc)},
+        )
+    if df is None or getattr(df, "empty", True):
+        raise https_fn.HttpsError(https_fn.FunctionsErrorCode.FAILED_PRECONDITION, "No price history returned.")
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+    df = df.dropna()
+    df.index = pd.to_datetime(df.index, errors="coerce")
+    if getattr(df.index, "tz", None) is not None:
+        df.index = df.index.tz_localize(None)
+
+    for col in ["Open", "High", "Low", "Close"]:
+        if col not in df.columns:
+            raise https_fn.HttpsError(https_fn.FunctionsErrorCode.FAILED_PRECONDITION, f"Missing column: {col}")
+
+    with _BACKTEST_HISTORY_CACHE_LOCK:
+        if len(_BACKTEST_HISTORY_CACHE) >= _BACKTEST_HISTORY_CACHE_MAX_ENTRIES:
+            oldest = min(_BACKTEST_HISTORY_CACHE, key=lambda key: _BACKTEST_HISTORY_CACHE[key].get("loadedAt") or 0)
+            _BACKTEST_HISTORY_CACHE.pop(oldest, None)
+        _BACKTEST_HISTORY_CACHE[cache_key] = {"frame": df, "loadedAt": time.time()}
+    return df
+
+
+def _backtest_stats_metrics(stats: Any) -> dict[str, Any]:
+    return {
+        "ReturnPct": float(stats.get("Return [%]", 0.0)) if hasattr(stats, "get") else 0.0,
+        "Sharpe": float(stats.get("Sharpe Ratio", 0.0)) if hasattr(stats, "get") else 0.0,
+        "MaxDrawdownPct": float(stats.get("Max. Drawdown [%]", 0.0)) if hasattr(stats, "get") else 0.0,
+        "Trades": int(stats.get("# Trades", 0)) if hasattr(stats, "get") else 0,
+        "WinRatePct": float(stats.get("Win Rate [%]", 0.0)) if hasattr(stats, "get") else 0.0,
+    }
+
+
+def _run_backtest_sweep(
+    df: Any,
+    strategy: str,
+    combos: list[dict[str, Any]],
+    cash: float,
+    commission: float,
+) -> list[dict[str, Any]]:
+    """Evaluate every parameter set against one price frame with the vectorized kernel.
+
+    Runs in-process: forking a worker pool from an instance with live gRPC channels and
+    background threads can deadlock the children, and the kernel is fast enough that the
+    whole grid fits in one request. The winning parameters are re-run on the requested
+    engine afterwards.
+    """
+    results: list[dict[str, Any]] = []
+    for params in combos:
+        try:
+            metrics = _backtest_stats_metrics(_vectorized_backtest(df, strategy, params, cash, commission))
+        except Exception as exc:
+            results.append({"params": params, "error": str(exc)[:200]})
+            continue
+        # NaN Sharpe (no trades, flat equity) is not JSON-serializable in callable responses.
+        results.append({"params": params, **{key: value if math.isfinite(value) else None for key, value in metrics.items()}})
+    return results
+
+
+def _summarize_backtest_sweep(axes: list[str], results: list[dict[str, Any]]) -> dict[str, Any]:
+    """Rank sweep results and lay Sharpe/return out as a grid over the first two swept parameters.
+
+    When more than two parameters are swept, each cell holds the best-Sharpe result
+    across the remaining dimensions.
+    """
+    scored = [item for item in results if not item.get("error")]
+    ranked = sorted(
+        scored,
+        key=lambda item: (
+            item.get("Sharpe") if item.get("Sharpe") is not None else float("-inf"),
+            item.get("ReturnPct") if item.get("ReturnPct") is not None else float("-inf"),
+        ),
+        reverse=True,
+    )
+
+    x_key = axes[0]
+    y_key = axes[1] if len(axes) > 1 else None
+    x_values = sorted({item["params"][x_key] for item in scored})
+    y_values = sorted({item["params"][y_key] for item in scored}) if y_key else [None]
+    sharpe_grid: list[list[float | None]] = [[None for _ in x_values] for _ in y_values]
+    return_grid: list[list[float | None]] = [[None for _ in x_values] for _ in y_values]
+    filled: set[tuple[int, int]] = set()
+    # Walk best-first so the first result to land in a cell is the one kept.
+    for item in ranked:
+        col = x_values.index(item["params"][x_key])
+        row = y_values.index(item["params"][y_key]) if y_key else 0
+        if (row, col) in filled:
+            continue
+        filled.add((row, col))
+        sharpe_grid[row][col] = item.get("Sharpe")
+        return_grid[row][col] = item.get("ReturnPct")
+
+    return {
+        "axes": axes,
+        "evaluated": len(results),
+        "failed": len(results) - len(scored),
+        "best": ranked[0] if ranked else None,
+        "results": ranked,
+        # Rows are maps rather than nested arrays because Firestore rejects arrays of arrays.
+        "heatmap": {
+            "x": {"param": x_key, "values": x_values},
+            "y": {"param": y_key, "values": y_values} if y_key else None,
+            "rows": [
+                {"value": y_value, "sharpe": sharpe_grid[row], "returnPct": return_grid[row]}
+                for row, y_value in enumerate(y_values)
+            ],
+        },
+    }
+
+
+@_callable(profile="compute", features=("backtesting", "storage", "remote_config"))
+def run_backtest(req: https_fn.CallableRequest) -> dict[str, Any]:
+    token = _require_auth(req)
+    data = req.data or {}
+    meta = data.get("meta") if isinstance(data.get("meta"), dict) else {}
+    context = _remote_config_context(req, token, meta)
+
+    if not _remote_config_bool("backtesting_enabled", True, context=context):
+        raise https_fn.HttpsError(https_fn.FunctionsErrorCode.FAILED_PRECONDITION, "Backtesting is temporarily disabled.")
+
+    ticker = str(data.get("ticker") or "").upper().strip()
+    if not ticker or len(ticker) > 12 or not all(ch.isalnum() or ch in {".", "-"} for ch in ticker):
+        raise https_fn.HttpsError(https_fn.FunctionsErrorCode.INVALID_ARGUMENT, "Ticker is required.")
+
+    interval = str(data.get("interval") or "1d").strip()
+    if interval not in {"1d", "1h"}:
+        raise https_fn.HttpsError(https_fn.FunctionsErrorCode.INVALID_ARGUMENT, "Invalid interval.")
+
+    strategy = str(data.get("strategy") or "sma_cross").strip().lower()
+    if strategy not in {"sma_cross", "rsi_reversion"}:
+        raise https_fn.HttpsError(https_fn.FunctionsErrorCode.INVALID_ARGUMENT, "Invalid strategy.")
+
+    lookback_days = int(data.get("lookbackDays") or data.get("lookback") or 730)
+    if lookback_days < 30 or lookback_days > 5000:
+        raise https_fn.HttpsError(https_fn.FunctionsErrorCode.INVALID_ARGUMENT, "Lookback must be between 30 and 5000 days.")
+
+    cash = float(data.get("cash") or 10_000)
+    commission = float(data.get("commission") or 0.0)
+    if cash <= 0 or cash > 10_000_000:
+        raise https_fn.HttpsError(https_fn.FunctionsErrorCode.INVALID_ARGUMENT, "Invalid cash amount.")
+    if commission < 0 or commission > 0.05:
+        raise https_fn.HttpsError(https_fn.FunctionsErrorCode.INVALID_ARGUMENT, "Invalid commission.")
+
+    engine = str(data.get("engine") or "vectorized").strip().lower()
+    if engine not in BACKTEST_ENGINES:
+        raise https_fn.HttpsError(https_fn.FunctionsErrorCode.INVALID_ARGUMENT, "Invalid backtest engine.")
+
+    params_raw = data.get("params") if isinstance(data.get("params"), dict) else {}
+    params = _parse_backtest_params(strategy, params_raw)
+
+    sweep_grid = data.get("paramGrid") if isinstance(data.get("paramGrid"), dict) else {}
+    sweep_axes, sweep_combos = _backtest_sweep_combinations(strategy, params, sweep_grid) if sweep_grid else ([], [])
+
+    is_pro = token.get("email") == ADMIN_EMAIL or _is_paid_user(req.auth.uid)
+    free_limit = _remote_config_int("backtesting_free_daily_limit", 1, context=context)
+    pro_limit = _remote_config_int("backtesting_pro_daily_limit", 25, context=context)
+    _enforce_daily_usage(
+        req.auth.uid,
+        "backtestRuns",
+        pro_limit if is_pro else free_limit,
+        "Daily usage limit reached. Upgrade your plan to run more backtests.",
+    )
+
+    import io  # local import to reduce cold start
 
-    end = datetime.now(timezone.utc)
-    start = end - timedelta(days=lookback_days)
     try:
-        df = yf.download(
-            ticker,
-            start=start.strftime("%Y-%m-%d"),
-            end=end.strftime("%Y-%m-%d"),
-            interval=interval,
-            progress=False,
-            auto_adjust=False,
-            threads=False,
-        )
+        import matplotlib
+
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt  # type: ignore
     except Exception as exc:
         _raise_structured_error(
-            https_fn.FunctionsErrorCode.NOT_FOUND,
-            "ticker_not_found",
-            "Unable to load ticker history for backtest.",
-            {"ticker": ticker, "raw": str(exc)},
+            https_fn.FunctionsErrorCode.FAILED_PRECONDITION,
+            "backtest_dependency_error",
+            "Backtest dependencies are unavailable.",
+            {"raw": str(exc)},
         )
-    if df is None or getattr(df, "empty", True):
-        raise https_fn.HttpsError(https_fn.FunctionsErrorCode.FAILED_PRECONDITION, "No price history returned.")
-    if isinstance(df.columns, pd.MultiIndex):
-        df.columns = df.columns.get_level_values(0)
-    df = df.dropna()
-    df.index = pd.to_datetime(df.index, errors="coerce")
-    if getattr(df.index, "tz", None) is not None:
-        df.index = df.index.tz_localize(None)
 
-    for col in ["Open", "High", "Low", "Close"]:
-        if col not in df.columns:
-            raise https_fn.HttpsError(https_fn.FunctionsErrorCode.FAILED_PRECONDITION, f"Missing column: {col}")
+    df = _load_backtest_history(ticker, interval, lookback_days)
+
+    sweep: dict[str, Any] | None = None
+    if sweep_combos:
+        sweep_results = _run_backtest_sweep(df, strategy, sweep_combos, cash, commission)
+        sweep = _summarize_backtest_sweep(sweep_axes, sweep_results)
+        if sweep.get("best"):
+            params = dict(sweep["best"]["params"])
+
+    strategy_name = "RSI reversion" if strategy == "rsi_reversion" else "SMA crossover"
 
     try:
-        bt = Backtest(df, strategy_cls, cash=cash, commission=commission)
-        stats = bt.run()
+        stats = _run_backtest_engine(df, strategy, params, cash, commission, engine)
         equity = None
         try:
             equity = stats.get("_equity_curve") if hasattr(stats, "get") else None
@@ -7291,18 +9977,13 @@ def run_backtest(req: https_fn.CallableRequest) -> dict[str, Any]:
     image_path = f"backtests/{req.auth.uid}/{backtest_id}.png"
 
     try:
-        bucket = admin_storage.bucket(STORAGE_BUCKET)
+        bucket = _storage_bucket()
         bucket.blob(image_path).upload_from_string(png_bytes, content_type="image/png")
     except Exception:
         raise https_fn.HttpsError(https_fn.FunctionsErrorCode.INTERNAL, "Unable to store backtest chart.")
 
-    metrics = {
-        "ReturnPct": float(stats.get("Return [%]", 0.0)) if hasattr(stats, "get") else 0.0,
-        "Sharpe": float(stats.get("Sharpe Ratio", 0.0)) if hasattr(stats, "get") else 0.0,
-        "MaxDrawdownPct": float(stats.get("Max. Drawdown [%]", 0.0)) if hasattr(stats, "get") else 0.0,
-        "Trades": int(stats.get("# Trades", 0)) if hasattr(stats, "get") else 0,
-        "WinRatePct": float(stats.get("Win Rate [%]", 0.0)) if hasattr(stats, "get") else 0.0,
-    }
+    metrics = _backtest_stats_metrics(stats)
+    validate_kernel = engine == "vectorized" and random.random() < BACKTEST_KERNEL_VALIDATION_RATE
 
     title = str(data.get("title") or f"{ticker} · {strategy_name}").strip()
     if len(title) > 180:
@@ -7316,6 +9997,7 @@ def run_backtest(req: https_fn.CallableRequest) -> dict[str, Any]:
             "interval": interval,
             "lookbackDays": lookback_days,
             "strategy": strategy,
+            "engine": engine,
             "params": params,
             "cash": cash,
             "commission": commission,
@@ -7324,23 +10006,33 @@ def run_backtest(req: https_fn.CallableRequest) -> dict[str, Any]:
             "imagePath": image_path,
             "code": code,
             "exportSources": export_sources,
+            "sweep": sweep,
+            **({"kernelValidation": "queued"} if validate_kernel else {}),
             "createdAt": firestore.SERVER_TIMESTAMP,
             "updatedAt": firestore.SERVER_TIMESTAMP,
             "meta": meta,
         }
     )
 
-    _audit_event(req.auth.uid, token.get("email"), "backtest_completed", {"backtestId": backtest_id, "ticker": ticker, "strategy": strategy})
+    _audit_event(
+        req.auth.uid,
+        token.get("email"),
+        "backtest_completed",
+        {"backtestId": backtest_id, "ticker": ticker, "strategy": strategy, "sweepSize": len(sweep_combos)},
+    )
     return {
         "backtestId": backtest_id,
         "metrics": metrics,
+        "params": params,
+        "engine": engine,
+        "sweep": sweep,
         "imagePath": image_path,
         "title": title,
         "exportFormats": sorted(BACKTEST_SOURCE_FORMATS),
     }
 
 
-@https_fn.on_call()
+@_callable()
 def rename_backtest(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     data = req.data or {}
@@ -7367,7 +10059,52 @@ def rename_backtest(req: https_fn.CallableRequest) -> dict[str, Any]:
     return {"updated": True, "backtestId": backtest_id, "title": title}
 
 
-@https_fn.on_call()
+@scheduler_fn.on_schedule(
+    schedule="40 * * * *",
+    timezone=scheduler_fn.Timezone(SOCIAL_AUTOMATION_TIMEZONE),
+    memory=MemoryOption.GB_1,
+)
+@_with_teardown
+def backtest_kernel_validation_scheduler(event: scheduler_fn.ScheduledEvent) -> None:
+    """Compares sampled vectorized backtests against backtesting.py, off the request path."""
+    del event
+    docs = list(
+        db.collection("backtests")
+        .where("kernelValidation", "==", "queued")
+        .limit(BACKTEST_KERNEL_VALIDATION_BATCH_SIZE)
+        .stream()
+    )
+    for item in docs:
+        data = item.to_dict() or {}
+        diverged: list[str] = []
+        try:
+            df = _load_backtest_history(
+                str(data.get("ticker") or ""),
+                str(data.get("interval") or "1d"),
+                int(data.get("lookbackDays") or 730),
+            )
+            diverged = _validate_vectorized_backtest(
+                df,
+                str(data.get("strategy") or "sma_cross"),
+                data.get("params") if isinstance(data.get("params"), dict) else {},
+                float(data.get("cash") or 10_000),
+                float(data.get("commission") or 0.0),
+            )
+            status = "diverged" if diverged else "passed"
+        except Exception as exc:
+            print(f"Warning: backtest kernel validation failed for {item.id}: {exc}")
+            status = "failed"
+        db.collection("backtests").document(item.id).set(
+            {
+                "kernelValidation": status,
+                "kernelValidationDiverged": diverged,
+                "kernelValidatedAt": firestore.SERVER_TIMESTAMP,
+            },
+            merge=True,
+        )
+
+
+@_callable(features=("storage",))
 def delete_backtest(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     data = req.data or {}
@@ -7387,7 +10124,7 @@ def delete_backtest(req: https_fn.CallableRequest) -> dict[str, Any]:
     image_path = str(doc.get("imagePath") or "").strip()
     if image_path:
         try:
-            bucket = admin_storage.bucket(STORAGE_BUCKET)
+            bucket = _storage_bucket()
             bucket.blob(image_path).delete()
         except Exception:
             pass
@@ -7397,7 +10134,7 @@ def delete_backtest(req: https_fn.CallableRequest) -> dict[str, Any]:
     return {"deleted": True, "backtestId": backtest_id}
 
 
-@https_fn.on_call()
+@_callable()
 def create_share_link(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     data = req.data or {}
@@ -7443,7 +10180,7 @@ def create_share_link(req: https_fn.CallableRequest) -> dict[str, Any]:
     return {"shareId": share_ref.id, "shareUrl": share_url, "kind": kind}
 
 
-@https_fn.on_call()
+@_callable(features=("storage",))
 def import_shared_item(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     data = req.data or {}
@@ -7508,6 +10245,7 @@ def import_shared_item(req: https_fn.CallableRequest) -> dict[str, Any]:
             "metrics",
             "forecastPreview",
             "forecastRows",
+            "forecastRowsRef",
         ]:
             if key in source:
                 imported_doc[key] = source.get(key)
@@ -7524,7 +10262,7 @@ def import_shared_item(req: https_fn.CallableRequest) -> dict[str, Any]:
         new_path = ""
         if file_path:
             try:
-                bucket = admin_storage.bucket(STORAGE_BUCKET)
+                bucket = _storage_bucket()
                 src_blob = bucket.blob(file_path)
                 if src_blob.exists():
                     base = os.path.basename(file_path)
@@ -7545,6 +10283,8 @@ def import_shared_item(req: https_fn.CallableRequest) -> dict[str, Any]:
         )
 
     imported_ref.set(imported_doc)
+    if kind == "forecast":
+        _retain_forecast_rows(imported_doc.get("forecastRowsRef"))
     import_ref.set(
         {
             "shareId": share_id,
@@ -7561,10 +10301,10 @@ def import_shared_item(req: https_fn.CallableRequest) -> dict[str, Any]:
     return {"kind": kind, "importedId": imported_ref.id, "shareId": share_id}
 
 
-@https_fn.on_call(memory=MemoryOption.MB_512, timeout_sec=120)
+@_callable(profile="standard", features=("market_data",))
 def get_ticker_history(req: https_fn.CallableRequest) -> dict[str, Any]:
     import pandas as pd  # type: ignore
-    import yfinance as yf  # type: ignore
+    yf = _yfinance()
 
     data = req.data or {}
     ticker = str(data.get("ticker") or "").upper()
@@ -7613,14 +10353,105 @@ def get_ticker_history(req: https_fn.CallableRequest) -> dict[str, Any]:
     if date_col in history.columns:
         history[date_col] = history[date_col].astype(str)
 
-    rows = history.to_dict(orient="records")
-    return {"rows": _serialize_for_firestore(rows)}
+    return {"rows": _serialize_for_firestore(history)}
+
+
+_PRICE_EXPORT_CACHE: dict[str, dict[str, Any]] = {}
+_PRICE_EXPORT_CACHE_LOCK = threading.Lock()
+
+
+def _signed_download_url(blob: Any, filename: str, expires_in: int) -> str:
+    """V4 signed GET URL that downloads `blob` as `filename`.
+
+    The Cloud Functions runtime credentials hold no private key, so signing falls back
+    to the IAM signBlob API with the runtime service account. That needs the account to
+    hold roles/iam.serviceAccountTokenCreator on itself (see README, Deploy).
+    """
+    options = {
+        "version": "v4",
+        "expiration": timedelta(seconds=expires_in),
+        "method": "GET",
+        "response_disposition": f'attachment; filename="{filename}"',
+    }
+    try:
+        return blob.generate_signed_url(**options)
+    except Exception:
+        import google.auth  # type: ignore
+        from google.auth.transport.requests import Request as AuthRequest  # type: ignore
+
+        auth_credentials, _ = google.auth.default(scopes=["https://www.googleapis.com/auth/cloud-platform"])
+        auth_credentials.refresh(AuthRequest())
+        return blob.generate_signed_url(
+            **options,
+            service_account_email=auth_credentials.service_account_email,
+            access_token=auth_credentials.token,
+        )
+
+
+def _export_price_csv(
+    ticker: str,
+    interval: str,
+    start_date: date,
+    end_date: date,
+    filename: str,
+    load_frame: Any,
+) -> dict[str, Any]:
+    """Streams the price CSV into Storage through a resumable upload and returns a signed URL.
+
+    Exports are cached per (ticker, interval, range): the signed URL in instance memory,
+    the object itself in Storage until it is older than the range's TTL.
+    """
+    path = f"{PRICE_EXPORT_PREFIX}/{ticker}/{interval}/{start_date.isoformat()}_{end_date.isoformat()}.csv"
+    fresh_for = PRICE_EXPORT_CACHE_TTL_SECONDS if end_date >= date.today() else PRICE_EXPORT_CLOSED_RANGE_TTL_SECONDS
+    now = time.time()
+    with _PRICE_EXPORT_CACHE_LOCK:
+        cached = _PRICE_EXPORT_CACHE.get(path)
+    if cached and now - cached["generatedAt"] < fresh_for and cached["urlExpiresAt"] - now > 300:
+        _record_cache("price_export", True)
+        return {**cached["export"], "cached": True}
+
+    bucket = _storage_bucket()
+    blob = bucket.get_blob(path)
+    generated_at = blob.updated.timestamp() if blob is not None and blob.updated else 0.0
+    hit = now - generated_at < fresh_for
+    _record_cache("price_export", hit)
+    if hit:
+        row_count = int((blob.metadata or {}).get("rowCount") or 0)
+    else:
+        frame = load_frame()
+        row_count = int(len(frame))
+        blob = bucket.blob(path)
+        blob.metadata = {"rowCount": str(row_count)}
+        blob.content_disposition = f'attachment; filename="{filename}"'
+        with _span("storage.upload", path=path, rows=row_count):
+            with blob.open("w", chunk_size=PRICE_EXPORT_UPLOAD_CHUNK_BYTES, content_type="text/csv") as handle:
+                # Same file as the inline mode, which drops the first data row (_force_remove_second_line).
+                frame.iloc[1:].to_csv(handle, index=False)
+        generated_at = time.time()
+
+    with _span("storage.sign"):
+        url = _signed_download_url(blob, filename, PRICE_EXPORT_URL_TTL_SECONDS)
+    export = {
+        "rowCount": row_count,
+        "storagePath": path,
+        "url": url,
+        "urlExpiresAt": datetime.fromtimestamp(now + PRICE_EXPORT_URL_TTL_SECONDS, timezone.utc).isoformat(),
+    }
+    with _PRICE_EXPORT_CACHE_LOCK:
+        if len(_PRICE_EXPORT_CACHE) >= 256:
+            _PRICE_EXPORT_CACHE.clear()
+        _PRICE_EXPORT_CACHE[path] = {
+            "export": export,
+            "generatedAt": generated_at,
+            "urlExpiresAt": now + PRICE_EXPORT_URL_TTL_SECONDS,
+        }
+    return {**export, "cached": hit}
 
 
-@https_fn.on_call(memory=MemoryOption.MB_512, timeout_sec=180)
+@_callable(profile="standard", timeout_sec=180, features=("market_data", "storage"))
 def download_price_csv(req: https_fn.CallableRequest) -> dict[str, Any]:
     import pandas as pd  # type: ignore
-    import yfinance as yf  # type: ignore
+    yf = _yfinance()
 
     _require_auth(req)
     data = req.data or {}
@@ -7652,49 +10483,53 @@ def download_price_csv(req: https_fn.CallableRequest) -> dict[str, Any]:
     else:
         start_date = _parse_iso_date(start_raw, date(1900, 1, 1))
 
-    # yfinance treats end as exclusive; bump one day so user-selected end is included.
-    end_exclusive = end_date + timedelta(days=1)
-
-    history = yf.download(
-        ticker,
-        start=start_date.isoformat(),
-        end=end_exclusive.isoformat(),
-        interval=interval,
-        progress=False,
-    )
-    if isinstance(history.columns, pd.MultiIndex):
-        history.columns = history.columns.get_level_values(0)
-    history = history.dropna()
-    if history.empty or "Close" not in history.columns:
-        raise https_fn.HttpsError(https_fn.FunctionsErrorCode.NOT_FOUND, "No data returned for the requested range.")
-
-    out_df = history[["Close"]].rename(columns={"Close": "Price"}).copy()
-    out_df.reset_index(inplace=True)
-    date_col = "Datetime" if "Datetime" in out_df.columns else "Date"
-    if date_col != "Date" and date_col in out_df.columns:
-        out_df.rename(columns={date_col: "Date"}, inplace=True)
-    if "Date" in out_df.columns:
-        out_df["Date"] = out_df["Date"].astype(str)
-    out_df.insert(0, "Item_Id", ticker.lower())
-
-    buffer = StringIO()
-    out_df.to_csv(buffer, index=False)
-    buffer.seek(0)
-    csv_text = _force_remove_second_line(buffer.getvalue())
-
     filename = f"{ticker}_{start_date.isoformat()}_{end_date.isoformat()}_{interval}.csv"
-    return {
+
+    def _load_frame() -> pd.DataFrame:
+        # yfinance treats end as exclusive; bump one day so user-selected end is included.
+        end_exclusive = end_date + timedelta(days=1)
+        history = yf.download(
+            ticker,
+            start=start_date.isoformat(),
+            end=end_exclusive.isoformat(),
+            interval=interval,
+            progress=False,
+        )
+        if isinstance(history.columns, pd.MultiIndex):
+            history.columns = history.columns.get_level_values(0)
+        history = history.dropna()
+        if history.empty or "Close" not in history.columns:
+            raise https_fn.HttpsError(https_fn.FunctionsErrorCode.NOT_FOUND, "No data returned for the requested range.")
+
+        out_df = history[["Close"]].rename(columns={"Close": "Price"}).copy()
+        out_df.reset_index(inplace=True)
+        date_col = "Datetime" if "Datetime" in out_df.columns else "Date"
+        if date_col != "Date" and date_col in out_df.columns:
+            out_df.rename(columns={date_col: "Date"}, inplace=True)
+        if "Date" in out_df.columns:
+            out_df["Date"] = out_df["Date"].astype(str)
+        out_df.insert(0, "Item_Id", ticker.lower())
+        return out_df
+
+    response = {
         "ticker": ticker,
         "interval": interval,
         "start": start_date.isoformat(),
         "end": end_date.isoformat(),
-        "rowCount": int(len(out_df)),
         "filename": filename,
-        "csv": csv_text,
     }
+    if str(data.get("mode") or "").strip().lower() == "export":
+        return {**response, **_export_price_csv(ticker, interval, start_date, end_date, filename, _load_frame)}
+
+    out_df = _load_frame()
+    buffer = StringIO()
+    out_df.to_csv(buffer, index=False)
+    buffer.seek(0)
+    csv_text = _force_remove_second_line(buffer.getvalue())
+    return {**response, "rowCount": int(len(out_df)), "csv": csv_text}
 
 
-@https_fn.on_call()
+@_callable()
 def get_unsplash_gallery(req: https_fn.CallableRequest) -> dict[str, Any]:
     data = req.data or {}
     query = str(data.get("query") or data.get("q") or "stock market, trading desk").strip()
@@ -7709,7 +10544,7 @@ def get_unsplash_gallery(req: https_fn.CallableRequest) -> dict[str, Any]:
     }
 
 
-@https_fn.on_call()
+@_callable(profile="standard", features=("market_data",))
 def get_trending_tickers(req: https_fn.CallableRequest) -> dict[str, Any]:
     data = req.data or {}
     force = bool(data.get("force"))
@@ -7739,7 +10574,7 @@ def get_trending_tickers(req: https_fn.CallableRequest) -> dict[str, Any]:
 
     tickers: list[str] = []
     try:
-        response = requests.get(TRENDING_URL, headers=_yahoo_headers(), timeout=10)
+        response = _http_get(TRENDING_URL, headers=_yahoo_headers(), timeout=10)
         response.raise_for_status()
         data = response.json()
         quotes = data.get("finance", {}).get("result", [{}])[0].get("quotes", [])
@@ -7780,11 +10615,11 @@ def get_trending_tickers(req: https_fn.CallableRequest) -> dict[str, Any]:
     return payload
 
 
-@https_fn.on_call(memory=MemoryOption.GB_1, timeout_sec=180)
+@_callable(profile="data", features=("market_data",))
 def get_ticker_intel(req: https_fn.CallableRequest) -> dict[str, Any]:
     import numpy as np  # type: ignore
     import pandas as pd  # type: ignore
-    import yfinance as yf  # type: ignore
+    yf = _yfinance()
 
     data = req.data or {}
     ticker = str(data.get("ticker") or "").upper().strip()
@@ -8121,14 +10956,112 @@ def get_ticker_intel(req: https_fn.CallableRequest) -> dict[str, Any]:
     }
 
 
-@https_fn.on_call()
-def get_ticker_news(req: https_fn.CallableRequest) -> dict[str, Any]:
-    data = req.data or {}
-    ticker = str(data.get("ticker") or "").upper()
-    if not ticker:
-        raise https_fn.HttpsError(https_fn.FunctionsErrorCode.INVALID_ARGUMENT, "Ticker is required.")
+_TICKER_NEWS_CACHE: dict[str, dict[str, Any]] = {}
+_TICKER_NEWS_CACHE_LOCK = threading.Lock()
+
+
+def _news_item_epoch(value: Any) -> float:
+    """Normalizes epoch, ISO-8601 and RFC 822 (RSS) publish times to epoch seconds."""
+    if value in (None, ""):
+        return 0.0
+    if isinstance(value, (int, float)):
+        number = float(value)
+        return number / 1000.0 if number > 1e12 else number
+    text = str(value).strip()
+    try:
+        return float(text)
+    except Exception:
+        pass
+    try:
+        parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+    except Exception:
+        pass
+    try:
+        return parsedate_to_datetime(text).timestamp()
+    except Exception:
+        return 0.0
+
+
+def _fetch_ticker_news_yahoo_search(ticker: str) -> list[dict[str, Any]]:
+    resp = _http_get(
+        YAHOO_SEARCH_URL,
+        headers=_yahoo_headers(),
+        params={"q": ticker, "newsCount": 12, "quotesCount": 0, "listsCount": 0},
+        timeout=10,
+    )
+    if resp.status_code >= 400:
+        return []
+    payload = resp.json() if resp.text else {}
+    return [item for item in (payload.get("news") or [])[:12] if isinstance(item, dict)]
+
+
+def _fetch_ticker_news_yfinance(ticker: str) -> list[dict[str, Any]]:
+    yf = _yfinance()
+
+    ticker_obj = yf.Ticker(ticker)
+    return [item for item in (ticker_obj.news or [])[:10] if isinstance(item, dict)]
+
+
+def _fetch_ticker_news_rss(ticker: str) -> list[dict[str, Any]]:
+    import xml.etree.ElementTree as ET
+
+    rss_url = f"https://feeds.finance.yahoo.com/rss/2.0/headline?s={ticker}&region=US&lang=en-US"
+    rss = _http_get(rss_url, headers=_yahoo_headers(), timeout=10)
+    if rss.status_code >= 400 or not rss.text:
+        return []
+    root = ET.fromstring(rss.text)
+    out: list[dict[str, Any]] = []
+    for item in root.findall(".//item")[:10]:
+        out.append(
+            {
+                "title": (item.findtext("title") or "").strip(),
+                "link": (item.findtext("link") or "").strip(),
+                "publishedAt": (item.findtext("pubDate") or "").strip(),
+                "publisher": "Yahoo Finance",
+            }
+        )
+    return out
+
+
+def _news_item_key(item: dict[str, Any]) -> str:
+    return str(item.get("link") or item.get("url") or item.get("title") or "").strip().lower()
+
+
+def _fetch_ticker_news_merged(ticker: str) -> list[dict[str, Any]]:
+    """Fetches ticker news from Yahoo search, hedging with yfinance and RSS only when it lags.
+
+    Yahoo search runs alone for TICKER_NEWS_HEDGE_SECONDS. If it has not returned items by
+    then (slow, failed or empty), yfinance and RSS start alongside it, and the response goes
+    out as soon as any source completes with items, or at TICKER_NEWS_DEADLINE_SECONDS.
+    Whatever has finished by then is merged in priority order (Yahoo search, yfinance, RSS)
+    and deduplicated, up to TICKER_NEWS_MAX_ITEMS.
+    """
+    primary, *fallbacks = [_fetch_ticker_news_yahoo_search, _fetch_ticker_news_yfinance, _fetch_ticker_news_rss]
+    deadline = time.monotonic() + TICKER_NEWS_DEADLINE_SECONDS
+
+    def _has_items(future: Any) -> bool:
+        return future.done() and future.exception() is None and bool(future.result())
+
+    pool = ThreadPoolExecutor(max_workers=1 + len(fallbacks))
+    try:
+        futures = [pool.submit(_in_trace_context(primary), ticker)]
+        wait_futures(futures, timeout=TICKER_NEWS_HEDGE_SECONDS)
+        if not _has_items(futures[0]):
+            futures += [pool.submit(_in_trace_context(source), ticker) for source in fallbacks]
+            pending = {future for future in futures if not future.done()}
+            while pending and not any(_has_items(future) for future in futures):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                _, pending = wait_futures(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+    finally:
+        pool.shutdown(wait=False)
 
     seen: set[str] = set()
+    news_items: list[dict[str, Any]] = []
 
     def _extract_thumbnail(item: dict[str, Any]) -> str:
         thumb = item.get("thumbnail")
@@ -8155,7 +11088,7 @@ def get_ticker_news(req: https_fn.CallableRequest) -> dict[str, Any]:
         link = str(item.get("link") or item.get("url") or "").strip()
         if not title:
             return
-        key = (link or title).strip().lower()
+        key = _news_item_key(item)
         if key in seen:
             return
         seen.add(key)
@@ -8173,71 +11106,52 @@ def get_ticker_news(req: https_fn.CallableRequest) -> dict[str, Any]:
             }
         )
 
-    news_items: list[dict[str, Any]] = []
-    # 1) Prefer Yahoo search news (more reliable than yfinance .news)
-    try:
-        resp = requests.get(
-            YAHOO_SEARCH_URL,
-            headers=_yahoo_headers(),
-            params={"q": ticker, "newsCount": 12, "quotesCount": 0, "listsCount": 0},
-            timeout=10,
-        )
-        if resp.status_code < 400:
-            payload = resp.json() if resp.text else {}
-            for item in (payload.get("news") or [])[:12]:
-                if isinstance(item, dict):
-                    _append_item(item)
-    except Exception:
-        pass
-
-    # 2) Fallback: yfinance news
-    if not news_items:
+    for future in futures:
+        if not future.done():
+            continue
         try:
-            import yfinance as yf  # type: ignore
-
-            ticker_obj = yf.Ticker(ticker)
-            for item in (ticker_obj.news or [])[:10]:
-                if not isinstance(item, dict):
-                    continue
-                _append_item(item)
+            items = future.result()
         except Exception:
-            pass
+            continue
+        for item in items:
+            _append_item(item)
+    return news_items[:TICKER_NEWS_MAX_ITEMS]
 
-    # 3) Optional: RSS fallback (lightweight parse)
-    if not news_items:
-        try:
-            import xml.etree.ElementTree as ET
-
-            rss_url = f"https://feeds.finance.yahoo.com/rss/2.0/headline?s={ticker}&region=US&lang=en-US"
-            rss = requests.get(rss_url, headers=_yahoo_headers(), timeout=10)
-            if rss.status_code < 400 and rss.text:
-                root = ET.fromstring(rss.text)
-                for item in root.findall(".//item")[:10]:
-                    title = (item.findtext("title") or "").strip()
-                    link = (item.findtext("link") or "").strip()
-                    pub_date = (item.findtext("pubDate") or "").strip()
-                    if title:
-                        key = (link or title).strip().lower()
-                        if key in seen:
-                            continue
-                        seen.add(key)
-                        news_items.append(
-                            {
-                                "title": title,
-                                "publisher": "Yahoo Finance",
-                                "link": link,
-                                "publishedAt": pub_date,
-                                "summary": "",
-                                "thumbnailUrl": "",
-                            }
-                        )
-        except Exception:
-            pass
 
-    return {"news": news_items}
+@_callable(profile="standard", features=("market_data",))
+def get_ticker_news(req: https_fn.CallableRequest) -> dict[str, Any]:
+    data = req.data or {}
+    ticker = str(data.get("ticker") or "").upper()
+    if not ticker:
+        raise https_fn.HttpsError(https_fn.FunctionsErrorCode.INVALID_ARGUMENT, "Ticker is required.")
+
+    now = time.time()
+    with _TICKER_NEWS_CACHE_LOCK:
+        cached = _TICKER_NEWS_CACHE.get(ticker)
+    if cached and (now - float(cached.get("loadedAt") or 0.0)) < TICKER_NEWS_CACHE_TTL_SECONDS:
+        _record_cache("ticker_news", True)
+        return {"news": cached["news"], "newestPublishedAt": cached["newestAt"], "cached": True}
+    _record_cache("ticker_news", False)
+
+    news_items = _fetch_ticker_news_merged(ticker)
+    newest_at = max((_news_item_epoch(item.get("publishedAt")) for item in news_items), default=0.0)
+    if cached and news_items and newest_at <= float(cached.get("newestAt") or 0.0):
+        # Nothing newer was published; keep the previous merge (it may include sources that were
+        # skipped or timed out now) and add whatever this fetch found that it lacked.
+        known = {_news_item_key(item) for item in cached["news"]}
+        news_items = (cached["news"] + [item for item in news_items if _news_item_key(item) not in known])[
+            :TICKER_NEWS_MAX_ITEMS
+        ]
+        newest_at = float(cached.get("newestAt") or 0.0)
+    if news_items:
+        with _TICKER_NEWS_CACHE_LOCK:
+            if ticker not in _TICKER_NEWS_CACHE and len(_TICKER_NEWS_CACHE) >= 500:
+                _TICKER_NEWS_CACHE.clear()
+            _TICKER_NEWS_CACHE[ticker] = {"news": news_items, "newestAt": newest_at, "loadedAt": now}
+    return {"news": news_items, "newestPublishedAt": newest_at, "cached": False}
 
 
-@https_fn.on_call()
+@_callable(features=("social",))
 def get_ticker_x_trends(req: https_fn.CallableRequest) -> dict[str, Any]:
     data = req.data or {}
     ticker = str(data.get("ticker") or "").upper().strip()
@@ -8255,7 +11169,7 @@ def get_ticker_x_trends(req: https_fn.CallableRequest) -> dict[str, Any]:
     }
 
 
-@https_fn.on_call(memory=MemoryOption.MB_512, timeout_sec=180)
+@_callable(profile="standard", timeout_sec=180, features=("market_data",))
 def get_corporate_events_calendar(req: https_fn.CallableRequest) -> dict[str, Any]:
     data = req.data or {}
     ticker = _normalize_symbol_token(data.get("ticker"))
@@ -8314,17 +11228,7 @@ def get_corporate_events_calendar(req: https_fn.CallableRequest) -> dict[str, An
 
     if not events:
         source = "yahoo_finance"
-        for symbol in tickers[:30]:
-            try:
-                events.extend(
-                    _fetch_yahoo_corporate_events_for_ticker(
-                        symbol,
-                        start_date=start_date,
-                        end_date=end_date,
-                    )
-                )
-            except Exception:
-                continue
+        events = _fetch_yahoo_corporate_events_cached(tickers[:30], start_date=start_date, end_date=end_date)
 
     dedup: dict[str, dict[str, Any]] = {}
     for row in events:
@@ -8353,9 +11257,9 @@ def get_corporate_events_calendar(req: https_fn.CallableRequest) -> dict[str, An
     }
 
 
-@https_fn.on_call(memory=MemoryOption.MB_512, timeout_sec=75)
+@_callable(profile="standard", timeout_sec=75, features=("market_data", "remote_config"))
 def query_ticker_insight(req: https_fn.CallableRequest) -> dict[str, Any]:
-    import yfinance as yf  # type: ignore
+    yf = _yfinance()
 
     data = req.data or {}
     meta = data.get("meta") if isinstance(data.get("meta"), dict) else {}
@@ -8526,7 +11430,7 @@ def query_ticker_insight(req: https_fn.CallableRequest) -> dict[str, Any]:
             "tools": [{"type": "web_search_preview"}],
         }
         try:
-            response = requests.post(
+            response = _http_post(
                 "https://api.openai.com/v1/responses",
                 headers={"Authorization": f"Bearer {OPENAI_API_KEY}", "Content-Type": "application/json"},
                 json=payload,
@@ -8611,29 +11515,48 @@ def query_ticker_insight(req: https_fn.CallableRequest) -> dict[str, Any]:
     }
 
 
-@https_fn.on_call()
-def get_market_headlines_feed(req: https_fn.CallableRequest) -> dict[str, Any]:
-    data = req.data or {}
-    country_code = _normalize_country_code(data.get("country"))
-    limit = max(5, min(int(data.get("limit") or 14), 40))
-
-    country_query = {
-        "US": "US stock market top headlines today",
-        "CA": "Canada stock market top headlines today",
-        "GB": "UK stock market top headlines today",
-        "DE": "Germany stock market top headlines today",
-        "FR": "France stock market top headlines today",
-        "JP": "Japan stock market top headlines today",
-        "CN": "China stock market top headlines today",
-        "IN": "India stock market top headlines today",
-        "AU": "Australia stock market top headlines today",
-        "BR": "Brazil stock market top headlines today",
-    }.get(country_code, f"{country_code} stock market top headlines today")
+MARKET_HEADLINES_MAX_LIMIT = 40
+MARKET_HEADLINES_COUNTRY_QUERIES = {
+    "US": "US stock market top headlines today",
+    "CA": "Canada stock market top headlines today",
+    "GB": "UK stock market top headlines today",
+    "DE": "Germany stock market top headlines today",
+    "FR": "France stock market top headlines today",
+    "JP": "Japan stock market top headlines today",
+    "CN": "China stock market top headlines today",
+    "IN": "India stock market top headlines today",
+    "AU": "Australia stock market top headlines today",
+    "BR": "Brazil stock market top headlines today",
+}
+_MARKET_HEADLINES_CACHE: dict[str, dict[str, Any]] = {}
+_MARKET_HEADLINES_CACHE_LOCK = threading.Lock()
+
+
+def _build_market_headlines_feed(country_code: str, previous: dict[str, Any] | None = None) -> dict[str, Any]:
+    """Scrapes headlines and social posts for one market at the maximum headline limit.
+
+    When `previous` is a feed whose social posts are still within the cache TTL, those posts
+    are carried over and only the headlines are scraped again.
+    """
+    country_query = MARKET_HEADLINES_COUNTRY_QUERIES.get(country_code, f"{country_code} stock market top headlines today")
+    limit = MARKET_HEADLINES_MAX_LIMIT
 
     headlines = _fetch_yahoo_news_query(country_query, limit=limit)
     if not headlines:
         headlines = _fetch_yahoo_news_query("stock market top headlines today", limit=limit)
 
+    social_cached_at = float((previous or {}).get("socialCachedAt") or 0.0)
+    if previous and (time.time() - social_cached_at) < MARKET_HEADLINES_CACHE_TTL_SECONDS:
+        return {
+            "country": country_code,
+            "query": country_query,
+            "headlines": _serialize_for_firestore(headlines[:limit]),
+            "social": dict(previous.get("social") or {}),
+            "warnings": list(previous.get("warnings") or []),
+            "socialCachedAt": social_cached_at,
+            "cachedAt": datetime.now(timezone.utc).isoformat(),
+        }
+
     warnings: list[str] = []
     x_posts, x_warning = _fetch_x_social_posts(country_query, limit=8)
     if x_warning:
@@ -8667,13 +11590,99 @@ def get_market_headlines_feed(req: https_fn.CallableRequest) -> dict[str, Any]:
             "instagram": _serialize_for_firestore(instagram_posts),
         },
         "warnings": warnings,
+        "socialCachedAt": time.time(),
+        "cachedAt": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def _store_market_headlines_feed(country_code: str, feed: dict[str, Any]) -> None:
+    now = time.time()
+    with _MARKET_HEADLINES_CACHE_LOCK:
+        _MARKET_HEADLINES_CACHE[country_code] = {"feed": feed, "loadedAt": now}
+    try:
+        db.collection("market_headlines_cache").document(country_code).set(
+            {"feed": feed, "cachedAtEpoch": now, "updatedAt": firestore.SERVER_TIMESTAMP}
+        )
+    except Exception:
+        # The instance cache still serves this market even if the shared doc write fails.
+        pass
+
+
+def _get_market_headlines_feed_cached(country_code: str) -> dict[str, Any]:
+    """Returns the market feed from instance memory, then the shared Firestore cache, then a live scrape."""
+    now = time.time()
+    with _MARKET_HEADLINES_CACHE_LOCK:
+        cached = _MARKET_HEADLINES_CACHE.get(country_code)
+    if cached and (now - float(cached.get("loadedAt") or 0.0)) < MARKET_HEADLINES_CACHE_TTL_SECONDS:
+        _record_cache("market_headlines", True)
+        return cached["feed"]
+    _record_cache("market_headlines", False)
+
+    try:
+        snap = db.collection("market_headlines_cache").document(country_code).get()
+        if snap.exists:
+            data = snap.to_dict() or {}
+            cached_at = float(data.get("cachedAtEpoch") or 0.0)
+            feed = data.get("feed")
+            if isinstance(feed, dict) and (now - cached_at) < MARKET_HEADLINES_CACHE_TTL_SECONDS:
+                with _MARKET_HEADLINES_CACHE_LOCK:
+                    _MARKET_HEADLINES_CACHE[country_code] = {"feed": feed, "loadedAt": cached_at}
+                return feed
+    except Exception:
+        pass
+
+    feed = _build_market_headlines_feed(country_code)
+    _store_market_headlines_feed(country_code, feed)
+    return feed
+
+
+@_callable(features=("social",))
+def get_market_headlines_feed(req: https_fn.CallableRequest) -> dict[str, Any]:
+    data = req.data or {}
+    country_code = _normalize_country_code(data.get("country"))
+    limit = max(5, min(int(data.get("limit") or 14), MARKET_HEADLINES_MAX_LIMIT))
+
+    feed = _get_market_headlines_feed_cached(country_code)
+    return {
+        **feed,
+        "headlines": list(feed.get("headlines") or [])[:limit],
+        "social": dict(feed.get("social") or {}),
+        "warnings": list(feed.get("warnings") or []),
     }
 
 
-@https_fn.on_call(memory=MemoryOption.MB_512, timeout_sec=90)
+def _prewarm_market_headlines_feed(country_code: str) -> None:
+    previous = None
+    try:
+        snap = db.collection("market_headlines_cache").document(country_code).get()
+        if snap.exists:
+            previous = (snap.to_dict() or {}).get("feed")
+    except Exception:
+        pass
+    try:
+        feed = _build_market_headlines_feed(country_code, previous if isinstance(previous, dict) else None)
+        _store_market_headlines_feed(country_code, feed)
+    except Exception as exc:
+        print(f"Warning: unable to prewarm market headlines for {country_code}: {exc}")
+
+
+@scheduler_fn.on_schedule(
+    schedule="*/10 * * * *",
+    timezone=scheduler_fn.Timezone(SOCIAL_AUTOMATION_TIMEZONE),
+    timeout_sec=300,
+    memory=MemoryOption.MB_512,
+)
+@_with_teardown
+def market_headlines_prewarm_scheduler(event: scheduler_fn.ScheduledEvent) -> None:
+    del event
+    with ThreadPoolExecutor(max_workers=MARKET_HEADLINES_PREWARM_WORKERS) as pool:
+        list(pool.map(_in_trace_context(_prewarm_market_headlines_feed), MARKET_HEADLINES_PREWARM_COUNTRIES))
+
+
+@_callable(profile="standard", timeout_sec=90, features=("market_data",))
 def get_options_chain(req: https_fn.CallableRequest) -> dict[str, Any]:
     import pandas as pd  # type: ignore
-    import yfinance as yf  # type: ignore
+    yf = _yfinance()
 
     _require_auth(req)
     data = req.data or {}
@@ -8696,12 +11705,13 @@ def get_options_chain(req: https_fn.CallableRequest) -> dict[str, Any]:
 
     selected = expiration if expiration in expirations else expirations[0]
 
-    underlying_price = None
-    try:
-        fast_info = getattr(ticker_obj, "fast_info", None) or {}
-        underlying_price = _safe_float(fast_info.get("last_price") or fast_info.get("lastPrice"))
-    except Exception:
-        underlying_price = None
+    underlying_price = _safe_float((_get_quotes([ticker]).get(ticker) or {}).get("price"))
+    if underlying_price is None:
+        try:
+            fast_info = getattr(ticker_obj, "fast_info", None) or {}
+            underlying_price = _safe_float(fast_info.get("last_price") or fast_info.get("lastPrice"))
+        except Exception:
+            underlying_price = None
     if underlying_price is None:
         try:
             hist = ticker_obj.history(period="5d", interval="1d")
@@ -8833,10 +11843,10 @@ def get_options_chain(req: https_fn.CallableRequest) -> dict[str, Any]:
     }
 
 
-@https_fn.on_call(memory=MemoryOption.MB_512, timeout_sec=60)
+@_callable(profile="standard", timeout_sec=60, features=("technicals",))
 def get_technicals(req: https_fn.CallableRequest) -> dict[str, Any]:
     import pandas as pd  # type: ignore
-    import yfinance as yf  # type: ignore
+    yf = _yfinance()
     from finta import TA  # type: ignore
 
     data = req.data or {}
@@ -8940,7 +11950,7 @@ def get_technicals(req: https_fn.CallableRequest) -> dict[str, Any]:
     return out
 
 
-@https_fn.on_call()
+@_callable()
 def queue_screener_run(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     data = req.data or {}
@@ -8964,12 +11974,12 @@ def queue_screener_run(req: https_fn.CallableRequest) -> dict[str, Any]:
     return {"runId": doc_ref.id}
 
 
-@https_fn.on_call(memory=MemoryOption.GB_1, timeout_sec=180)
+@_callable(profile="data", features=("market_data", "remote_config"))
 def run_quick_screener(req: https_fn.CallableRequest) -> dict[str, Any]:
     try:
         import numpy as np  # type: ignore
         import pandas as pd  # type: ignore
-        import yfinance as yf  # type: ignore
+        yf = _yfinance()
     except Exception as exc:
         _raise_structured_error(
             https_fn.FunctionsErrorCode.FAILED_PRECONDITION,
@@ -9107,7 +12117,7 @@ def run_quick_screener(req: https_fn.CallableRequest) -> dict[str, Any]:
     trending: list[str] = []
     if universe_key == "trending" or universe_key not in universe_map:
         try:
-            response = requests.get(TRENDING_URL, headers=_yahoo_headers(), timeout=10)
+            response = _http_get(TRENDING_URL, headers=_yahoo_headers(), timeout=10)
             response.raise_for_status()
             payload = response.json()
             quotes = payload.get("finance", {}).get("result", [{}])[0].get("quotes", [])
@@ -10196,7 +13206,7 @@ def run_quick_screener(req: https_fn.CallableRequest) -> dict[str, Any]:
     }
 
 
-@https_fn.on_call()
+@_callable()
 def submit_feature_vote(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     data = req.data or {}
@@ -10300,7 +13310,7 @@ def submit_feature_vote(req: https_fn.CallableRequest) -> dict[str, Any]:
     }
 
 
-@https_fn.on_call()
+@_callable()
 def get_feature_vote_summary(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     _require_admin(token)
@@ -10363,7 +13373,7 @@ def get_feature_vote_summary(req: https_fn.CallableRequest) -> dict[str, Any]:
     }
 
 
-@https_fn.on_call()
+@_callable()
 def queue_autopilot_run(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     _require_admin(token)
@@ -10388,7 +13398,7 @@ def queue_autopilot_run(req: https_fn.CallableRequest) -> dict[str, Any]:
     return {"requestId": doc_ref.id}
 
 
-@https_fn.on_call()
+@_callable()
 def delete_autopilot_request(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     _require_admin(token)
@@ -10407,7 +13417,7 @@ def delete_autopilot_request(req: https_fn.CallableRequest) -> dict[str, Any]:
     return {"deleted": True, "requestId": request_id}
 
 
-@https_fn.on_call()
+@_callable()
 def submit_feedback(req: https_fn.CallableRequest) -> dict[str, Any]:
     data = req.data or {}
     message = str(data.get("message") or "").strip()
@@ -10444,7 +13454,7 @@ def submit_feedback(req: https_fn.CallableRequest) -> dict[str, Any]:
     return {"feedbackId": doc_ref.id}
 
 
-@https_fn.on_call()
+@_callable()
 def generate_social_campaign_drafts(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     data = req.data or {}
@@ -10525,7 +13535,7 @@ def generate_social_campaign_drafts(req: https_fn.CallableRequest) -> dict[str,
     }
 
 
-@https_fn.on_call()
+@_callable()
 def queue_social_campaign_posts(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     data = req.data or {}
@@ -10608,7 +13618,7 @@ def queue_social_campaign_posts(req: https_fn.CallableRequest) -> dict[str, Any]
     }
 
 
-@https_fn.on_call()
+@_callable()
 def list_social_campaigns(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     limit = max(1, min(int((req.data or {}).get("limit") or 40), 100))
@@ -10625,7 +13635,7 @@ def list_social_campaigns(req: https_fn.CallableRequest) -> dict[str, Any]:
     return {"campaigns": _serialize_for_firestore(items)}
 
 
-@https_fn.on_call()
+@_callable()
 def list_social_queue(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     data = req.data or {}
@@ -10646,7 +13656,7 @@ def list_social_queue(req: https_fn.CallableRequest) -> dict[str, Any]:
     return {"queue": _serialize_for_firestore(items)}
 
 
-@https_fn.on_call()
+@_callable(features=("social",))
 def publish_social_queue_now(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     _require_admin(token)
@@ -10663,6 +13673,7 @@ def publish_social_queue_now(req: https_fn.CallableRequest) -> dict[str, Any]:
     schedule="0 * * * *",
     timezone=scheduler_fn.Timezone(SOCIAL_AUTOMATION_TIMEZONE),
 )
+@_with_teardown
 def social_dispatch_scheduler(event: scheduler_fn.ScheduledEvent) -> None:
     del event
     if not SOCIAL_AUTOMATION_ENABLED:
@@ -10748,7 +13759,7 @@ def _run_social_autopilot_plan(trigger: str, actor_uid: str = "") -> dict[str, A
     }
 
 
-@https_fn.on_call()
+@_callable()
 def schedule_social_autopilot_now(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     _require_admin(token)
@@ -10761,12 +13772,13 @@ def schedule_social_autopilot_now(req: https_fn.CallableRequest) -> dict[str, An
     schedule="15 7 * * *",
     timezone=scheduler_fn.Timezone(SOCIAL_AUTOMATION_TIMEZONE),
 )
+@_with_teardown
 def social_daily_planner_scheduler(event: scheduler_fn.ScheduledEvent) -> None:
     del event
     _run_social_autopilot_plan(trigger="scheduler")
 
 
-@https_fn.on_call()
+@_callable()
 def alpaca_get_options(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     _require_admin(token)
@@ -10782,7 +13794,7 @@ def alpaca_get_options(req: https_fn.CallableRequest) -> dict[str, Any]:
         params = {"underlying_symbols": ticker, "limit": 30}
         if expiration:
             params["expiration_date"] = expiration
-        response = requests.get(
+        response = _http_get(
             f"{ALPACA_DATA_BASE}/v1beta1/options/contracts",
             headers=headers,
             params=params,
@@ -10843,7 +13855,7 @@ def alpaca_get_options(req: https_fn.CallableRequest) -> dict[str, Any]:
     return {"options": options}
 
 
-@https_fn.on_call()
+@_callable()
 def alpaca_place_order(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     _require_admin(token)
@@ -10865,7 +13877,7 @@ def alpaca_place_order(req: https_fn.CallableRequest) -> dict[str, Any]:
     if order_payload["type"] == "limit" and limit_price:
         order_payload["limit_price"] = limit_price
 
-    response = requests.post(
+    response = _http_post(
         f"{ALPACA_API_BASE}/v2/orders",
         headers=_alpaca_headers(),
         json=order_payload,
@@ -10906,11 +13918,11 @@ def alpaca_place_order(req: https_fn.CallableRequest) -> dict[str, Any]:
     return {"orderId": doc_ref.id, "alpacaId": order_data.get("id")}
 
 
-@https_fn.on_call()
+@_callable()
 def alpaca_get_account(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     _require_admin(token)
-    response = requests.get(f"{ALPACA_API_BASE}/v2/account", headers=_alpaca_headers(), timeout=12)
+    response = _http_get(f"{ALPACA_API_BASE}/v2/account", headers=_alpaca_headers(), timeout=12)
     if response.status_code >= 400:
         raise https_fn.HttpsError(https_fn.FunctionsErrorCode.FAILED_PRECONDITION, response.text)
     account = response.json()
@@ -10928,11 +13940,11 @@ def alpaca_get_account(req: https_fn.CallableRequest) -> dict[str, Any]:
     }
 
 
-@https_fn.on_call()
+@_callable()
 def alpaca_get_positions(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     _require_admin(token)
-    response = requests.get(f"{ALPACA_API_BASE}/v2/positions", headers=_alpaca_headers(), timeout=12)
+    response = _http_get(f"{ALPACA_API_BASE}/v2/positions", headers=_alpaca_headers(), timeout=12)
     if response.status_code >= 400:
         raise https_fn.HttpsError(https_fn.FunctionsErrorCode.FAILED_PRECONDITION, response.text)
     positions = response.json()
@@ -10951,7 +13963,7 @@ def alpaca_get_positions(req: https_fn.CallableRequest) -> dict[str, Any]:
     return {"positions": clean_positions}
 
 
-@https_fn.on_call()
+@_callable()
 def alpaca_list_orders(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     _require_admin(token)
@@ -10960,7 +13972,7 @@ def alpaca_list_orders(req: https_fn.CallableRequest) -> dict[str, Any]:
     limit = int(data.get("limit") or 50)
     params = {"status": status, "limit": max(1, min(limit, 100)), "direction": "desc"}
 
-    response = requests.get(f"{ALPACA_API_BASE}/v2/orders", headers=_alpaca_headers(), params=params, timeout=12)
+    response = _http_get(f"{ALPACA_API_BASE}/v2/orders", headers=_alpaca_headers(), params=params, timeout=12)
     if response.status_code >= 400:
         raise https_fn.HttpsError(https_fn.FunctionsErrorCode.FAILED_PRECONDITION, response.text)
 
@@ -10982,7 +13994,7 @@ def alpaca_list_orders(req: https_fn.CallableRequest) -> dict[str, Any]:
     return {"orders": clean_orders}
 
 
-@https_fn.on_call()
+@_callable()
 def alpaca_cancel_order(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     _require_admin(token)
@@ -10991,7 +14003,7 @@ def alpaca_cancel_order(req: https_fn.CallableRequest) -> dict[str, Any]:
     if not order_id:
         raise https_fn.HttpsError(https_fn.FunctionsErrorCode.INVALID_ARGUMENT, "orderId is required.")
 
-    response = requests.delete(f"{ALPACA_API_BASE}/v2/orders/{order_id}", headers=_alpaca_headers(), timeout=12)
+    response = _http_delete(f"{ALPACA_API_BASE}/v2/orders/{order_id}", headers=_alpaca_headers(), timeout=12)
     if response.status_code >= 400:
         raise https_fn.HttpsError(https_fn.FunctionsErrorCode.FAILED_PRECONDITION, response.text)
 
@@ -10999,7 +14011,7 @@ def alpaca_cancel_order(req: https_fn.CallableRequest) -> dict[str, Any]:
     return {"cancelled": True, "orderId": order_id}
 
 
-@https_fn.on_call()
+@_callable()
 def send_slack_test_message(req: https_fn.CallableRequest) -> dict[str, Any]:
     token = _require_auth(req)
     _require_admin(token)
@@ -11013,7 +14025,7 @@ def send_slack_test_message(req: https_fn.CallableRequest) -> dict[str, Any]:
     data = req.data or {}
     text = str(data.get("text") or "Quantura Slack webhook test from Firebase function.")
     payload = {"text": text}
-    response = requests.post(SLACK_WEBHOOK_URL, json=payload, timeout=10)
+    response = _http_post(SLACK_WEBHOOK_URL, json=payload, timeout=10)
     if response.status_code >= 400:
         raise https_fn.HttpsError(
             https_fn.FunctionsErrorCode.INTERNAL,
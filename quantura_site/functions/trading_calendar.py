@@ -0,0 +1,149 @@
+"""NYSE trading calendar.
+
+Sessions are weekdays minus exchange holidays. The holiday list is generated once per
+process from the NYSE rules for FIRST_YEAR..LAST_YEAR (plus the one-off closures below)
+and wrapped in a numpy busdaycalendar, so every function here takes a scalar or an array
+of dates (anything numpy converts to datetime64[D]: ISO strings, date, datetime64) and
+answers for the whole array in one call. Outside the covered years only weekends are
+treated as closed.
+
+    is_session(["2024-07-04", "2024-07-05"])     # [False, True]
+    add_sessions("2024-12-24", [1, 5])           # ["2024-12-26", "2025-01-02"]
+    next_sessions("2024-11-27", 3)               # ["2024-11-29", "2024-12-02", "2024-12-03"]
+"""
+
+from __future__ import annotations
+
+import functools
+from datetime import date, datetime, timedelta
+from typing import Any
+
+import numpy as np
+
+FIRST_YEAR = 1990
+LAST_YEAR = 2040
+
+# Unscheduled full-day closures (state funerals, 9/11, Hurricane Sandy).
+SPECIAL_CLOSURES = (
+    "1994-04-27",
+    "2001-09-11",
+    "2001-09-12",
+    "2001-09-13",
+    "2001-09-14",
+    "2004-06-11",
+    "2007-01-02",
+    "2012-10-29",
+    "2012-10-30",
+    "2018-12-05",
+    "2025-01-09",
+)
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """n-th `weekday` (Mon=0) of the month; n=-1 is the last one."""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _observed(day: date) -> date:
+    """Saturday holidays close the Friday before, Sunday holidays the Monday after."""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+def _easter(year: int) -> date:
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 19 * l) // 433
+    month = (h + l - 7 * m + 90) // 25
+    return date(year, month, (h + l - 7 * m + 33 * month + 19) % 32)
+
+
+def _year_holidays(year: int) -> list[date]:
+    new_year = date(year, 1, 1)
+    days = [
+        # New Year's Day on a Saturday is not made up on the preceding Friday.
+        new_year + timedelta(days=1) if new_year.weekday() == 6 else new_year,
+        _nth_weekday(year, 2, 0, 3),
+        _easter(year) - timedelta(days=2),
+        _nth_weekday(year, 5, 0, -1),
+        _observed(date(year, 7, 4)),
+        _nth_weekday(year, 9, 0, 1),
+        _nth_weekday(year, 11, 3, 4),
+        _observed(date(year, 12, 25)),
+    ]
+    if year >= 1998:
+        days.append(_nth_weekday(year, 1, 0, 3))
+    if year >= 2022:
+        days.append(_observed(date(year, 6, 19)))
+    return [day for day in days if day.weekday() < 5]
+
+
+@functools.lru_cache(maxsize=1)
+def holidays() -> np.ndarray:
+    """Sorted datetime64[D] array of weekday closures for FIRST_YEAR..LAST_YEAR."""
+    days = [day for year in range(FIRST_YEAR, LAST_YEAR + 1) for day in _year_holidays(year)]
+    days.extend(date.fromisoformat(day) for day in SPECIAL_CLOSURES)
+    return np.unique(np.array(days, dtype="datetime64[D]"))
+
+
+@functools.lru_cache(maxsize=1)
+def _calendar() -> np.busdaycalendar:
+    return np.busdaycalendar(weekmask="1111100", holidays=holidays())
+
+
+@functools.lru_cache(maxsize=1)
+def session_array() -> np.ndarray:
+    """Every session from FIRST_YEAR through LAST_YEAR as a sorted datetime64[D] array."""
+    days = np.arange(f"{FIRST_YEAR}-01-01", f"{LAST_YEAR + 1}-01-01", dtype="datetime64[D]")
+    return days[np.is_busday(days, busdaycal=_calendar())]
+
+
+def _as_days(dates: Any) -> np.ndarray:
+    values = np.asarray(dates)
+    if values.dtype.kind == "M":
+        return values.astype("datetime64[D]")
+    if values.dtype == object:
+        # Aware datetimes/Timestamps keep their local calendar date instead of converting to UTC.
+        days = [value.date() if isinstance(value, datetime) else value for value in values.ravel()]
+        return np.array(days, dtype="datetime64[D]").reshape(values.shape)
+    return values.astype("datetime64[D]")
+
+
+def is_session(dates: Any) -> np.ndarray:
+    """True where the date is an NYSE trading day."""
+    return np.is_busday(_as_days(dates), busdaycal=_calendar())
+
+
+def add_sessions(dates: Any, offsets: Any) -> np.ndarray:
+    """The `offsets`-th session after each date (before it for negative offsets).
+
+    A date that is not a session counts from the session before it when moving forward and
+    from the session after it when moving back, so add_sessions(saturday, 1) is the Monday.
+    An offset of 0 rolls a non-session date forward to the next session.
+    """
+    days = _as_days(dates)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    forward = np.busday_offset(days, offsets, roll="backward", busdaycal=_calendar())
+    backward = np.busday_offset(days, offsets, roll="forward", busdaycal=_calendar())
+    return np.where(offsets > 0, forward, backward)
+
+
+def next_sessions(after: Any, count: int) -> np.ndarray:
+    """The `count` sessions strictly after a single date."""
+    return add_sessions(_as_days(after), np.arange(1, max(0, int(count)) + 1))
+
+
+def count_sessions(start: Any, end: Any) -> np.ndarray:
+    """Number of sessions in [start, end), element-wise."""
+    return np.busday_count(_as_days(start), _as_days(end), busdaycal=_calendar())
@@ -1277,6 +1277,8 @@
     aiDefaultsSeededWorkspaceId: "",
     recentWatchlistItems: [],
     volatilityMonitorTimer: null,
+    alertItems: [],
+    alertScans: { workspaceId: null, byUser: {} },
     clients: {
       auth: null,
       db: null,
@@ -1301,6 +1303,7 @@
 	    unsubscribeTasks: null,
 	    unsubscribeWatchlist: null,
 	    unsubscribeAlerts: null,
+	    unsubscribeAlertScans: null,
 	    unsubscribeScreenerRuns: null,
       unsubscribeAIAgents: null,
       unsubscribeAIFollows: null,
@@ -4371,8 +4374,14 @@
         const active = Boolean(item.active);
         const status = String(item.status || (active ? "active" : "disabled"));
 	        const createdBy = escapeHtml(item.createdByEmail || item.createdBy?.email || "");
-	        const lastPrice = typeof item.lastPrice === "number" ? `$${item.lastPrice.toFixed(2)}` : "";
-	        const lastChecked = item.lastCheckedAt ? `Checked ${formatTimestamp(item.lastCheckedAt)}` : "";
+	        // Untriggered alerts are no longer stamped per scan; fall back to the scan marker that
+	        // check_price_alerts and price_alert_scheduler store in users/{workspace}/alert_scans/{creator}.
+	        const scans = state.alertScans.workspaceId === workspaceId ? state.alertScans.byUser : {};
+	        const scan = scans[item.createdByUid] || null;
+	        const lastPriceValue = typeof item.lastPrice === "number" ? item.lastPrice : toFiniteOrNull(scan?.prices?.[ticker]);
+	        const lastCheckedValue = item.lastCheckedAt || (scan && active ? scan.lastCheckedAt : null);
+	        const lastPrice = lastPriceValue !== null ? `$${lastPriceValue.toFixed(2)}` : "";
+	        const lastChecked = lastCheckedValue ? `Checked ${formatTimestamp(lastCheckedValue)}` : "";
 	        const triggeredAt = item.triggeredAt ? `Triggered ${formatTimestamp(item.triggeredAt)}` : "";
 	        const metaParts = [createdBy ? `By ${createdBy}` : "", lastChecked, lastPrice, triggeredAt].filter(Boolean);
 	        const meta = metaParts.length ? `<div class="small muted">${metaParts.join(" · ")}</div>` : "";
@@ -4403,7 +4412,25 @@
 
 	  const startPriceAlerts = (db, workspaceId) => {
 	    if (state.unsubscribeAlerts) state.unsubscribeAlerts();
+	    if (state.unsubscribeAlertScans) state.unsubscribeAlertScans();
+	    state.alertScans = { workspaceId, byUser: {} };
+	    state.alertItems = [];
 	    if (!workspaceId || !ui.alertsList || !state.remoteFlags.watchlistEnabled) return;
+	    state.unsubscribeAlertScans = db
+	      .collection("users")
+	      .doc(workspaceId)
+	      .collection("alert_scans")
+	      .onSnapshot(
+	        (snapshot) => {
+	          const byUser = {};
+	          snapshot.docs.forEach((doc) => {
+	            byUser[doc.id] = doc.data() || {};
+	          });
+	          state.alertScans = { workspaceId, byUser };
+	          if (state.alertItems.length) renderAlerts(state.alertItems, workspaceId);
+	        },
+	        () => {}
+	      );
 	    ui.alertsList.innerHTML = `<div class="small muted">Loading alerts...</div>`;
 	    state.unsubscribeAlerts = db
 	      .collection("users")
@@ -4414,6 +4441,7 @@
 	      .onSnapshot(
 	        (snapshot) => {
 	          const items = snapshot.docs.map((doc) => ({ id: doc.id, ...doc.data() }));
+	          state.alertItems = items;
 	          renderAlerts(items, workspaceId);
 	        },
 	        () => {
@@ -4581,6 +4609,62 @@
     });
   };
 
+  const parseBacktestSweepGrid = (text) => {
+    const grid = {};
+    String(text || "")
+      .split(";")
+      .map((part) => part.trim())
+      .filter(Boolean)
+      .forEach((part) => {
+        const [rawKey, rawValues] = part.split("=");
+        const key = String(rawKey || "").trim();
+        const values = String(rawValues || "")
+          .split(",")
+          .map((value) => Number(value.trim()))
+          .filter((value) => Number.isFinite(value));
+        if (key && values.length) grid[key] = values;
+      });
+    return grid;
+  };
+
+  const renderBacktestSweep = (sweep) => {
+    const heatmap = sweep?.heatmap;
+    if (!heatmap || !Array.isArray(heatmap.rows) || !heatmap.x) return "";
+    const xValues = Array.isArray(heatmap.x.values) ? heatmap.x.values : [];
+    const best = sweep.best?.params || {};
+    const formatCell = (sharpe, ret) => {
+      if (typeof sharpe !== "number" && typeof ret !== "number") return "—";
+      const sharpeText = typeof sharpe === "number" ? sharpe.toFixed(2) : "—";
+      const retText = typeof ret === "number" ? `${ret.toFixed(1)}%` : "—";
+      return `${sharpeText}<br /><span class="small muted">${retText}</span>`;
+    };
+    const rows = heatmap.rows
+      .map((row) => {
+        const label = heatmap.y ? `${escapeHtml(heatmap.y.param)} ${escapeHtml(row.value)}` : "";
+        const cells = xValues
+          .map((xValue, index) => {
+            const isBest = best[heatmap.x.param] === xValue && (!heatmap.y || best[heatmap.y.param] === row.value);
+            const cell = formatCell(row.sharpe?.[index], row.returnPct?.[index]);
+            return `<td>${isBest ? `<strong>${cell}</strong>` : cell}</td>`;
+          })
+          .join("");
+        return `<tr><th>${label}</th>${cells}</tr>`;
+      })
+      .join("");
+    const header = xValues.map((value) => `<th>${escapeHtml(heatmap.x.param)} ${escapeHtml(value)}</th>`).join("");
+    return `
+      <details class="learn-more" open>
+        <summary>Parameter sweep · ${escapeHtml(sweep.evaluated || 0)} combinations (Sharpe / return)</summary>
+        <div class="table-wrap">
+          <table class="data-table">
+            <thead><tr><th></th>${header}</tr></thead>
+            <tbody>${rows}</tbody>
+          </table>
+        </div>
+      </details>
+    `;
+  };
+
   const renderBacktestDetails = async (doc, { imageUrl }) => {
     if (!ui.backtestOutput) return;
     const metrics = doc.metrics || {};
@@ -4621,6 +4705,7 @@
             ? `<div style="margin-top: 14px;"><img class="backtest-image" src="${escapeHtml(imageUrl)}" alt="Backtest equity curve" loading="lazy" /></div>`
             : `<div class="small muted" style="margin-top: 14px;">Chart unavailable.</div>`
         }
+        ${renderBacktestSweep(doc.sweep)}
         <div style="margin-top: 14px;">${renderBacktestSourceControls(doc.id, "python")}</div>
         ${codeMarkup}
       </div>
@@ -7034,11 +7119,6 @@
 
   const dateToYmd = (dt) => `${dt.getFullYear()}-${pad2(dt.getMonth() + 1)}-${pad2(dt.getDate())}`;
 
-  const isWeekday = (dt) => {
-    const day = dt.getDay();
-    return day >= 1 && day <= 5;
-  };
-
   const nearestWeekdayIndex = (rowsWithDate, fromIndex) => {
     if (!Array.isArray(rowsWithDate) || !rowsWithDate.length) return -1;
     const safeIndex = Math.max(0, Math.min(rowsWithDate.length - 1, fromIndex));
@@ -7052,43 +7132,6 @@
     return -1;
   };
 
-  const extractQuantileColumns = (headers) => {
-    if (!Array.isArray(headers)) return [];
-    const cols = [];
-    headers.forEach((header, idx) => {
-      const raw = String(header || "").trim();
-      const normalized = raw.toLowerCase().replace(/[^a-z0-9.]/g, "");
-      let q = null;
-
-      let match = normalized.match(/^(?:p|q)(\d{1,2})$/);
-      if (match) q = Number(match[1]) / 100;
-      if (q === null) {
-        match = normalized.match(/^(?:p|q)(0?\.\d+)$/);
-        if (match) q = Number(match[1]);
-      }
-      if (q === null) {
-        match = normalized.match(/^(?:quantile)?(0?\.\d+)$/);
-        if (match) q = Number(match[1]);
-      }
-      if (!Number.isFinite(q) || q <= 0 || q >= 1) return;
-
-      cols.push({
-        idx,
-        header: raw,
-        q,
-        label: `p${Math.round(q * 100)}`,
-      });
-    });
-
-    return cols.sort((a, b) => a.q - b.q);
-  };
-
-  const numericCell = (row, idx) => {
-    const raw = row?.[idx];
-    const num = Number(String(raw ?? "").trim());
-    return Number.isFinite(num) ? num : null;
-  };
-
   const shiftYmd = (ymd, deltaDays) => {
     const base = parseDateCell(ymd);
     if (!base) return ymd;
@@ -7138,10 +7181,9 @@
 
   const runPredictionsQuantileMapping = async (functions) => {
     if (!hasFullAccount()) throw new Error("Sign in to run the OpenAI CSV Agent.");
-    const table = state.predictionsContext.table;
     const uploadDoc = state.predictionsContext.uploadDoc;
     const uploadId = state.predictionsContext.uploadId;
-    if (!table || !Array.isArray(table.rows) || table.rows.length < 2) {
+    if (!uploadId) {
       throw new Error("Load an uploaded CSV first.");
     }
     if (!uploadDoc) {
@@ -7182,154 +7224,68 @@
       }
     }
 
-    const headers = table.headers || [];
-    const rows = table.rows || [];
-    const norm = (h) => String(h || "").toLowerCase().replace(/[^a-z0-9]/g, "");
-    const dateCandidates = new Set(["date", "ds", "datetime", "timestamp", "time"]);
-    const dateIndex = headers.findIndex((h) => dateCandidates.has(norm(h)));
-    if (dateIndex < 0) throw new Error("Could not find a date column in this CSV.");
-
-    const quantileCols = extractQuantileColumns(headers);
-    if (!quantileCols.length) throw new Error("No quantile columns were detected (expected names like p10/q50/p90).");
-
-    const quantilesForRow = (row) =>
-      quantileCols
-        .map((col) => ({ ...col, value: numericCell(row, col.idx) }))
-        .filter((item) => Number.isFinite(item.value));
-
-    const rowsWithDate = rows.map((row, idx) => {
-      const dt = parseDateCell(row?.[dateIndex]);
-      return {
-        idx,
-        row,
-        date: dt,
-        ymd: dt ? dateToYmd(dt) : "",
-        isWeekday: dt ? isWeekday(dt) : false,
-      };
-    });
-    if (!rowsWithDate[0]?.date || !rowsWithDate[rowsWithDate.length - 1]?.date) {
-      throw new Error("First/last prediction rows are missing valid dates.");
-    }
-
-    const firstRaw = rowsWithDate[0];
-    const lastRaw = rowsWithDate[rowsWithDate.length - 1];
-    const weekdayRows = rowsWithDate.filter((item) => item.isWeekday);
-    const firstUse =
-      weekdayRows.find((item) => quantilesForRow(item.row).length > 0) ||
-      rowsWithDate.find((item) => quantilesForRow(item.row).length > 0) ||
-      rowsWithDate[0];
-    const lastUse =
-      [...weekdayRows].reverse().find((item) => quantilesForRow(item.row).length > 0) ||
-      [...rowsWithDate].reverse().find((item) => quantilesForRow(item.row).length > 0) ||
-      rowsWithDate[rowsWithDate.length - 1];
-
-    const startQuantiles = quantilesForRow(firstUse.row);
-    if (!startQuantiles.length) throw new Error("Could not find numeric quantile values on the first weekday row.");
+    // The backend parses the CSV from Storage (once per file version); the browser only looks up
+    // the reference high for the first weekday the backend reports.
+    const runAgent = functions.httpsCallable("run_prediction_upload_agent");
+    const prepared = await runAgent({ uploadId, ticker, summaryOnly: true, meta: buildMeta() });
+    const preparedSummary = prepared?.data?.summary || {};
+    if (!preparedSummary.firstWeekdayDate) throw new Error("Upload summary is unavailable.");
 
     let highLookup = null;
     let highLookupError = "";
-    let highValue = NaN;
     try {
-      highLookup = await fetchTickerHighNearDate(functions, ticker, firstUse.ymd);
-      highValue = Number(highLookup.high);
+      highLookup = await fetchTickerHighNearDate(functions, ticker, preparedSummary.firstWeekdayDate);
+      if (!Number.isFinite(Number(highLookup.high))) highLookup = null;
     } catch (error) {
       highLookupError = String(error?.message || "Unable to fetch the reference High value.");
     }
 
-    let selected = startQuantiles.reduce((best, item) =>
-      Math.abs(item.q - 0.5) < Math.abs(best.q - 0.5) ? item : best
-    , startQuantiles[0]);
-    if (Number.isFinite(highValue)) {
-      selected = startQuantiles[0];
-      for (const candidate of startQuantiles) {
-        if (highValue >= candidate.value) selected = candidate;
-      }
-    }
-
-    const pointForecastValue = numericCell(lastUse.row, selected.idx);
-    let resolvedPointForecast = pointForecastValue;
-    if (!Number.isFinite(resolvedPointForecast)) {
-      const lastQuantiles = quantilesForRow(lastUse.row);
-      if (lastQuantiles.length) {
-        const nearest = lastQuantiles.reduce((best, item) =>
-          Math.abs(item.q - selected.q) < Math.abs(best.q - selected.q) ? item : best
-        , lastQuantiles[0]);
-        resolvedPointForecast = nearest.value;
-      }
-    }
-    if (!Number.isFinite(resolvedPointForecast)) {
-      throw new Error(`Last usable row is missing numeric quantile values.`);
-    }
-
-    const firstRowText = firstRaw.row.map((value) => String(value ?? "")).join(" | ");
-    const lastRowText = lastRaw.row.map((value) => String(value ?? "")).join(" | ");
-    const warningBits = [];
-    if (!firstRaw.isWeekday) warningBits.push(`First row (${firstRaw.ymd}) is not a weekday; using ${firstUse.ymd}.`);
-    if (!lastRaw.isWeekday) warningBits.push(`Last row (${lastRaw.ymd}) is not a weekday; using ${lastUse.ymd}.`);
-
-    if (highLookupError) warningBits.push(highLookupError);
-    const relation = Number.isFinite(highValue)
-      ? (highValue > selected.value
-          ? `High ${highValue.toFixed(2)} is above ${selected.label.toUpperCase()} start value ${selected.value.toFixed(2)}.`
-          : highValue < selected.value
-            ? `High ${highValue.toFixed(2)} is below ${selected.label.toUpperCase()} start value ${selected.value.toFixed(2)}.`
-            : `High ${highValue.toFixed(2)} is equal to ${selected.label.toUpperCase()} start value ${selected.value.toFixed(2)}.`)
-      : `Reference high was unavailable, so ${selected.label.toUpperCase()} was selected from the first usable row.`;
-
-    const mappingResult = {
-      uploadId: uploadId || "",
-      uploadTitle: String(uploadDoc.title || "predictions.csv"),
+    const agentRes = await runAgent({
+      uploadId,
       ticker,
-      firstRowDate: firstRaw.ymd,
-      firstRowIsWeekday: firstRaw.isWeekday,
-      firstWeekdayDate: firstUse.ymd,
-      lastRowDate: lastRaw.ymd,
-      lastRowIsWeekday: lastRaw.isWeekday,
-      lastWeekdayDate: lastUse.ymd,
-      warningText: warningBits.join(" "),
-      referenceHigh: Number.isFinite(highValue) ? Number(highValue.toFixed(4)) : null,
+      referenceHigh: highLookup ? Number(highLookup.high) : null,
       referenceHighDate: highLookup?.ymd || "",
-      selectedQuantile: selected.label,
-      selectedQuantileLabel: selected.label.toUpperCase(),
-      selectedQuantileStartValue: Number(selected.value.toFixed(4)),
-      pointForecastValue: Number(resolvedPointForecast.toFixed(4)),
-      relation,
-      firstRowText,
-      lastRowText,
-    };
+      meta: buildMeta(),
+    });
+    const agent = agentRes?.data || {};
+    const summary = agent.summary || preparedSummary;
+    const warningText = [summary.warningText, highLookupError].filter(Boolean).join(" ");
+    const pointForecast = Number(summary.pointForecastValue);
 
     if (ui.predictionsAgentOutput) {
       ui.predictionsAgentOutput.innerHTML = `
         <div class="small"><strong>Ticker:</strong> ${escapeHtml(ticker)}</div>
         <div class="small"><strong>Upload:</strong> ${escapeHtml(uploadDoc.title || uploadId || "predictions.csv")}</div>
-        <div class="small"><strong>First row date:</strong> ${escapeHtml(firstRaw.ymd)} (${firstRaw.isWeekday ? "weekday" : "weekend"})</div>
-        <div class="small"><strong>Last row date:</strong> ${escapeHtml(lastRaw.ymd)} (${lastRaw.isWeekday ? "weekday" : "weekend"})</div>
-        ${warningBits.length ? `<div class="small" style="margin-top:8px;"><strong>Warning:</strong> ${escapeHtml(warningBits.join(" "))}</div>` : ""}
+        <div class="small"><strong>First row date:</strong> ${escapeHtml(summary.firstRowDate || "")} (${summary.firstRowIsWeekday ? "weekday" : "weekend"})</div>
+        <div class="small"><strong>Last row date:</strong> ${escapeHtml(summary.lastRowDate || "")} (${summary.lastRowIsWeekday ? "weekday" : "weekend"})</div>
+        ${warningText ? `<div class="small" style="margin-top:8px;"><strong>Warning:</strong> ${escapeHtml(warningText)}</div>` : ""}
         ${
-          Number.isFinite(highValue) && highLookup
-            ? `<div class="small" style="margin-top:8px;"><strong>Reference high:</strong> ${highLookup.high.toFixed(2)} on ${escapeHtml(highLookup.ymd)}${
+          highLookup
+            ? `<div class="small" style="margin-top:8px;"><strong>Reference high:</strong> ${Number(highLookup.high).toFixed(2)} on ${escapeHtml(highLookup.ymd)}${
                 highLookup.exact ? "" : " (nearest trading day)"
               }</div>`
             : `<div class="small" style="margin-top:8px;"><strong>Reference high:</strong> unavailable</div>`
         }
-        <div class="small" style="margin-top:8px;"><strong>Selected quantile:</strong> ${escapeHtml(selected.label.toUpperCase())}</div>
-        <div class="small">${escapeHtml(relation)}</div>
-        <div class="small" style="margin-top:8px;"><strong>Point forecast (last weekday, same quantile):</strong> ${resolvedPointForecast.toFixed(4)}</div>
+        <div class="small" style="margin-top:8px;"><strong>Selected quantile:</strong> ${escapeHtml(summary.selectedQuantileLabel || "")}</div>
+        <div class="small">${escapeHtml(summary.relation || "")}</div>
+        <div class="small" style="margin-top:8px;"><strong>Point forecast (last weekday, same quantile):</strong> ${
+          Number.isFinite(pointForecast) ? pointForecast.toFixed(4) : "N/A"
+        }</div>
         <div class="small" style="margin-top:12px;"><strong>First prediction row (no header):</strong></div>
-        <pre class="small" style="margin:6px 0 0; white-space:pre-wrap;">${escapeHtml(firstRowText)}</pre>
+        <pre class="small" style="margin:6px 0 0; white-space:pre-wrap;">${escapeHtml(summary.firstRowText || "")}</pre>
         <div class="small" style="margin-top:10px;"><strong>Last prediction row (no header):</strong></div>
-        <pre class="small" style="margin:6px 0 0; white-space:pre-wrap;">${escapeHtml(lastRowText)}</pre>
+        <pre class="small" style="margin:6px 0 0; white-space:pre-wrap;">${escapeHtml(summary.lastRowText || "")}</pre>
       `;
     }
 
     logEvent("predictions_quantile_mapping", {
-      upload_id: uploadId || "",
+      upload_id: uploadId,
       ticker,
-      quantile: selected.label,
-      first_weekday: firstUse.ymd,
-      last_weekday: lastUse.ymd,
+      quantile: summary.selectedQuantile || "",
+      first_weekday: summary.firstWeekdayDate || "",
+      last_weekday: summary.lastWeekdayDate || "",
     });
-    return mappingResult;
+    return { summary, agent };
   };
 
   const inferCsvAxes = (table) => {
@@ -7457,7 +7413,7 @@
     return String(uploadDoc?.fileUrl || "").trim();
   };
 
-  const fetchUploadCsvText = async ({ uploadId, url, maxBytes = 2_000_000 }) => {
+  const fetchUploadCsvText = async ({ uploadId, url, maxBytes = 2_000_000, maxRows = 20000 }) => {
     if (!url) throw new Error("Upload is missing a downloadable URL.");
     try {
       const resp = await fetch(url, { cache: "no-store" });
@@ -7468,12 +7424,32 @@
       const functions = state.clients?.functions;
       if (!functions) throw error;
       const callable = functions.httpsCallable("get_prediction_upload_csv");
-      const result = await callable({ uploadId, maxBytes, meta: buildMeta() });
-      const text = String(result.data?.csv || "");
-      if (!text) throw new Error("Unable to download CSV.");
+      // Page through line-aligned row ranges instead of pulling the whole file in one response.
+      let header = "";
+      const lines = [];
+      let rowOffset = 0;
+      let bytes = 0;
+      let done = false;
+      while (!done && lines.length < maxRows && bytes < maxBytes) {
+        const result = await callable({
+          uploadId,
+          rowOffset,
+          limit: Math.min(5000, maxRows - lines.length),
+          meta: buildMeta(),
+        });
+        const page = result.data || {};
+        header = header || String(page.header || "");
+        const pageCsv = String(page.csv || "");
+        const pageLines = pageCsv ? pageCsv.split("\n").slice(1) : [];
+        lines.push(...pageLines);
+        bytes += Number(page.bytes || 0);
+        rowOffset = Number(page.nextRowOffset ?? rowOffset + pageLines.length);
+        done = Boolean(page.done) || !pageLines.length;
+      }
+      if (!header) throw new Error("Unable to download CSV.");
       return {
-        text,
-        truncated: Boolean(result.data?.truncated),
+        text: [header, ...lines].join("\n"),
+        truncated: !done,
         source: "function",
       };
     }
@@ -8275,8 +8251,8 @@
     const weekKey = getWeeklyUsageKey();
     const docId = `${state.user.uid}_${weekKey}`;
     try {
-      const snap = await db.collection("usage_weekly").doc(docId).get();
-      const raw = snap.exists ? Number(snap.data()?.aiScreenerRuns || 0) : 0;
+      const shards = await db.collection("usage_weekly").doc(docId).collection("shards").get();
+      const raw = shards.docs.reduce((sum, doc) => sum + Number(doc.data()?.aiScreenerRuns || 0), 0);
       state.aiUsageToday = Number.isFinite(raw) ? Math.max(0, raw) : 0;
       state.aiUsageDateKey = weekKey;
     } catch (error) {
@@ -8877,8 +8853,7 @@
 
     const forecastSnap = await db.collection("forecast_requests").doc(requestId).get();
     if (!forecastSnap.exists) return null;
-    const forecastDoc = forecastSnap.data() || {};
-    const forecastRows = Array.isArray(forecastDoc.forecastRows) ? forecastDoc.forecastRows : [];
+    const forecastRows = await loadForecastRows({ id: forecastSnap.id, ...forecastSnap.data() });
     if (!forecastRows.length) return null;
 
     const lastRow = forecastRows[forecastRows.length - 1] || {};
@@ -9630,10 +9605,28 @@
     return Array.isArray(rows) ? rows : [];
   };
 
+  const forecastRowsCache = new Map();
+
+  // Newer forecasts keep their rows in forecast_rows/{forecastRowsRef.id}, which only the
+  // get_forecast_rows callable reads after checking access to the forecast itself.
+  const loadForecastRows = async (doc) => {
+    if (Array.isArray(doc?.forecastRows)) return doc.forecastRows;
+    const rowsId = String(doc?.forecastRowsRef?.id || "").trim();
+    if (!rowsId || !doc?.id) return [];
+    if (!forecastRowsCache.has(rowsId)) {
+      const functions = state.clients?.functions || firebase.functions();
+      const result = await functions.httpsCallable("get_forecast_rows")({ forecastId: doc.id });
+      const rows = Array.isArray(result.data?.rows) ? result.data.rows : [];
+      forecastRowsCache.set(rowsId, rows);
+    }
+    return forecastRowsCache.get(rowsId);
+  };
+
   const loadForecastDoc = async (db, forecastId) => {
     const snap = await db.collection("forecast_requests").doc(forecastId).get();
     if (!snap.exists) throw new Error("Forecast not found.");
-    return { id: snap.id, ...snap.data() };
+    const doc = { id: snap.id, ...snap.data() };
+    return { ...doc, forecastRows: await loadForecastRows(doc) };
   };
 
   const getForecastReportPath = (doc, kind) => {
@@ -12237,21 +12230,38 @@
         start,
         end,
         interval,
+        mode: "export",
         meta: buildMeta(),
       };
 
       try {
         ui.downloadStatus.textContent = "Fetching data...";
         const getDownload = functions.httpsCallable("download_price_csv");
-        const result = await getDownload(payload);
-        const data = result.data || {};
-        const csvText = String(data.csv || "");
-        if (!csvText.trim()) {
-          ui.downloadStatus.textContent = "No data returned.";
-          return;
+        let result;
+        try {
+          result = await getDownload(payload);
+        } catch (exportError) {
+          // Storage export needs URL signing rights on the backend; fall back to the inline CSV.
+          const { mode, ...inlinePayload } = payload;
+          result = await getDownload(inlinePayload);
         }
+        const data = result.data || {};
         const filename = String(data.filename || `${ticker}_${start}_${end}.csv`);
-        triggerDownload(filename, csvText);
+        if (data.url) {
+          // Signed Storage URL with an attachment disposition: navigate instead of buffering the file.
+          const link = document.createElement("a");
+          link.href = String(data.url);
+          link.rel = "noopener noreferrer";
+          link.download = filename;
+          link.click();
+        } else {
+          const csvText = String(data.csv || "");
+          if (!csvText.trim()) {
+            ui.downloadStatus.textContent = "No data returned.";
+            return;
+          }
+          triggerDownload(filename, csvText);
+        }
         const rowCount = Number(data.rowCount || 0);
         ui.downloadStatus.textContent = rowCount ? `Download ready (${rowCount} rows).` : "Download ready.";
         logEvent("download_history", { ticker, interval });
@@ -12637,36 +12647,16 @@
       }
       try {
         setOutputLoading(ui.predictionsAgentOutput, "Analyzing uploaded CSV...");
-        const mappingResult = await runPredictionsQuantileMapping(functions);
-        if (mappingResult?.uploadId) {
-          try {
-            const runAgent = functions.httpsCallable("run_prediction_upload_agent");
-            const agentRes = await runAgent({
-              uploadId: mappingResult.uploadId,
-              ticker: mappingResult.ticker,
-              mappingSummary: mappingResult,
-              meta: buildMeta(),
-            });
-            const agent = agentRes?.data || {};
-            const agentText = String(agent.analysis || "").trim();
-            const modelUsed = normalizeAiModelId(agent.model || "gpt-5-mini") || "gpt-5-mini";
-            if (agentText && ui.predictionsAgentOutput) {
-              ui.predictionsAgentOutput.innerHTML += `
-                <div class="agent-summary" style="margin-top:14px;">
-                  <div class="small"><strong>OpenAI Agent (${escapeHtml(modelUsed)}):</strong></div>
-                  <div class="small" style="margin-top:6px; white-space:pre-wrap;">${escapeHtml(agentText)}</div>
-                </div>
-              `;
-            }
-          } catch (agentError) {
-            if (ui.predictionsAgentOutput) {
-              ui.predictionsAgentOutput.innerHTML += `
-                <div class="small muted" style="margin-top:12px;">
-                  OpenAI agent unavailable: ${escapeHtml(agentError.message || "Unable to generate AI commentary.")}
-                </div>
-              `;
-            }
-          }
+        const { agent } = await runPredictionsQuantileMapping(functions);
+        const agentText = String(agent.analysis || "").trim();
+        const modelUsed = normalizeAiModelId(agent.model || "gpt-5-mini") || "gpt-5-mini";
+        if (agentText && ui.predictionsAgentOutput) {
+          ui.predictionsAgentOutput.innerHTML += `
+            <div class="agent-summary" style="margin-top:14px;">
+              <div class="small"><strong>OpenAI Agent (${escapeHtml(modelUsed)}):</strong></div>
+              <div class="small" style="margin-top:6px; white-space:pre-wrap;">${escapeHtml(agentText)}</div>
+            </div>
+          `;
         }
         setOutputReady(ui.predictionsAgentOutput);
         showToast("OpenAI CSV Agent completed.");
@@ -12822,6 +12812,8 @@
       }
       params.slPct = Number(formData.get("slPct") || 0);
       params.tpPct = Number(formData.get("tpPct") || 0);
+      const paramGrid = parseBacktestSweepGrid(formData.get("sweepGrid"));
+      const isSweep = Object.keys(paramGrid).length > 0;
 
       const payload = {
         ticker,
@@ -12831,16 +12823,17 @@
         cash,
         commission,
         params,
+        ...(isSweep ? { paramGrid } : {}),
         meta: buildMeta(),
       };
 
       try {
-        setOutputLoading(ui.backtestOutput, "Running backtest...");
+        setOutputLoading(ui.backtestOutput, isSweep ? "Running parameter sweep..." : "Running backtest...");
         const run = functions.httpsCallable("run_backtest");
         const result = await run(payload);
         const backtestId = String(result.data?.backtestId || "").trim();
         showToast("Backtest saved.");
-        logEvent("backtest_run", { ticker, interval, strategy });
+        logEvent("backtest_run", { ticker, interval, strategy, sweep: isSweep });
         if (backtestId) {
           await loadBacktestById(db, storage, backtestId);
         }
@@ -13133,6 +13126,7 @@
 				        if (state.unsubscribeTasks) state.unsubscribeTasks();
 				        if (state.unsubscribeWatchlist) state.unsubscribeWatchlist();
 				        if (state.unsubscribeAlerts) state.unsubscribeAlerts();
+				        if (state.unsubscribeAlertScans) state.unsubscribeAlertScans();
                 if (state.unsubscribeScreenerRuns) state.unsubscribeScreenerRuns();
                 if (state.unsubscribeAIAgents) state.unsubscribeAIAgents();
                 if (state.unsubscribeAIFollows) state.unsubscribeAIFollows();
@@ -0,0 +1,57 @@
+import math
+import sys
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pytest.importorskip("backtesting")
+pytest.importorskip("firebase_admin")
+pytest.importorskip("firebase_functions")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "functions"))
+import main  # noqa: E402
+
+
+def _frame(seed, rows=400, freq="B"):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0004, 0.018, rows)))
+    open_ = close * np.exp(rng.normal(0, 0.006, rows))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.008, rows)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.008, rows)))
+    index = pd.date_range("2021-01-04", periods=rows, freq=freq)
+    return pd.DataFrame({"Open": open_, "High": high, "Low": low, "Close": close, "Volume": 1_000_000}, index=index)
+
+
+CASES = [
+    ("sma_cross", {"fast": 10, "slow": 30}, 0.0),
+    ("sma_cross", {"fast": 5, "slow": 20, "slPct": 0.03, "tpPct": 0.06}, 0.001),
+    ("rsi_reversion", {"rsiPeriod": 14, "oversold": 30, "exitAbove": 55}, 0.0),
+    ("rsi_reversion", {"rsiPeriod": 7, "oversold": 35, "exitAbove": 60, "slPct": 0.02, "tpPct": 0.05}, 0.002),
+]
+
+
+@pytest.mark.parametrize("seed", [1, 7, 42])
+@pytest.mark.parametrize("strategy,params,commission", CASES)
+def test_vectorized_kernel_matches_backtesting(seed, strategy, params, commission):
+    df = _frame(seed)
+    vectorized = main._backtest_stats_metrics(main._run_backtest_engine(df, strategy, params, 10_000, commission, "vectorized"))
+    reference = main._backtest_stats_metrics(main._run_backtest_engine(df, strategy, params, 10_000, commission, "event"))
+    assert main._backtest_metrics_diverged(reference, vectorized) == []
+
+
+def test_vectorized_equity_curve_matches_backtesting():
+    df = _frame(3)
+    params = {"fast": 8, "slow": 21, "slPct": 0.04}
+    vectorized = main._run_backtest_engine(df, "sma_cross", params, 10_000, 0.001, "vectorized")["_equity_curve"]
+    reference = main._run_backtest_engine(df, "sma_cross", params, 10_000, 0.001, "event")["_equity_curve"]
+    assert np.allclose(vectorized["Equity"].to_numpy(), reference["Equity"].to_numpy(), rtol=1e-9)
+
+
+def test_vectorized_kernel_without_signals():
+    df = _frame(5, rows=40)
+    metrics = main._backtest_stats_metrics(main._vectorized_backtest(df, "sma_cross", {"fast": 20, "slow": 60}, 10_000, 0.0))
+    assert metrics["Trades"] == 0
+    assert metrics["ReturnPct"] == 0
+    assert math.isnan(metrics["WinRatePct"])
@@ -0,0 +1,148 @@
+import io
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("firebase_admin")
+pytest.importorskip("firebase_functions")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "functions"))
+import main  # noqa: E402
+
+
+class FakeBlob:
+    def __init__(self, text, name="predictions/uid/upload.csv"):
+        self.data = text.encode("utf-8")
+        self.name = name
+        self.generation = 1
+
+    def open(self, mode="rb", chunk_size=None):
+        return io.BytesIO(self.data)
+
+    def download_as_bytes(self, start=0, end=None):
+        return self.data[start : (len(self.data) if end is None else end + 1)]
+
+
+def _csv(rows, newline="\n", trailing=True):
+    lines = ["date,p10,p50,p90"] + [f"{day},{low},{mid},{high}" for day, low, mid, high in rows]
+    return newline.join(lines) + (newline if trailing else "")
+
+
+WEEK = [
+    ("2024-07-01", 1, 2, 3),
+    ("2024-07-02", 2, 3, 4),
+    ("2024-07-03", 3, 4, 5),
+    ("2024-07-04", 4, 5, 6),
+    ("2024-07-05", 5, 6, 7),
+    ("2024-07-06", 6, 7, 8),
+    ("2024-07-07", 7, 8, 9),
+    ("2024-07-08", 8, 9, 10),
+]
+
+
+@pytest.fixture
+def small_stride(monkeypatch):
+    monkeypatch.setattr(main, "PREDICTION_CSV_INDEX_STRIDE", 3)
+
+
+def _page_by_rows(blob, index, limit):
+    lines, row = [], 0
+    for _ in range(100):
+        page = main._read_prediction_csv_page(blob, index, row_offset=row, byte_offset=None, limit=limit)
+        lines.extend(page["lines"])
+        row += len(page["lines"])
+        if page["done"] or not page["lines"]:
+            return lines
+    raise AssertionError("row paging did not finish")
+
+
+def _page_by_bytes(blob, index, start, limit=2):
+    lines, offset = [], start
+    for _ in range(100):
+        page = main._read_prediction_csv_page(blob, index, row_offset=None, byte_offset=offset, limit=limit)
+        lines.extend(page["lines"])
+        if page["done"]:
+            return lines
+        offset = page["nextOffset"]
+    raise AssertionError("byte paging did not finish")
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+@pytest.mark.parametrize("trailing", [True, False])
+def test_index_counts_rows_and_strips_header(small_stride, newline, trailing):
+    index = main._build_prediction_csv_index(FakeBlob(_csv(WEEK, newline, trailing)))
+    assert index["rows"] == len(WEEK)
+    assert index["header"] == "date,p10,p50,p90"
+    assert index["stride"] == 3
+    assert len(index["offsets"]) == 3
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+@pytest.mark.parametrize("trailing", [True, False])
+@pytest.mark.parametrize("limit", [1, 2, 3, 5, 50])
+def test_row_pages_cover_every_row_once(small_stride, newline, trailing, limit):
+    blob = FakeBlob(_csv(WEEK, newline, trailing))
+    index = main._build_prediction_csv_index(blob)
+    expected = [f"{day},{low},{mid},{high}" for day, low, mid, high in WEEK]
+    assert _page_by_rows(blob, index, limit) == expected
+
+
+def test_row_page_past_the_end_is_empty(small_stride):
+    blob = FakeBlob(_csv(WEEK))
+    index = main._build_prediction_csv_index(blob)
+    page = main._read_prediction_csv_page(blob, index, row_offset=99, byte_offset=None, limit=5)
+    assert page["lines"] == []
+    assert page["done"]
+
+
+@pytest.mark.parametrize("trailing", [True, False])
+def test_byte_pages_start_on_the_next_line(small_stride, monkeypatch, trailing):
+    monkeypatch.setattr(main, "PREDICTION_CSV_PAGE_MAX_BYTES", 40)
+    blob = FakeBlob(_csv(WEEK, "\r\n", trailing))
+    index = main._build_prediction_csv_index(blob)
+    expected = [f"{day},{low},{mid},{high}" for day, low, mid, high in WEEK]
+    assert _page_by_bytes(blob, index, 0) == expected
+    # An offset inside the third data row resumes at the fourth.
+    third = blob.data.index(b"2024-07-03")
+    assert _page_by_bytes(blob, index, third + 2) == expected[3:]
+    assert _page_by_bytes(blob, index, third) == expected[2:]
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+def test_summary_handles_crlf_and_trailing_blank_lines(newline):
+    summary = main._summarize_prediction_csv(FakeBlob(_csv(WEEK, newline) + newline))
+    assert summary["rowCount"] == len(WEEK)
+    assert summary["quantileColumns"] == ["p10", "p50", "p90"]
+    assert summary["firstRowDate"] == "2024-07-01"
+    assert summary["lastRowDate"] == "2024-07-08"
+    assert summary["weekendRowCount"] == 2
+    assert summary["holidayRowCount"] == 1
+    assert summary["predictionLengthDays"] == 7
+    assert summary["lastQuantiles"][-1] == {"label": "p90", "q": 0.9, "value": 10.0}
+    assert not summary["lastRowText"].endswith("\r")
+
+
+def test_summary_with_utf8_bom_and_no_trailing_newline():
+    summary = main._summarize_prediction_csv(FakeBlob("﻿" + _csv(WEEK, trailing=False)))
+    assert summary["dateColumn"] == "date"
+    assert summary["rowCount"] == len(WEEK)
+    assert summary["lastRowDate"] == "2024-07-08"
+
+
+def test_summary_of_weekend_only_rows_falls_back_to_any_row():
+    weekend = [("2024-07-06", 1, 2, 3), ("2024-07-07", 2, 3, 4), ("2024-07-13", 3, 4, 5)]
+    summary = main._summarize_prediction_csv(FakeBlob(_csv(weekend)))
+    assert summary["weekendRowCount"] == 3
+    assert not summary["firstRowIsWeekday"]
+    assert not summary["lastRowIsSession"]
+    assert summary["firstWeekdayDate"] == "2024-07-06"
+    assert summary["lastWeekdayDate"] == "2024-07-13"
+    assert summary["firstQuantiles"][0]["value"] == 1.0
+    assert summary["predictionLengthSessions"] == 5
+
+
+def test_summary_requires_a_date_column():
+    with pytest.raises(main.https_fn.HttpsError):
+        main._summarize_prediction_csv(FakeBlob("when,p10,p50\n2024-07-01,1,2\n"))
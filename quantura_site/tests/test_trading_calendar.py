@@ -0,0 +1,63 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "functions"))
+import trading_calendar  # noqa: E402
+
+
+def _days(values):
+    return [str(day) for day in np.atleast_1d(values)]
+
+
+@pytest.mark.parametrize(
+    "day",
+    [
+        "2022-12-26",  # Christmas on a Sunday, observed Monday
+        "2023-01-02",  # New Year's Day on a Sunday, observed Monday
+        "2024-03-29",  # Good Friday
+        "2025-01-09",  # National day of mourning for President Carter
+        "2027-06-18",  # Juneteenth on a Saturday, observed Friday
+    ],
+)
+def test_closures_are_not_sessions(day):
+    assert not trading_calendar.is_session(day)
+    assert np.datetime64(day) in trading_calendar.holidays()
+
+
+def test_saturday_new_year_is_not_made_up_on_friday():
+    assert trading_calendar.is_session("2021-12-31")
+
+
+def test_session_count_for_2024():
+    assert trading_calendar.count_sessions("2024-01-01", "2025-01-01") == 252
+    sessions = trading_calendar.session_array()
+    assert ((sessions >= np.datetime64("2024-01-01")) & (sessions < np.datetime64("2025-01-01"))).sum() == 252
+
+
+def test_is_session_is_vectorized():
+    assert trading_calendar.is_session(["2024-07-04", "2024-07-05"]).tolist() == [False, True]
+
+
+@pytest.mark.parametrize(
+    "day,offset,expected",
+    [
+        ("2024-07-06", 0, "2024-07-08"),  # Saturday rolls forward to Monday
+        ("2024-07-06", 1, "2024-07-08"),  # first session after a Saturday is Monday
+        ("2024-07-06", -1, "2024-07-05"),  # first session before a Saturday is Friday
+        ("2024-07-04", 0, "2024-07-05"),  # holiday rolls forward
+        ("2024-07-04", 1, "2024-07-05"),
+        ("2024-07-04", -1, "2024-07-03"),
+        ("2024-07-05", 0, "2024-07-05"),  # a session stays put
+    ],
+)
+def test_add_sessions_from_non_sessions(day, offset, expected):
+    assert _days(trading_calendar.add_sessions(day, offset)) == [expected]
+
+
+def test_add_sessions_across_holidays():
+    assert _days(trading_calendar.add_sessions("2024-12-24", [1, 5])) == ["2024-12-26", "2025-01-02"]
+    assert _days(trading_calendar.next_sessions("2024-11-27", 3)) == ["2024-11-29", "2024-12-02", "2024-12-03"]
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Benchmark `_serialize_for_firestore` against the previous recursive implementation.
+
+The payload is ten years of synthetic daily OHLCV bars, shaped the way the endpoints
+hand it over: a DataFrame, records from `to_dict(orient="records")` (numpy scalars and
+Timestamps inside), and a dict of column arrays. Each case checks that both serializers
+return the same payload before timing them.
+
+    python scripts/benchmark_firestore_serializer.py --repeat 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Callable
+
+ROOT = Path(__file__).resolve().parents[1]
+FUNCTIONS_DIR = ROOT / "quantura_site" / "functions"
+
+
+def legacy_serialize(value: Any) -> Any:
+    """The recursive serializer this benchmark is measured against."""
+    try:
+        import numpy as np  # type: ignore
+
+        if isinstance(value, (np.floating, np.integer)):
+            return value.item()
+        if isinstance(value, np.ndarray):
+            return [legacy_serialize(item) for item in value.tolist()]
+    except Exception:
+        pass
+
+    try:
+        import pandas as pd  # type: ignore
+
+        if isinstance(value, pd.Timestamp):
+            return value.isoformat()
+    except Exception:
+        pass
+
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+
+    if isinstance(value, list):
+        return [legacy_serialize(item) for item in value]
+    if isinstance(value, dict):
+        return {key: legacy_serialize(item) for key, item in value.items()}
+    return value
+
+
+def ohlcv_frame(years: int) -> Any:
+    import numpy as np  # type: ignore
+    import pandas as pd  # type: ignore
+
+    rng = np.random.default_rng(7)
+    index = pd.bdate_range("2015-01-02", periods=252 * years, name="Date")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+    open_ = close * (1 + rng.normal(0, 0.002, len(index)))
+    return pd.DataFrame(
+        {
+            "Open": open_,
+            "High": np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.004, len(index)))),
+            "Low": np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.004, len(index)))),
+            "Close": close,
+            "Adj Close": close * 0.98,
+            "Volume": rng.integers(1_000_000, 50_000_000, len(index)),
+        },
+        index=index,
+    )
+
+
+def timed(fn: Callable[[], Any], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", type=int, default=10, help="Years of daily bars in the payload.")
+    parser.add_argument("--repeat", type=int, default=10, help="Timed runs per case (median).")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(FUNCTIONS_DIR))
+    import main as functions_main  # noqa: E402
+
+    frame = ohlcv_frame(max(1, args.years)).reset_index()
+    records = frame.to_dict(orient="records")
+    columns = {name: frame[name].to_numpy() for name in frame.columns if name != "Date"}
+    cases: dict[str, tuple[Callable[[], Any], Callable[[], Any]]] = {
+        "dataframe": (
+            lambda: legacy_serialize(frame.to_dict(orient="records")),
+            lambda: functions_main._serialize_for_firestore(frame),
+        ),
+        "records": (lambda: legacy_serialize(records), lambda: functions_main._serialize_for_firestore(records)),
+        "column arrays": (lambda: legacy_serialize(columns), lambda: functions_main._serialize_for_firestore(columns)),
+    }
+
+    print(f"{len(frame)} bars x {len(frame.columns)} columns, median of {args.repeat} runs")
+    mismatched = []
+    for label, (legacy, current) in cases.items():
+        if json.dumps(legacy(), sort_keys=True) != json.dumps(current(), sort_keys=True):
+            mismatched.append(label)
+        legacy_ms = timed(legacy, args.repeat)
+        current_ms = timed(current, args.repeat)
+        print(f"{label:<14} legacy {legacy_ms:8.2f} ms   current {current_ms:8.2f} ms   {legacy_ms / max(current_ms, 1e-9):5.1f}x")
+    if mismatched:
+        print(f"Output differs from the legacy serializer for: {', '.join(mismatched)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
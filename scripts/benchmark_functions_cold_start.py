@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""Cold-start import budget for the Cloud Functions codebase.
+
+Each measurement runs in a fresh interpreter: it times `import main`, then the
+modules an endpoint declares through `@_callable(features=...)`, then every
+other module on its real import path. That path is found statically: the
+function-local imports and lazy modules reachable from the endpoint through
+calls within main.py. Modules on the path that the declared features do not
+already load are reported as undeclared and fail the check. Endpoints that
+share the same import set are measured once.
+
+    # record the current numbers as the budget
+    python scripts/benchmark_functions_cold_start.py --record
+
+    # compare against the budget; exits 1 when an endpoint regresses
+    python scripts/benchmark_functions_cold_start.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parents[1]
+FUNCTIONS_DIR = ROOT / "quantura_site" / "functions"
+DEFAULT_BUDGET_PATH = Path(__file__).resolve().with_name("functions_cold_start_budget.json")
+
+LIST_ENDPOINTS = """
+import json, main
+print(json.dumps({name: list(main._endpoint_imports(name)) for name in sorted(main._ENDPOINT_FEATURES)}))
+"""
+
+MEASURE_ENDPOINT = """
+import importlib, json, sys, time
+started = time.perf_counter()
+import main
+module_loaded = time.perf_counter()
+main._load_endpoint_imports(sys.argv[1])
+
+def loaded(name):
+    module = sys.modules.get(name)
+    return module is not None and type(module).__name__ != "_LazyModule"
+
+undeclared = [name for name in sys.argv[2:] if not loaded(name)]
+for name in undeclared:
+    getattr(importlib.import_module(name), "__file__", None)
+finished = time.perf_counter()
+print(json.dumps({
+    "moduleMs": (module_loaded - started) * 1000,
+    "endpointMs": (finished - module_loaded) * 1000,
+    "undeclared": undeclared,
+}))
+"""
+
+
+def run_snippet(code: str, *args: str) -> Any:
+    proc = subprocess.run(
+        [sys.executable, "-c", code, *args],
+        cwd=FUNCTIONS_DIR,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"Benchmark subprocess failed:\n{proc.stderr.strip()}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def import_paths(source: str) -> dict[str, list[str]]:
+    """Non-stdlib modules each top-level function of `source` imports, directly or through calls."""
+    tree = ast.parse(source)
+    functions = {node.name: node for node in tree.body if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))}
+    lazy_modules: dict[str, str] = {}
+    for node in tree.body:
+        value = node.value if isinstance(node, ast.Assign) else None
+        if (
+            isinstance(value, ast.Call)
+            and isinstance(value.func, ast.Name)
+            and value.func.id == "_lazy_module"
+            and value.args
+            and isinstance(value.args[0], ast.Constant)
+        ):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    lazy_modules[target.id] = str(value.args[0].value)
+
+    direct: dict[str, set[str]] = {}
+    calls: dict[str, set[str]] = {}
+    for name, node in functions.items():
+        modules: set[str] = set()
+        referenced: set[str] = set()
+        for child in ast.walk(node):
+            if isinstance(child, ast.Import):
+                modules.update(alias.name for alias in child.names)
+            elif isinstance(child, ast.ImportFrom) and child.module and not child.level:
+                modules.add(child.module)
+            elif isinstance(child, ast.Name) and isinstance(child.ctx, ast.Load):
+                if child.id in lazy_modules:
+                    modules.add(lazy_modules[child.id])
+                elif child.id in functions and child.id != name:
+                    referenced.add(child.id)
+        direct[name] = {module for module in modules if module.split(".")[0] not in sys.stdlib_module_names}
+        calls[name] = referenced
+
+    paths: dict[str, list[str]] = {}
+    for name in functions:
+        seen = {name}
+        stack = [name]
+        modules = set()
+        while stack:
+            current = stack.pop()
+            modules |= direct[current]
+            for callee in calls[current] - seen:
+                seen.add(callee)
+                stack.append(callee)
+        paths[name] = sorted(modules)
+    return paths
+
+
+def measure(repeat: int) -> dict[str, Any]:
+    endpoint_imports: dict[str, list[str]] = run_snippet(LIST_ENDPOINTS)
+    paths = import_paths((FUNCTIONS_DIR / "main.py").read_text(encoding="utf-8"))
+
+    by_import_set: dict[tuple[tuple[str, ...], tuple[str, ...]], list[str]] = {}
+    for name, modules in endpoint_imports.items():
+        by_import_set.setdefault((tuple(modules), tuple(paths.get(name) or ())), []).append(name)
+
+    module_samples: list[float] = []
+    endpoints: dict[str, dict[str, Any]] = {}
+    for (modules, path), names in sorted(by_import_set.items(), key=lambda item: item[1][0]):
+        samples = [run_snippet(MEASURE_ENDPOINT, names[0], *path) for _ in range(repeat)]
+        module_samples.extend(sample["moduleMs"] for sample in samples)
+        total_ms = statistics.median(sample["moduleMs"] + sample["endpointMs"] for sample in samples)
+        undeclared = samples[0]["undeclared"]
+        for name in names:
+            endpoints[name] = {"totalMs": round(total_ms, 1), "imports": list(modules), "undeclared": undeclared}
+
+    return {
+        "moduleMs": round(statistics.median(module_samples), 1) if module_samples else 0.0,
+        "endpoints": endpoints,
+    }
+
+
+def compare(current: dict[str, Any], budget: dict[str, Any], tolerance: float, slack_ms: float) -> list[str]:
+    failures: list[str] = []
+
+    def check(label: str, actual: float, allowed: float) -> None:
+        limit = allowed * (1 + tolerance) + slack_ms
+        status = "FAIL" if actual > limit else "ok"
+        print(f"{status:>4}  {label:<40} {actual:8.1f} ms  (budget {allowed:.1f} ms, limit {limit:.1f} ms)")
+        if actual > limit:
+            failures.append(label)
+
+    check("import main", current["moduleMs"], float(budget.get("moduleMs") or 0.0))
+    budget_endpoints = budget.get("endpoints") or {}
+    for name, result in sorted(current["endpoints"].items()):
+        allowed = budget_endpoints.get(name)
+        if allowed is None:
+            print(f" new  {name:<40} {result['totalMs']:8.1f} ms  (no budget recorded)")
+            continue
+        check(name, result["totalMs"], float(allowed["totalMs"]))
+        added = sorted(set(result["imports"]) - set(allowed.get("imports") or []))
+        if added:
+            print(f"      {'':<40} new imports: {', '.join(added)}")
+    for name, result in sorted(current["endpoints"].items()):
+        if result.get("undeclared"):
+            print(f"FAIL  {name:<40} imports outside its features: {', '.join(result['undeclared'])}")
+            failures.append(f"{name} (undeclared imports)")
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget", type=Path, default=DEFAULT_BUDGET_PATH, help="Budget JSON path.")
+    parser.add_argument("--record", action="store_true", help="Write the current measurements as the budget.")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh-interpreter runs per import set (median).")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression (0.25 = +25%%).")
+    parser.add_argument("--slack-ms", type=float, default=50.0, help="Absolute allowance on top of the tolerance.")
+    args = parser.parse_args()
+
+    current = measure(max(1, args.repeat))
+    if args.record:
+        args.budget.write_text(json.dumps(current, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"Recorded cold-start budget for {len(current['endpoints'])} endpoints at {args.budget}")
+        return 0
+
+    if not args.budget.exists():
+        print(f"No budget at {args.budget}; run with --record first.", file=sys.stderr)
+        return 2
+    budget = json.loads(args.budget.read_text(encoding="utf-8"))
+    failures = compare(current, budget, args.tolerance, args.slack_ms)
+    if failures:
+        print(f"\nCold-start regression in: {', '.join(failures)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""Recommend Cloud Functions deployment profiles from measured endpoint metrics.
+
+Every callable logs one `endpoint_metrics` line per invocation (latency and
+peakRssMb). Export them and feed the file to this script:
+
+    gcloud logging read 'jsonPayload.event="endpoint_metrics"' \
+        --freshness=7d --format=json > endpoint_metrics.json
+    python scripts/recommend_deployment_profiles.py endpoint_metrics.json --write
+
+peakRssMb is the instance-lifetime high-water mark (ru_maxrss) at the time of
+the invocation, so it covers concurrent requests and everything the instance
+loaded earlier; it is reported here as p95InstancePeakRssMb.
+
+The smallest profile whose memory covers that p95 (plus headroom) and whose
+timeout covers p95 latency is chosen. Memory is only measured at the current
+profile's concurrency, so profiles allowing more concurrent requests than the
+current one are never recommended. Endpoints busy enough to keep an instance
+warm get min_instances=1. With --write the result is stored in
+quantura_site/functions/deployment_profiles.json, which main.py applies on
+top of the profiles declared in code at the next deploy.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parents[1]
+FUNCTIONS_DIR = ROOT / "quantura_site" / "functions"
+OVERRIDES_PATH = FUNCTIONS_DIR / "deployment_profiles.json"
+
+
+def load_samples(path: Path) -> list[dict[str, Any]]:
+    text = path.read_text(encoding="utf-8").strip()
+    if not text:
+        return []
+    if text.startswith("["):
+        rows = json.loads(text)
+    else:
+        rows = [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    samples: list[dict[str, Any]] = []
+    for row in rows:
+        payload = row.get("jsonPayload") if isinstance(row.get("jsonPayload"), dict) else row
+        if payload.get("event") != "endpoint_metrics" or not payload.get("endpoint"):
+            continue
+        samples.append({**payload, "timestamp": row.get("timestamp") or payload.get("timestamp")})
+    return samples
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[rank]
+
+
+def parse_time(value: Any) -> datetime | None:
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def recommend(
+    samples: list[dict[str, Any]],
+    profiles: dict[str, dict[str, Any]],
+    *,
+    memory_headroom: float,
+    timeout_headroom: float,
+    hot_per_hour: float,
+) -> dict[str, dict[str, Any]]:
+    by_endpoint: dict[str, list[dict[str, Any]]] = {}
+    for sample in samples:
+        by_endpoint.setdefault(str(sample["endpoint"]), []).append(sample)
+
+    times = [parsed for parsed in (parse_time(sample.get("timestamp")) for sample in samples) if parsed]
+    span_hours = max((max(times) - min(times)).total_seconds() / 3600, 1.0) if len(times) > 1 else 1.0
+    # Smallest first, so the first profile that fits wins; among equal sizes prefer the
+    # one that packs more requests per instance.
+    ordered = sorted(
+        profiles.items(),
+        key=lambda item: (int(item[1]["memory"]), int(item[1]["timeout_sec"]), -int(item[1]["concurrency"])),
+    )
+
+    results: dict[str, dict[str, Any]] = {}
+    for endpoint, rows in sorted(by_endpoint.items()):
+        latencies = [float(row["latencyMs"]) for row in rows if row.get("latencyMs") is not None]
+        rss = [float(row["peakRssMb"]) for row in rows if row.get("peakRssMb") is not None]
+        p95_latency = percentile(latencies, 95)
+        p95_rss = percentile(rss, 95)
+        current = rows[-1].get("profile")
+        max_concurrency = int(profiles[current]["concurrency"]) if current in profiles else None
+        candidates = [
+            (name, options)
+            for name, options in ordered
+            if max_concurrency is None or int(options["concurrency"]) <= max_concurrency
+        ]
+        chosen = candidates[-1][0]
+        for name, options in candidates:
+            if int(options["memory"]) >= p95_rss * memory_headroom and options["timeout_sec"] * 1000 >= p95_latency * timeout_headroom:
+                chosen = name
+                break
+        per_hour = len(rows) / span_hours
+        results[endpoint] = {
+            "profile": chosen,
+            "min_instances": 1 if per_hour >= hot_per_hour else 0,
+            "samples": len(rows),
+            "invocationsPerHour": round(per_hour, 1),
+            "p95LatencyMs": round(p95_latency, 1),
+            "p95InstancePeakRssMb": round(p95_rss, 1),
+            "currentProfile": current,
+        }
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("metrics", type=Path, help="gcloud logging JSON export or JSONL of endpoint_metrics payloads.")
+    parser.add_argument("--write", action="store_true", help=f"Write overrides to {OVERRIDES_PATH}.")
+    parser.add_argument("--memory-headroom", type=float, default=1.3, help="Required memory / p95 peak RSS.")
+    parser.add_argument("--timeout-headroom", type=float, default=2.0, help="Required timeout / p95 latency.")
+    parser.add_argument("--hot-per-hour", type=float, default=120.0, help="Invocations/hour that earn min_instances=1.")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(FUNCTIONS_DIR))
+    import main as functions_main  # noqa: E402
+
+    samples = load_samples(args.metrics)
+    if not samples:
+        print(f"No endpoint_metrics entries in {args.metrics}", file=sys.stderr)
+        return 1
+    results = recommend(
+        samples,
+        functions_main.DEPLOYMENT_PROFILES,
+        memory_headroom=args.memory_headroom,
+        timeout_headroom=args.timeout_headroom,
+        hot_per_hour=args.hot_per_hour,
+    )
+
+    for endpoint, result in results.items():
+        change = "" if result["profile"] == result["currentProfile"] else f"  (was {result['currentProfile']})"
+        print(
+            f"{endpoint:<40} {result['profile']:<9} min={result['min_instances']} "
+            f"p95 {result['p95LatencyMs']:>8.1f} ms {result['p95InstancePeakRssMb']:>7.1f} MB instance peak "
+            f"n={result['samples']}{change}"
+        )
+
+    if args.write:
+        payload = {"source": str(args.metrics.name), "samples": len(samples), "endpoints": results}
+        OVERRIDES_PATH.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"Wrote {OVERRIDES_PATH}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
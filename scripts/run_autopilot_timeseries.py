@@ -11,13 +11,15 @@ from typing import Optional
 import boto3
 import pandas as pd
 import pytz
-from pandas.tseries.holiday import USFederalHolidayCalendar
 
 REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-if REPO_ROOT not in sys.path:
-    sys.path.insert(0, REPO_ROOT)
+FUNCTIONS_DIR = os.path.join(REPO_ROOT, "quantura_site", "functions")
+for path in (REPO_ROOT, FUNCTIONS_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
 
 from fetch_data import colab_download_price_csv, ensure_dir
+from trading_calendar import is_session
 
 
 def parse_args() -> argparse.Namespace:
@@ -37,7 +39,7 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--skip-if-monday-holiday",
         action="store_true",
-        help="Skip the run if the previous Monday is a US federal holiday.",
+        help="Skip the run if this week's Monday was an NYSE holiday.",
     )
     parser.add_argument("--workdir", default="data/autopilot", help="Local working directory")
     return parser.parse_args()
@@ -45,8 +47,7 @@ def parse_args() -> argparse.Namespace:
 
 def was_monday_holiday(reference_time: datetime) -> bool:
     monday = (reference_time - timedelta(days=reference_time.weekday())).date()
-    holidays = USFederalHolidayCalendar().holidays(start=monday, end=monday)
-    return not holidays.empty
+    return not bool(is_session(monday))
 
 
 def build_training_dataframe(csv_paths: list[str]) -> pd.DataFrame:
@@ -74,7 +75,7 @@ def main() -> None:
 
     if args.skip_if_monday_holiday and was_monday_holiday(now_ny):
         monday = (now_ny - timedelta(days=now_ny.weekday())).date()
-        print(f"Skipping run because Monday {monday} is a US federal holiday.")
+        print(f"Skipping run because Monday {monday} was an NYSE holiday.")
         return
 
     ensure_dir(args.workdir)